@@ -0,0 +1,4 @@
+import logging
+
+# Library and service use is quiet unless the application configures logging (see app.utils.log)
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -1,8 +1,10 @@
-import uuid
+import sys
 from enum import Enum
 from typing import List, Optional
 from datetime import datetime
 from app.priorities.emerg_priority import Priority  
+from app.utils.ids import new_id
+from app.utils.metrics import instrumented, timed
 
 class IncidentStatus(Enum):
     """Enum class for incident status."""
@@ -14,9 +16,18 @@ class IncidentStatus(Enum):
     def __str__(self):
         return self.value  #  String representation should be the value
 
+def new_incident_id() -> str:
+    """Returns a new, unique incident ID: a ULID, so IDs sort by creation time (see app.utils.ids)."""
+    return new_id()
+
+@instrumented
 class Incident:
     """This class represents an emergency incident."""
 
+    # No per-instance __dict__: large histories hold many of these
+    __slots__ = ("incident_id", "location", "emerg_type", "priority", "required_resources",
+                 "status", "assigned_resources", "created_at", "updated_at")
+
     def __init__(self,
                  location: str,
                  emergency_type: str,
@@ -46,7 +57,7 @@ class Incident:
             updated_at (Optional[datetime], optional): The last update timestamp.
                 Defaults to None, which uses the current time.
         """
-        self.incident_id = incident_id if incident_id else str(uuid.uuid4())
+        self.incident_id = incident_id if incident_id else new_incident_id()
         self.location = location
         self.emerg_type = emergency_type
         self.priority = priority
@@ -57,6 +68,10 @@ class Incident:
         self.updated_at = updated_at if updated_at else datetime.now()
 
         self._validate_inputs()  #  Call validation method
+        # Locations, types and resource names repeat across incidents, so share one copy of each
+        self.location = sys.intern(self.location)
+        self.emerg_type = sys.intern(self.emerg_type)
+        self.required_resources[:] = map(sys.intern, self.required_resources)
 
     def _validate_inputs(self):
         """
@@ -79,6 +94,28 @@ class Incident:
         if not isinstance(self.updated_at, datetime):
             raise ValueError("updated_at must be a datetime object.")
 
+    @classmethod
+    def trusted(cls, incident_id: str, location: str, emerg_type: str, priority: Priority,
+                required_resources: List[str], status: IncidentStatus, assigned_resources: List[str],
+                created_at: datetime, updated_at: datetime) -> 'Incident':
+        """
+        Builds an Incident from fields already known to be valid (records this
+        system wrote, or a batch validated as a whole) without the constructor's
+        per-field checks. Every field is required; the lists are taken over, not copied.
+        """
+        incident = cls.__new__(cls)
+        incident.incident_id = incident_id
+        incident.location = sys.intern(location)
+        incident.emerg_type = sys.intern(emerg_type)
+        incident.priority = priority
+        required_resources[:] = map(sys.intern, required_resources)
+        incident.required_resources = required_resources
+        incident.status = status
+        incident.assigned_resources = assigned_resources
+        incident.created_at = created_at
+        incident.updated_at = updated_at
+        return incident
+
     def update_status(self, new_status: IncidentStatus) -> None:
         """
         Updates the status of the incident.
@@ -91,6 +128,20 @@ class Incident:
         self.status = new_status
         self.updated_at = datetime.now()
 
+    def copy(self) -> 'Incident':
+        """Returns an independent copy (lists included) without re-validating it."""
+        clone = Incident.__new__(Incident)
+        clone.incident_id = self.incident_id
+        clone.location = self.location
+        clone.emerg_type = self.emerg_type
+        clone.priority = self.priority
+        clone.required_resources = list(self.required_resources)
+        clone.status = self.status
+        clone.assigned_resources = list(self.assigned_resources)
+        clone.created_at = self.created_at
+        clone.updated_at = self.updated_at
+        return clone
+
     def __repr__(self) -> str:
         """String representation of the incident object."""
         return (f"Incident ID: {self.incident_id}\n"
@@ -104,6 +155,7 @@ class Incident:
                 f"Updated At: {self.updated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"----------------------------------------\n")
 
+    @timed("incident_to_dict")
     def to_dict(self) -> dict:
         """Convert the Incident object to a dictionary."""
         return {
@@ -119,6 +171,7 @@ class Incident:
         }
 
     @classmethod
+    @timed("incident_from_dict")
     def from_dict(cls, data: dict) -> 'Incident':
         """Create an Incident object from a dictionary."""
         return cls(
@@ -132,4 +185,24 @@ class Incident:
             created_at=datetime.fromisoformat(data["created_at"]),
             updated_at=datetime.fromisoformat(data["updated_at"]),
         )
-        
\ No newline at end of file
+
+    @classmethod
+    @timed("incident_from_dict")
+    def from_trusted_dict(cls, data: dict) -> 'Incident':
+        """
+        Create an Incident from a dictionary this system wrote itself (snapshot,
+        journal or database record), skipping per-field validation. Missing fields get
+        the same defaults as from_dict; enum names and timestamps are still parsed,
+        so a malformed record still raises.
+        """
+        return cls.trusted(
+            data["incident_id"] or new_incident_id(),
+            data.get("location", ""),
+            data.get("emerg_type", ""),
+            Priority[data.get("priority", "LOW")],
+            list(data.get("required_resources", ())),
+            IncidentStatus[data.get("status", "OPEN")],
+            list(data.get("assigned_resources") or ()),
+            datetime.fromisoformat(data["created_at"]),
+            datetime.fromisoformat(data["updated_at"]),
+        )
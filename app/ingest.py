@@ -0,0 +1,106 @@
+"""
+Bulk ingestion of an incident feed: replays a JSON-lines file of incident events
+through EmergencyManagement.ingest_batch, one allocation pass per batch.
+
+Each line is one event, for example:
+
+    {"op": "add_incident", "location": "Zone 1", "emergency_type": "fire", "priority": "HIGH", "required_resources": ["Fire Truck"]}
+    {"op": "update_incident", "incident_id": "...", "status": "RESOLVED"}
+
+Batches are applied in order and each is all-or-nothing: ingestion stops at the
+first batch with an invalid event, keeping the batches before it. The state is
+saved at the end.
+
+Run with:
+    python -m app.ingest events.jsonl --data-dir data
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from typing import Iterator, List, Tuple
+from app.utils import metrics
+from app.utils.emerg_management import EmergencyManagement, InvalidEventsError
+from app.utils.log import configure_logging
+
+
+def read_batches(path: str, batch_size: int) -> Iterator[Tuple[List[dict], List[int]]]:
+    """
+    Streams a JSON-lines file as batches of events.
+
+    Yields:
+        tuple: (events, the line number of each event). Blank lines are skipped.
+
+    Raises:
+        ValueError: If a line is not valid JSON (the message names the line).
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        numbered = ((number, line) for number, line in enumerate(file, 1) if line.strip())
+        while True:
+            chunk = list(itertools.islice(numbered, batch_size))
+            if not chunk:
+                return
+            events = []
+            for number, line in chunk:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {number}: {e}") from None
+            yield events, [number for number, _ in chunk]
+
+
+def ingest_file(management: EmergencyManagement, path: str, batch_size: int = 10_000) -> int:
+    """
+    Ingests a JSON-lines event file batch by batch.
+
+    Returns:
+        int: The number of events applied.
+
+    Raises:
+        ValueError: For a malformed line or an invalid event, naming its line.
+    """
+    applied = 0
+    for events, numbers in read_batches(path, batch_size):
+        try:
+            management.ingest_batch(events)
+        except InvalidEventsError as e:
+            details = "; ".join(f"line {numbers[index]}: {message}" for index, message in e.errors[:5])
+            raise ValueError(f"{len(e.errors)} invalid event(s) in the batch starting at line {numbers[0]}: "
+                             f"{details}") from None
+        applied += len(events)
+    return applied
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("events", help="JSON-lines file of incident events")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--metrics-file", help="Write Prometheus metrics for the run to this file")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--log-json", action="store_true", help="Log one JSON object per line")
+    args = parser.parse_args()
+    configure_logging(args.log_level.upper(), json_format=args.log_json, stream=sys.stderr)
+
+    if args.metrics_file:
+        metrics.enable()
+    management = EmergencyManagement(data_dir=args.data_dir, journal=True)
+    start = time.perf_counter()
+    try:
+        applied = ingest_file(management, args.events, args.batch_size)
+    except (OSError, ValueError) as e:
+        print(f"Ingestion stopped: {e}", file=sys.stderr)
+        applied = None
+    else:
+        elapsed = time.perf_counter() - start
+        print(f"Ingested {applied} events in {elapsed:.2f}s ({applied / max(elapsed, 1e-9):.0f} events/s).")
+    management.save_data()
+    management.close()
+    if args.metrics_file:
+        metrics.write_metrics(args.metrics_file)
+    if applied is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from app.utils.emerg_management import EmergencyManagement
+from app.utils.log import configure_logging
 # This is the main entry point for the emergency management system.
 
 if __name__ == "__main__":
-    emerg = EmergencyManagement() 
+    configure_logging(level="DEBUG")  # The menu shows every load/save message and the full allocation dump
+    emerg = EmergencyManagement(journal=True)  # Journal every change so a crash loses nothing
     emerg.run() 
\ No newline at end of file
@@ -1,6 +1,12 @@
 from enum import Enum, unique
 from functools import total_ordering
 
+_PRIORITY_ORDER = {  # Define explicit order for comparison (kept outside the Enum so it is not a member)
+    "high": 0,
+    "medium": 1,
+    "low": 2,
+}
+
 @unique  # Ensure no duplicate values
 @total_ordering  #  Provides all rich comparison methods if we define __lt__
 class Priority(Enum):
@@ -9,16 +15,13 @@ class Priority(Enum):
     MEDIUM = "medium"
     LOW = "low"
 
-    _PRIORITY_ORDER = {  # Define explicit order for comparison
-        "high": 0,
-        "medium": 1,
-        "low": 2,
-    }
+    def __init__(self, value):
+        self.order: int = _PRIORITY_ORDER[value]  # Numeric dispatch order (0 is the most urgent), set once per member
 
     def __lt__(self, other):
         """Define less than for priority comparison (HIGH < MEDIUM < LOW)."""
         if isinstance(other, Priority):
-            return self._PRIORITY_ORDER[self.value] < self._PRIORITY_ORDER[other.value]
+            return self.order < other.order
         return NotImplemented
 
     def __str__(self):
@@ -1,7 +1,9 @@
-import uuid
+import sys
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
+from app.utils.ids import new_id
+from app.utils.metrics import instrumented, timed
 
 class ResourceStatus(Enum):
     """Enum for resource status."""
@@ -15,9 +17,14 @@ class ResourceStatus(Enum):
     def __repr__(self):
         return f"<{self.__class__.__name__}.{self.name}: {self.value}>"
 
+@instrumented
 class Resource:
     """Class representing an emergency resource."""
 
+    # No per-instance __dict__, as for Incident
+    __slots__ = ("resource_id", "name", "resource_type", "location", "status",
+                 "assigned_incident_id", "created_at", "updated_at")
+
     def __init__(self,
                  name: str,
                  resource_type: str,
@@ -45,7 +52,7 @@ class Resource:
             updated_at (Optional[datetime], optional): The last update timestamp.
                 Defaults to None, which uses the current time.
         """
-        self.resource_id = resource_id if resource_id else str(uuid.uuid4())
+        self.resource_id = resource_id if resource_id else new_id()
         self.name = name
         self.resource_type = resource_type
         self.location = location
@@ -54,6 +61,8 @@ class Resource:
         self.created_at = created_at if created_at else datetime.now()
         self.updated_at = updated_at if updated_at else datetime.now()
         self._validate_inputs()
+        self.resource_type = sys.intern(self.resource_type)
+        self.location = sys.intern(self.location)
 
     def _validate_inputs(self):
         """Validates the input arguments."""
@@ -72,6 +81,42 @@ class Resource:
         if not isinstance(self.updated_at, datetime):
             raise ValueError("updated_at must be a datetime object.")
 
+    def copy(self) -> 'Resource':
+        """Returns an independent copy without re-validating it."""
+        clone = Resource.__new__(Resource)
+        clone.resource_id = self.resource_id
+        clone.name = self.name
+        clone.resource_type = self.resource_type
+        clone.location = self.location
+        clone.status = self.status
+        clone.assigned_incident_id = self.assigned_incident_id
+        clone.created_at = self.created_at
+        clone.updated_at = self.updated_at
+        return clone
+
+    @classmethod
+    def trusted(cls, resource_id: str, name: str, resource_type: str, location: str, status: ResourceStatus,
+                assigned_incident_id: Optional[str], created_at: datetime, updated_at: datetime) -> 'Resource':
+        """Builds a Resource from fields already known to be valid, as Incident.trusted does."""
+        resource = cls.__new__(cls)
+        resource.resource_id = resource_id
+        resource.name = name
+        resource.resource_type = sys.intern(resource_type)
+        resource.location = sys.intern(location)
+        resource.status = status
+        resource.assigned_incident_id = assigned_incident_id
+        resource.created_at = created_at
+        resource.updated_at = updated_at
+        return resource
+
+    def touch(self) -> None:
+        """
+        Stamps a change. updated_at always moves forward, even within the clock's
+        resolution, so it can serve as the resource's version.
+        """
+        now = datetime.now()
+        self.updated_at = now if now > self.updated_at else self.updated_at + timedelta(microseconds=1)
+
     def __str__(self) -> str:
         """Returns a user-friendly string representation of the resource."""
         return (f"Resource ID: {self.resource_id}\n"
@@ -90,6 +135,7 @@ class Resource:
                 f"status={self.status}, assigned_incident_id='{self.assigned_incident_id}', "
                 f"created_at={self.created_at}, updated_at={self.updated_at})")
 
+    @timed("resource_to_dict")
     def to_dict(self) -> dict:
         """Convert the Resource object to a dictionary."""
         return {
@@ -104,6 +150,7 @@ class Resource:
         }
 
     @classmethod
+    @timed("resource_from_dict")
     def from_dict(cls, data: dict) -> 'Resource':
         """Create a Resource object from a dictionary."""
         status_str = data.get("status")
@@ -121,4 +168,22 @@ class Resource:
             created_at=datetime.fromisoformat(data["created_at"]),
             updated_at=datetime.fromisoformat(data["updated_at"]),
         )
-    
+
+    @classmethod
+    @timed("resource_from_dict")
+    def from_trusted_dict(cls, data: dict) -> 'Resource':
+        """
+        Create a Resource from a dictionary this system wrote itself, skipping per-field
+        validation. Missing fields get the same defaults as from_dict (an absent or
+        unknown status is AVAILABLE).
+        """
+        return cls.trusted(
+            data["resource_id"] or new_id(),
+            data["name"],
+            data["resource_type"],
+            data["location"],
+            ResourceStatus.__members__.get(data.get("status"), ResourceStatus.AVAILABLE),
+            data.get("assigned_incident_id"),
+            datetime.fromisoformat(data["created_at"]),
+            datetime.fromisoformat(data["updated_at"]),
+        )
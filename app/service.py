@@ -0,0 +1,330 @@
+"""
+Asyncio dispatch service: the EmergencyManagement operations over a local TCP socket.
+
+Each request and response is one line of JSON:
+
+    {"id": 1, "op": "add_incident", "params": {"location": "Zone 1", ...}}
+    {"id": 1, "ok": true, "result": "<incident id>"}
+    {"id": 2, "ok": false, "error": "Unknown priority: URGENT"}
+
+Any number of dispatch consoles can connect and pipeline requests; responses
+carry the request id and may arrive out of order. All operations, reads included,
+go through one queue drained by a single writer task, so the shared state is only
+ever touched by one operation at a time.
+
+Run with:
+    python -m app.service --port 8765
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from app.incidents.emerg_incident import IncidentStatus
+from app.priorities.emerg_priority import Priority
+from app.resources.emerg_resource import ResourceStatus
+from app.utils.emerg_management import EmergencyManagement
+from app.utils import metrics
+from app.utils.log import configure_logging
+
+logger = logging.getLogger(__name__)
+
+STREAM_LIMIT = 16 * 2 ** 20  # Longest request or response line, in bytes
+
+
+def _enum(enum_type, name: Optional[str]):
+    """Looks up an enum member by name, with a readable error."""
+    if name is None:
+        return None
+    try:
+        return enum_type[name]
+    except KeyError:
+        raise ValueError(f"Unknown {enum_type.__name__.lower()}: {name}") from None
+
+
+class DispatchService:
+    """Serves one EmergencyManagement to many concurrent socket clients."""
+
+    def __init__(self, management: EmergencyManagement, max_batch: int = 256):
+        """
+        Initializes the service.
+
+        Args:
+            management (EmergencyManagement): The shared system.
+            max_batch (int, optional): The most queued operations the writer runs
+                per hand-off to its worker thread. Defaults to 256.
+        """
+        self.management = management
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        # Operations may block on disk (journal fsync, snapshots), so they run off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dispatch-writer")
+        self._operations = {
+            "add_incident": self._add_incident,
+            "update_incident": self._update_incident,
+            "allocate_resource": self._allocate_resource,
+            "release_resource": self._release_resource,
+            "reallocate_resource": self._reallocate_resource,
+            "update_resource_status": self._update_resource_status,
+            "process_allocation": self._process_allocation,
+            "active_incidents": self._active_incidents,
+            "report": self._report,
+            "resources": self._resources,
+            "save": self._save,
+            "metrics": self._metrics,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> int:
+        """
+        Starts the writer task and listens for connections.
+
+        Returns:
+            int: The port listened on (useful with port=0).
+        """
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=STREAM_LIMIT)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self, save: bool = True) -> None:
+        """Stops accepting connections, finishes queued operations and optionally saves."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self._connections):
+            writer.close()
+        if self._queue is not None:
+            await self._queue.join()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        loop = asyncio.get_running_loop()
+        if save:
+            await loop.run_in_executor(self._executor, self.management.save_data)
+        await loop.run_in_executor(self._executor, self.management.close)
+        self._executor.shutdown()
+
+    async def submit(self, op: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Queues an operation for the writer and waits for its result.
+
+        Raises:
+            ValueError: If the operation is unknown or its parameters are invalid.
+            KeyError, TypeError: If the parameters do not match the operation.
+        """
+        if op not in self._operations:
+            raise ValueError(f"Unknown operation: {op}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, params or {}, future))
+        return await future
+
+    async def _writer(self) -> None:
+        """The single writer: runs queued operations in order, a batch per worker-thread hop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            outcomes = await loop.run_in_executor(self._executor, self._run_batch, batch)
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                if not future.done():
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+                self._queue.task_done()
+
+    def _run_batch(self, batch: List[tuple]) -> List[Tuple[bool, Any]]:
+        outcomes = []
+        for op, params, _ in batch:
+            try:
+                outcomes.append((True, self._operations[op](**params)))
+            except Exception as e:  # Reported to the client that sent the request
+                outcomes.append((False, e))
+        return outcomes
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Reads pipelined requests from one console and answers each as it completes."""
+        self._connections.add(writer)
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = await self.submit(request["op"], request.get("params"))
+            response = {"id": request_id, "ok": True, "result": result}
+        except Exception as e:
+            response = {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    # Operations, run on the writer thread only
+
+    def _add_incident(self, location: str, emergency_type: str, priority: str, required_resources: List[str]) -> str:
+        return self.management.add_incident(location, emergency_type, _enum(Priority, priority), required_resources)
+
+    def _update_incident(self, incident_id: str, location: Optional[str] = None,
+                         emergency_type: Optional[str] = None, priority: Optional[str] = None,
+                         required_resources: Optional[List[str]] = None, status: Optional[str] = None) -> bool:
+        return self.management.update_incident(
+            incident_id, location, emergency_type, _enum(Priority, priority), required_resources,
+            _enum(IncidentStatus, status),
+        )
+
+    def _allocate_resource(self, incident_id: str, resource_id: str) -> bool:
+        return self.management.allocate_resource(incident_id, resource_id)
+
+    def _release_resource(self, resource_id: str) -> bool:
+        return self.management.release_resource(resource_id)
+
+    def _reallocate_resource(self, incident_id: str, resource_id: str) -> bool:
+        return self.management.reallocate_resource(incident_id, resource_id)
+
+    def _update_resource_status(self, resource_id: str, status: str) -> bool:
+        return self.management.update_resource_status(resource_id, _enum(ResourceStatus, status))
+
+    def _process_allocation(self) -> None:
+        self.management.process_resource_allocation()
+
+    def _active_incidents(self) -> List[dict]:
+        return [incident.to_dict() for incident in self.management.get_active_incidents()]
+
+    def _report(self, start: int = 0, count: int = 100) -> List[dict]:
+        return [incident.to_dict() for incident in self.management.page_incidents(start, count)]
+
+    def _resources(self, resource_type: Optional[str] = None) -> List[dict]:
+        return [resource.to_dict() for resource in self.management.view_resources(resource_type)]
+
+    def _save(self) -> None:
+        self.management.save_data()
+
+    def _metrics(self) -> str:
+        return metrics.render()
+
+
+class DispatchClient:
+    """Async client for DispatchService; requests may be pipelined over one connection."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> "DispatchClient":
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=STREAM_LIMIT)
+        self._reader_task = asyncio.create_task(self._read_responses())
+        return self
+
+    async def request(self, op: str, **params) -> Any:
+        """
+        Sends one request and waits for its result.
+
+        Raises:
+            RuntimeError: With the service's message if the operation failed.
+            ConnectionError: If the connection closes before the response arrives.
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(json.dumps({"id": request_id, "op": op, "params": params}).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if response["ok"]:
+                    future.set_result(response.get("result"))
+                else:
+                    future.set_exception(RuntimeError(response.get("error")))
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the dispatch service closed"))
+            self._waiting.clear()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+
+async def serve(host: str, port: int, data_dir: str, metrics_port: Optional[int] = None) -> None:
+    """Runs the service until cancelled (e.g. Ctrl+C), then saves."""
+    if metrics_port is not None:
+        metrics.start_metrics_server(metrics_port, host)
+    # The metrics server scrapes the state gauges from its own thread
+    management = EmergencyManagement(data_dir=data_dir, journal=True, thread_safe=metrics_port is not None)
+    service = DispatchService(management)
+    port = await service.start(host, port)
+    logger.info("Dispatch service listening on %s:%d", host, port, extra={"event": "service_started", "port": port})
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Emergency dispatch service (JSON lines over TCP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on GET /metrics at this port")
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument("--log-json", action="store_true", help="Log one JSON object per line")
+    args = parser.parse_args()
+    configure_logging(args.log_level.upper(), json_format=args.log_json)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.metrics_port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
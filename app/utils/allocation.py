@@ -0,0 +1,248 @@
+import heapq
+import itertools
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.incidents.emerg_incident import Incident
+from app.resources.emerg_resource import ResourceStatus
+from app.utils.dispatch_queue import ACTIVE_STATUSES
+
+Rank = Tuple[int, float, int]
+
+
+class IncrementalAllocator:
+    """
+    Keeps resource assignments equal to what a full greedy allocation pass would
+    produce, while only touching the incident that changed and any lower-priority
+    incidents it preempts.
+
+    Incidents are ranked by the dispatch queue's (tier, value, arrival sequence) key, which is the same order the full pass visits them in. For every resource type two heaps are kept:
+
+    - waiting: incidents with unmet demand for the type, most urgent first.
+    - served: incidents holding a unit of the type, least urgent first.
+
+    Heap entries are never removed eagerly; they are validated against the live
+    incident when they reach the top (lazy deletion).
+
+    Units are moved with the manager's _assign / _release / _reassign primitives;
+    the public allocate_resource, release_resource and reallocate_resource resync
+    the heaps through rebalance and resource_freed afterwards. Units in the
+    manager's manual_holds were placed by a dispatcher: they count towards their
+    incident's demand but are never handed back, taken over or preempted.
+    """
+
+    def __init__(self, manager):
+        """
+        Initializes the allocator.
+
+        Args:
+            manager (EmergencyManagement): The system whose incidents and
+                resources are being allocated.
+        """
+        self.manager = manager
+        self._waiting: Dict[str, List[tuple]] = {}
+        self._served: Dict[str, List[tuple]] = {}
+
+    def rank(self, incident_id: str, incident: Incident) -> Rank:
+        """Returns the dispatch rank of an incident (lower is more urgent)."""
+        return self.manager.dispatch_queue.rank(incident_id, incident)
+
+    def rebuild(self) -> None:
+        """Rebuilds the heaps from the current state without moving any resources."""
+        waiting: Dict[str, List[tuple]] = {}
+        served: Dict[str, List[tuple]] = {}
+        incidents = self.manager.incidents
+        for incident_id, (tier, value, seq) in self.manager.dispatch_queue.ranked():  # Only active incidents
+            incident = incidents[incident_id]
+            if not incident.assigned_resources:  # The common case: waiting for everything it requires
+                for resource_type in set(incident.required_resources):
+                    waiting.setdefault(resource_type, []).append((tier, value, seq, incident_id))
+                continue
+            demand = Counter(incident.required_resources)
+            held = self._held(incident)
+            for resource_type in set(demand) | set(held):
+                if held.get(resource_type):
+                    served.setdefault(resource_type, []).append((-tier, -value, -seq, incident_id))
+                if len(held.get(resource_type, [])) < demand.get(resource_type, 0):
+                    waiting.setdefault(resource_type, []).append((tier, value, seq, incident_id))
+        for heap in itertools.chain(waiting.values(), served.values()):
+            heapq.heapify(heap)  # O(n), rather than a push per entry
+        self._waiting = waiting
+        self._served = served
+
+    def refresh(self, incident_ids: Iterable[str]) -> None:
+        """
+        Brings the heaps up to date after a full allocation pass, touching only what changed.
+
+        The served heaps are rebuilt from the units now assigned (bounded by the fleet),
+        and waiting entries are pushed for the given incidents; entries for every other
+        incident are still valid or are discarded lazily. Falls back to rebuild once
+        stale entries outnumber the live ones.
+
+        Args:
+            incident_ids (Iterable[str]): Every incident that changed, or held a unit,
+                since the heaps were last in sync.
+        """
+        queue = self.manager.dispatch_queue
+        if any(len(heap) > 2 * len(queue) + 64 for heap in self._waiting.values()):
+            self.rebuild()
+            return
+        incidents = self.manager.incidents
+        holders = {
+            resource.assigned_incident_id for resource in self.manager.resources.values()
+            if resource.status == ResourceStatus.ASSIGNED and resource.assigned_incident_id in queue
+        }
+        self._served.clear()
+        for incident_id in holders:
+            incident = incidents[incident_id]
+            for resource_type in self._held(incident):
+                self._push_served(resource_type, incident_id, incident)
+        for incident_id in set(incident_ids) | holders:
+            if incident_id not in queue:
+                continue
+            incident = incidents[incident_id]
+            held = self._held(incident)
+            for resource_type, needed in Counter(incident.required_resources).items():
+                if len(held.get(resource_type, [])) < needed:
+                    self._push_waiting(resource_type, incident_id, incident)
+
+    def rebalance(self, incident_id: str) -> None:
+        """
+        Brings the allocation back in line after a single incident was added or changed.
+
+        Args:
+            incident_id (str): The ID of the incident that changed.
+        """
+        incident = self.manager.incidents.get(incident_id)
+        if incident is None:
+            return
+        held = self._held(incident)
+
+        if incident.status not in ACTIVE_STATUSES:
+            for resource_ids in held.values():
+                for resource_id in resource_ids:
+                    self.manager._release(resource_id)
+                    self.resource_freed(resource_id)
+            return
+
+        demand = Counter(incident.required_resources)
+        rank = self.rank(incident_id, incident)
+        pinned = self.manager.manual_holds
+        for resource_type in set(held) | set(demand):
+            resource_ids = held.get(resource_type, [])
+            needed = demand.get(resource_type, 0)
+            movable = [resource_id for resource_id in resource_ids if resource_id not in pinned]
+
+            # Hand back units the incident no longer requires.
+            while len(resource_ids) > needed and movable:
+                resource_id = movable.pop()
+                resource_ids.remove(resource_id)
+                self.manager._release(resource_id)
+                self.resource_freed(resource_id)
+
+            # After a priority drop, more urgent waiting incidents take units over.
+            while movable:
+                waiting = self._peek(self._waiting, resource_type, self._is_waiting)
+                if waiting is None or waiting[:3] >= rank:
+                    break
+                resource_id = movable.pop()
+                resource_ids.remove(resource_id)
+                self._move(resource_id, resource_type, waiting[3])
+
+            # Fill unmet demand, preempting less urgent incidents when nothing is free.
+            missing = needed - len(resource_ids)
+            while missing > 0:
+                resource_id = self.manager.find_available_resource(resource_type, incident.location)
+                if resource_id is not None:
+                    self.manager._assign(incident_id, resource_id)
+                else:
+                    victim = self._peek(self._served, resource_type, self._is_served)
+                    if victim is None or self._unnegate(victim) <= rank:
+                        break
+                    victim_incident = self.manager.incidents[victim[3]]
+                    resource_id = self._movable(victim_incident, resource_type)[-1]
+                    self.manager._reassign(incident_id, resource_id)
+                    self._push_waiting(resource_type, victim[3], victim_incident)
+                resource_ids.append(resource_id)
+                missing -= 1
+
+            if resource_ids:
+                self._push_served(resource_type, incident_id, incident)
+            if missing > 0:
+                self._push_waiting(resource_type, incident_id, incident)
+
+    def resource_freed(self, resource_id: str) -> None:
+        """
+        Offers a newly available resource to the most urgent incident waiting for its type.
+
+        Args:
+            resource_id (str): The ID of the resource that became available.
+        """
+        resource = self.manager.resources.get(resource_id)
+        if resource is None or resource.status != ResourceStatus.AVAILABLE:
+            return
+        waiting = self._peek(self._waiting, resource.resource_type, self._is_waiting)
+        if waiting is not None:
+            incident_id = waiting[3]
+            self.manager._assign(incident_id, resource_id)
+            self._push_served(resource.resource_type, incident_id, self.manager.incidents[incident_id])
+
+    def _move(self, resource_id: str, resource_type: str, incident_id: str) -> None:
+        """Reallocates a unit to a waiting incident and records it as served."""
+        self.manager._reassign(incident_id, resource_id)
+        self._push_served(resource_type, incident_id, self.manager.incidents[incident_id])
+
+    def _held(self, incident: Incident) -> Dict[str, List[str]]:
+        """Groups the resources assigned to an incident by resource type."""
+        held: Dict[str, List[str]] = {}
+        for resource_id in incident.assigned_resources:
+            resource = self.manager.resources.get(resource_id)
+            if resource is not None:
+                held.setdefault(resource.resource_type, []).append(resource_id)
+        return held
+
+    def _movable(self, incident: Incident, resource_type: str) -> List[str]:
+        """The units of a type an incident holds that the allocator may take away (not manual holds)."""
+        pinned = self.manager.manual_holds
+        return [resource_id for resource_id in self._held(incident).get(resource_type, [])
+                if resource_id not in pinned]
+
+    def _push_waiting(self, resource_type: str, incident_id: str, incident: Incident) -> None:
+        heapq.heappush(self._waiting.setdefault(resource_type, []), (*self.rank(incident_id, incident), incident_id))
+
+    def _push_served(self, resource_type: str, incident_id: str, incident: Incident) -> None:
+        tier, value, seq = self.rank(incident_id, incident)
+        heapq.heappush(self._served.setdefault(resource_type, []), (-tier, -value, -seq, incident_id))
+
+    @staticmethod
+    def _unnegate(entry: tuple) -> Rank:
+        """Recovers the rank from a served-heap entry."""
+        return -entry[0], -entry[1], -entry[2]
+
+    def _is_waiting(self, entry: tuple, resource_type: str) -> bool:
+        incident = self._live(entry[3], entry[:3])
+        if incident is None:
+            return False
+        needed = incident.required_resources.count(resource_type)
+        return len(self._held(incident).get(resource_type, [])) < needed
+
+    def _is_served(self, entry: tuple, resource_type: str) -> bool:
+        incident = self._live(entry[3], self._unnegate(entry))
+        return incident is not None and bool(self._movable(incident, resource_type))
+
+    def _live(self, incident_id: str, rank: Rank) -> Optional[Incident]:
+        """Returns the incident if it is still active and ranked as recorded."""
+        incident = self.manager.incidents.get(incident_id)
+        if incident is None or incident.status not in ACTIVE_STATUSES:
+            return None
+        if self.rank(incident_id, incident) != rank:
+            return None
+        return incident
+
+    def _peek(self, heaps, resource_type: str, is_valid) -> Optional[tuple]:
+        """Discards stale entries and returns the top valid entry without removing it."""
+        heap = heaps.get(resource_type)
+        while heap:
+            if is_valid(heap[0], resource_type):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
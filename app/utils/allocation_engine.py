@@ -0,0 +1,364 @@
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from app.priorities.emerg_priority import Priority
+from app.utils.utils import distance_matrix
+
+try:  # NumPy is optional; the solver falls back to pure Python without it
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class AllocationBudgetExceeded(Exception):
+    """Raised inside a solver when its time budget runs out."""
+
+
+class GreedyAllocationEngine:
+    """
+    First-fit allocation: active incidents are visited most urgent first and each
+    requirement takes whatever unit find_available_resource offers (the nearest
+    one in proximity mode). This is the allocation the incremental allocator
+    maintains between full passes.
+    """
+
+    def allocate(self, manager) -> None:
+        """
+        Assigns available units to the active incidents of a system.
+
+        Args:
+            manager (EmergencyManagement): The system, with assignments already reset.
+        """
+        for incident_id in manager.dispatch_queue.in_order():
+            if not manager.resource_index.total_available():
+                break  # The fleet is exhausted
+            incident = manager.incidents[incident_id]
+            for required_resource_type in manager._unmet_requirements(incident):  # Manual holds stay in place
+                resource_id = manager.find_available_resource(required_resource_type, incident.location)
+                if resource_id is not None:
+                    manager._assign(incident_id, resource_id)
+
+
+class MinCostAllocationEngine:
+    """
+    Globally optimal allocation by min-cost flow, solved separately per resource type.
+
+    Requirements are grouped by (incident zone, dispatch tier) and available units by
+    zone, so the flow network has one node per group rather than per incident or unit.
+    The tier is the first element of the dispatch queue's rank: the priority under
+    the default StrictPriority policy, the same for every incident under AgingPolicy.
+    Each served requirement earns a bonus for its tier that outweighs any possible
+    difference in total distance, so more urgent tiers are always served first
+    (as in the greedy pass). Among those allocations, the total haversine distance
+    between incident and unit zones is minimized. Within a group, incidents are
+    served in dispatch order.
+
+    Under a policy that ages (AgingPolicy), the rank's value is the urgency within a
+    tier, so requirements are grouped by (zone, tier, value) and each served one also
+    earns a bonus for its value: from nothing for the least urgent incident to one
+    longest trip for the most urgent. Waiting then outweighs up to that much extra
+    distance per unit, but never the tier bonus.
+
+    If the solver runs past time_budget seconds, the greedy allocation is used
+    instead and fell_back is set.
+    """
+
+    def __init__(self, time_budget: float = 1.0):
+        """
+        Initializes the engine.
+
+        Args:
+            time_budget (float, optional): Seconds allowed for planning before
+                falling back to greedy. Defaults to 1.0.
+        """
+        self.time_budget = time_budget
+        self.fell_back = False
+
+    def allocate(self, manager) -> None:
+        """
+        Assigns available units to the active incidents of a system.
+
+        Args:
+            manager (EmergencyManagement): The system, with assignments already reset.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        try:
+            plan = self.plan(manager, deadline)
+        except AllocationBudgetExceeded:
+            self.fell_back = True
+            GreedyAllocationEngine().allocate(manager)
+            return
+        self.fell_back = False
+        for incident_id, resource_id in plan:
+            manager._assign(incident_id, resource_id)
+
+    def plan(self, manager, deadline: float = math.inf) -> List[Tuple[str, str]]:
+        """
+        Computes the optimal allocation without applying it.
+
+        Returns:
+            List[Tuple[str, str]]: (incident_id, resource_id) pairs.
+
+        Raises:
+            AllocationBudgetExceeded: If the deadline (a time.perf_counter() value) passes.
+        """
+        # resource_type -> (zone, tier, value) -> incident IDs, one entry per required unit, in dispatch order
+        demand: Dict[str, Dict[Tuple[str, int, float], List[str]]] = {}
+        queue = manager.dispatch_queue
+        ages = getattr(queue.policy, "ages", False)
+        for incident_id in queue.in_order():
+            incident = manager.incidents[incident_id]
+            tier, value, _ = queue.rank(incident_id, incident)
+            for resource_type in manager._unmet_requirements(incident):
+                slots = demand.setdefault(resource_type, {})
+                slots.setdefault((incident.location, tier, value if ages else 0.0), []).append(incident_id)
+
+        plan: List[Tuple[str, str]] = []
+        for resource_type, slots in demand.items():
+            units: Dict[str, List[str]] = {}
+            for resource_id in manager.resource_index.available(resource_type):
+                units.setdefault(manager.resources[resource_id].location, []).append(resource_id)
+            if not units:
+                continue
+            groups = list(slots)
+            zones = list(units)
+            costs = self._zone_costs(manager, [zone for zone, _, _ in groups], zones)
+            flows = min_cost_transport(
+                demand=[len(slots[group]) for group in groups],
+                supply=[len(units[zone]) for zone in zones],
+                costs=costs,
+                tiers=[tier for _, tier, _ in groups],
+                deadline=deadline,
+                values=[value for _, _, value in groups] if ages else None,
+            )
+            served = [0] * len(groups)
+            for (group_index, zone_index), amount in sorted(flows.items()):
+                incident_ids = slots[groups[group_index]]
+                resource_ids = units[zones[zone_index]]
+                for _ in range(amount):
+                    plan.append((incident_ids[served[group_index]], resource_ids.pop()))
+                    served[group_index] += 1
+        return plan
+
+    @staticmethod
+    def _zone_costs(manager, incident_zones: List[str], unit_zones: List[str]) -> List[List[float]]:
+        """
+        Distances in km between zones, computed in one batch.
+
+        Pairs involving an unmapped zone cost as much as the farthest mapped pair
+        (or 0 within the same zone), so such units are still used, but last.
+        """
+        coordinates = manager.location_mapping
+        origins = [zone for zone in dict.fromkeys(incident_zones) if zone in coordinates]
+        destinations = [zone for zone in dict.fromkeys(unit_zones) if zone in coordinates]
+        known: Dict[Tuple[str, str], float] = {}
+        if origins and destinations:
+            matrix = distance_matrix([coordinates[zone] for zone in origins],
+                                     [coordinates[zone] for zone in destinations])
+            rows = matrix.tolist() if hasattr(matrix, "tolist") else matrix
+            for origin, row in zip(origins, rows):
+                for destination, distance in zip(destinations, row):
+                    known[origin, destination] = distance
+        unknown = max(known.values(), default=0.0)
+        return [
+            [0.0 if origin == destination else known.get((origin, destination), unknown) for destination in unit_zones]
+            for origin in incident_zones
+        ]
+
+
+def min_cost_transport(
+    demand: List[int],
+    supply: List[int],
+    costs: List[List[float]],
+    tiers: List[int],
+    deadline: float = math.inf,
+    values: Optional[List[float]] = None,
+) -> Dict[Tuple[int, int], int]:
+    """
+    Solves a transportation problem with priority tiers by successive shortest paths.
+
+    Moves as many units as possible from supply nodes to demand nodes. Demand in a
+    lower tier (more urgent) is always served before demand in a higher one, and
+    the total cost is minimized subject to that. Shortest paths are found with
+    vectorized Bellman-Ford when NumPy is installed, and with Dijkstra otherwise.
+
+    Args:
+        demand (List[int]): Units wanted by each demand node.
+        supply (List[int]): Units available at each supply node.
+        costs (List[List[float]]): Non-negative cost per unit from supply j to demand i, as costs[i][j].
+        tiers (List[int]): Priority order of each demand node (0 is most urgent).
+        deadline (float, optional): time.perf_counter() value after which
+            AllocationBudgetExceeded is raised. Defaults to no limit.
+        values (Optional[List[float]], optional): Urgency of each demand node within
+            its tier (lower is more urgent). Each unit served earns a bonus from 0 for
+            the least urgent node to the largest cost plus 1 for the most urgent.
+            Defaults to None, no bonus.
+
+    Returns:
+        Dict[Tuple[int, int], int]: Units moved, keyed by (demand index, supply index).
+    """
+    groups, sources = len(demand), len(supply)
+    if not groups or not sources:
+        return {}
+    largest = max((cost for row in costs for cost in row), default=0.0)
+    # A bonus per unit for urgency within a tier, bounded by one longest trip
+    bonus = [0.0] * groups
+    if values is not None and max(values) > min(values):
+        reach, least, spread = largest + 1.0, max(values), max(values) - min(values)
+        bonus = [reach * (least - value) / spread for value in values]
+    # A bonus per tier larger than any achievable difference in total cost and urgency bonus
+    step = (largest + max(bonus)) * min(sum(demand), sum(supply)) + 1.0
+    worst = max(len(Priority), max(tiers) + 1)
+    edge = [[costs[i][j] - bonus[i] - (worst - tiers[i]) * step for j in range(sources)] for i in range(groups)]
+    if np is not None:
+        return _transport_numpy(demand, supply, np.array(edge, dtype=float), deadline)
+    return _transport_python(demand, supply, edge, deadline)
+
+
+def _transport_python(
+    demand: List[int], supply: List[int], edge: List[List[float]], deadline: float
+) -> Dict[Tuple[int, int], int]:
+    """Successive shortest paths with Dijkstra on reduced costs (edge costs may be negative)."""
+    groups, sources = len(demand), len(supply)
+    flow = [[0] * sources for _ in range(groups)]
+    wanted = list(demand)  # Residual capacity source -> demand node
+    left = list(supply)  # Residual capacity supply node -> sink
+    # Potentials (shortest distances from the source); the initial network is acyclic
+    potential_group = [0.0] * groups
+    potential_unit = [min(edge[i][j] for i in range(groups)) for j in range(sources)]
+    potential_sink = min(potential_unit)
+    nodes = groups + sources
+
+    while True:
+        if time.perf_counter() > deadline:
+            raise AllocationBudgetExceeded()
+        # Dijkstra on reduced costs over demand nodes [0, groups) and supply nodes [groups, nodes)
+        distance = [math.inf] * nodes
+        parent: List[Optional[int]] = [None] * nodes  # None: reached straight from the source
+        for i in range(groups):
+            if wanted[i] > 0:
+                distance[i] = -potential_group[i]
+        done = [False] * nodes
+        sink_distance, sink_parent = math.inf, -1
+        while True:
+            node, best = -1, math.inf
+            for candidate in range(nodes):
+                if not done[candidate] and distance[candidate] < best:
+                    node, best = candidate, distance[candidate]
+            if node < 0 or best >= sink_distance:
+                break
+            done[node] = True
+            if node < groups:  # Demand node: forward edges to every supply node
+                row, base = edge[node], best + potential_group[node]
+                for j in range(sources):
+                    candidate = base + row[j] - potential_unit[j]
+                    if candidate < distance[groups + j] and not done[groups + j]:
+                        distance[groups + j], parent[groups + j] = candidate, node
+            else:  # Supply node: to the sink, and back along edges that carry flow
+                j = node - groups
+                base = best + potential_unit[j]
+                if left[j] > 0 and base - potential_sink < sink_distance:
+                    sink_distance, sink_parent = base - potential_sink, j
+                for i in range(groups):
+                    if flow[i][j] > 0:
+                        candidate = base - edge[i][j] - potential_group[i]
+                        if candidate < distance[i] and not done[i]:
+                            distance[i], parent[i] = candidate, node
+        if sink_parent < 0:
+            break
+
+        # Trace the path back from the sink, then push the bottleneck amount along it
+        path: List[Tuple[int, int]] = []  # (demand index, supply index) per forward edge
+        j = sink_parent
+        amount = left[j]
+        while True:
+            i = parent[groups + j]
+            path.append((i, j))
+            previous = parent[i]
+            if previous is None:
+                amount = min(amount, wanted[i])
+                break
+            j = previous - groups
+            amount = min(amount, flow[i][j])  # Backward edge i -> j undoes flow j -> i
+        for step_index, (i, j) in enumerate(path):
+            flow[i][j] += amount
+            if step_index + 1 < len(path):
+                flow[i][path[step_index + 1][1]] -= amount
+        wanted[path[-1][0]] -= amount
+        left[sink_parent] -= amount
+
+        for index in range(nodes):
+            shift = min(distance[index], sink_distance)
+            if index < groups:
+                potential_group[index] += shift
+            else:
+                potential_unit[index - groups] += shift
+        potential_sink += sink_distance
+
+    return {(i, j): flow[i][j] for i in range(groups) for j in range(sources) if flow[i][j] > 0}
+
+
+def _transport_numpy(
+    demand: List[int], supply: List[int], edge: "np.ndarray", deadline: float
+) -> Dict[Tuple[int, int], int]:
+    """
+    Successive shortest paths with Bellman-Ford, relaxing all demand -> supply and
+    supply -> demand edges at once as (groups x supply) array operations.
+    """
+    groups, sources = edge.shape
+    flow = np.zeros((groups, sources), dtype=np.int64)
+    wanted = np.array(demand, dtype=np.int64)
+    left = np.array(supply, dtype=np.int64)
+    columns, rows = np.arange(sources), np.arange(groups)
+    tolerance = 1e-9 * max(1.0, float(np.abs(edge).max()))
+
+    while True:
+        if time.perf_counter() > deadline:
+            raise AllocationBudgetExceeded()
+        distance_group = np.where(wanted > 0, 0.0, np.inf)
+        parent_group = np.full(groups, -1)  # -1: reached straight from the source
+        distance_unit = np.full(sources, np.inf)
+        parent_unit = np.full(sources, -1)
+        backward = np.where(flow > 0, -edge, np.inf)  # Undoing flow j -> i costs -edge[i, j]
+        for _ in range(groups + sources):
+            forward = distance_group[:, None] + edge
+            best_group = forward.argmin(axis=0)
+            candidate = forward[best_group, columns]
+            improved = candidate < distance_unit - tolerance
+            distance_unit = np.where(improved, candidate, distance_unit)
+            parent_unit = np.where(improved, best_group, parent_unit)
+
+            back = distance_unit[None, :] + backward
+            best_unit = back.argmin(axis=1)
+            candidate = back[rows, best_unit]
+            improved_group = candidate < distance_group - tolerance
+            distance_group = np.where(improved_group, candidate, distance_group)
+            parent_group = np.where(improved_group, best_unit, parent_group)
+            if not improved.any() and not improved_group.any():
+                break
+        to_sink = np.where(left > 0, distance_unit, np.inf)
+        j = int(to_sink.argmin())
+        if not np.isfinite(to_sink[j]):
+            break
+
+        # Trace the path back from the sink, then push the bottleneck amount along it
+        path: List[Tuple[int, int]] = []
+        amount = int(left[j])
+        sink_parent = j
+        while True:
+            i = int(parent_unit[j])
+            path.append((i, j))
+            previous = int(parent_group[i])
+            if previous < 0:
+                amount = min(amount, int(wanted[i]))
+                break
+            j = previous
+            amount = min(amount, int(flow[i, j]))
+        for step_index, (i, j) in enumerate(path):
+            flow[i, j] += amount
+            if step_index + 1 < len(path):
+                flow[i, path[step_index + 1][1]] -= amount
+        wanted[path[-1][0]] -= amount
+        left[sink_parent] -= amount
+
+    return {(int(i), int(j)): int(flow[i, j]) for i, j in zip(*np.nonzero(flow))}
@@ -1,13 +1,139 @@
+import hashlib
 import json
+import logging
+import mmap
 import os
-from typing import Dict, Any
-from app.incidents.emerg_incident import Incident
-from app.resources.emerg_resource import Resource
+import re
+import struct
+import sys
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, Any, Iterable, Iterator, List, Mapping, Optional, Tuple
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+from app.utils.ids import is_ulid, ulid_from_bytes, ulid_to_bytes
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "emergency-snapshot"
+SNAPSHOT_VERSION = 1
+HEADER_WIDTH = 160  # Fixed so the header can be rewritten in place once the checksum is known
+
+
+# The serialized tail of an incident (see Incident.to_dict) holds only enum names and ISO
+# timestamps, so its status can be read without parsing the whole record
+_INCIDENT_STATUS_TAIL = re.compile(rb'"status": "(\w+)", "created_at": "[^"]*", "updated_at": "[^"]*"\}')
+
+
+class SnapshotCorruptError(ValueError):
+    """Raised when a snapshot's checksum or structure does not match its header."""
+
+
+class LegacySnapshotError(ValueError):
+    """
+    Raised when a file predates the layout lazy loading needs: plain JSON without a
+    snapshot header, or a version 1 binary snapshot without record tables.
+    """
+
+
+def previous_generation_path(file_path: str) -> str:
+    """Returns the path of the generation kept from the previous save."""
+    return file_path + ".prev"
+
+
+def _fsync_directory(directory: str) -> None:
+    """Makes renames in a directory durable (not supported on every platform)."""
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _header(checksum: str, records: int) -> bytes:
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "sha256": checksum,
+        "records": records,
+    }).encode("utf-8")
+    return header.ljust(HEADER_WIDTH - 1) + b"\n"
+
+
+def _write_atomically(file_path: str, data_name: str, write: Callable[[BinaryIO], None]) -> None:
+    """
+    Has write() fill a temporary file, fsyncs it and atomically renames it over
+    file_path; the file it replaces is kept as the previous generation.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)  # Ensure directory exists
+    temp_path = f"{file_path}.tmp.{os.getpid()}"
+    try:
+        with open(temp_path, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            os.replace(file_path, previous_generation_path(file_path))
+        os.replace(temp_path, file_path)
+        _fsync_directory(directory)
+        logger.info("Successfully saved %s to %s", data_name, file_path)
+    except (IOError, OSError) as e:
+        logger.error("Error saving %s to %s: %s", data_name, file_path, e)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise  # Re-raise to allow caller to handle or log
+
+
+def save_records_to_file(records: Iterable[Tuple[str, Any]], file_path: str, data_name: str = "data") -> None:
+    """
+    Streams (key, value) records into a crash-safe snapshot file.
+
+    The snapshot is a fixed-width header line holding a SHA-256 checksum of the
+    body, followed by a JSON object with one record per line. It is written to a
+    temporary file, fsynced and atomically renamed over the target; the file it
+    replaces is kept as the previous generation to fall back on.
+
+    Args:
+        records (Iterable[Tuple[str, Any]]): The records to save. Only one record
+            is held in memory at a time.
+        file_path (str): The path to the file.
+        data_name (str, optional): A descriptive name for the data (for logging).
+            Defaults to "data".
+    """
+    def write(f: BinaryIO) -> None:
+        digest = hashlib.sha256()
+        count = 0
+        f.write(_header("0" * 64, 0))  # Placeholder, rewritten below
+        separator = b"{\n"
+        for key, value in records:
+            line = separator + json.dumps(key).encode("utf-8") + b": " + json.dumps(value).encode("utf-8")
+            digest.update(line)
+            f.write(line)
+            separator = b",\n"
+            count += 1
+        tail = b"{\n}\n" if count == 0 else b"\n}\n"
+        digest.update(tail)
+        f.write(tail)
+        f.seek(0)
+        f.write(_header(digest.hexdigest(), count))
+
+    _write_atomically(file_path, data_name, write)
 
 
 def save_data_to_file(data: Dict[str, Any], file_path: str, data_name: str = "data") -> None:
     """
-    Saves a dictionary to a JSON file.
+    Saves a dictionary to a crash-safe JSON snapshot file.
 
     Args:
         data (dict): The data to save.
@@ -15,18 +141,50 @@ def save_data_to_file(data: Dict[str, Any], file_path: str, data_name: str = "da
         data_name (str, optional): A descriptive name for the data (for logging).
             Defaults to "data".
     """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Ensure directory exists
+    save_records_to_file(data.items(), file_path, data_name)
+
+
+def _parse_header(first_line: bytes) -> Optional[dict]:
+    """Returns the snapshot header, or None if the line is not one."""
     try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"Successfully saved {data_name} to {file_path}")
-    except (IOError, OSError) as e:
-        print(f"Error saving {data_name} to {file_path}: {e}")
-        raise  # Re-raise to allow caller to handle or log
+        candidate = json.loads(first_line)
+    except ValueError:
+        return None
+    if isinstance(candidate, dict) and candidate.get("format") == SNAPSHOT_FORMAT:
+        return candidate
+    return None
+
+
+def _read_snapshot(file_path: str) -> Dict[str, Any]:
+    """
+    Reads and verifies one snapshot file. Plain JSON files written before
+    snapshots had a header are still accepted.
+
+    Raises:
+        SnapshotCorruptError: If the checksum does not match the body.
+        json.JSONDecodeError: If the file contains invalid JSON.
+    """
+    with open(file_path, "rb") as f:
+        header = _parse_header(f.readline())
+        if header is None:  # Legacy plain JSON
+            f.seek(0)
+            content = f.read()
+            return json.loads(content) if content.strip() else {}
+        body = f.read()
+    if hashlib.sha256(body).hexdigest() != header["sha256"]:
+        raise SnapshotCorruptError(f"Checksum mismatch in {file_path}")
+    data = json.loads(body)
+    if len(data) != header["records"]:
+        raise SnapshotCorruptError(f"Expected {header['records']} records in {file_path}, found {len(data)}")
+    return data
+
 
 def load_data_from_file(file_path: str, data_name: str = "data") -> Dict[str, Any]:
     """
-    Loads a dictionary from a JSON file.  Handles file not found and other errors.
+    Loads a dictionary from a JSON snapshot file.  Handles file not found and other errors.
+
+    If the current snapshot is missing or fails verification (e.g. it was torn by a
+    crash), the previous generation is used instead.
 
     Args:
         file_path (str): The path to the file.
@@ -34,46 +192,902 @@ def load_data_from_file(file_path: str, data_name: str = "data") -> Dict[str, An
             Defaults to "data".
 
     Returns:
-        dict: The loaded dictionary.  Returns an empty dictionary if the file
-              does not exist or is empty.
+        dict: The loaded dictionary.  Returns an empty dictionary if neither the
+              file nor its previous generation exists.
 
     Raises:
         IOError: If there is an error reading the file.
         OSError: A general operating system error occurred.
-        json.JSONDecodeError: If the file contains invalid JSON.
+        json.JSONDecodeError: If the file contains invalid JSON and there is no
+            usable previous generation.
+        SnapshotCorruptError: If the file fails its checksum and there is no
+            usable previous generation.
     """
+    return _load_with_fallback(file_path, data_name, _read_snapshot)
+
+
+def _load_with_fallback(file_path: str, data_name: str, read: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Returns read(file_path), or read() of the previous generation if that fails; {} if neither exists."""
+    previous_path = previous_generation_path(file_path)
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        print(f"Successfully loaded {data_name} from {file_path}")
+        data = read(file_path)
+        logger.info("Successfully loaded %s from %s", data_name, file_path)
         return data
     except FileNotFoundError:
-        print(f"File {file_path} not found.  Returning empty {data_name} dictionary.")
-        return {}  # Consistent return of an empty dict on file not found
-    except (IOError, OSError, json.JSONDecodeError) as e:
-        print(f"Error loading {data_name} from {file_path}: {e}")
-        raise  # Re-raise the exception
+        if not os.path.exists(previous_path):
+            logger.info("File %s not found.  Returning empty %s dictionary.", file_path, data_name)
+            return {}  # Consistent return of an empty dict on file not found
+        error: Exception = FileNotFoundError(file_path)
+    except (IOError, OSError, ValueError) as e:  # ValueError covers JSONDecodeError and SnapshotCorruptError
+        logger.error("Error loading %s from %s: %s", data_name, file_path, e)
+        if not os.path.exists(previous_path):
+            raise  # Re-raise the exception
+        error = e
+
+    logger.warning("Falling back to previous generation %s (%s)", previous_path, error)
+    data = read(previous_path)
+    logger.info("Successfully loaded %s from %s", data_name, previous_path)
+    return data
+
+
+class SnapshotIndex:
+    """
+    Read-only index of a snapshot file: record key -> byte offset of its line.
+
+    The index is built in one streaming pass that verifies the checksum but does
+    not parse the records, so memory and startup time do not depend on record
+    size. Records are parsed from disk on access. The file stays open until
+    close(), so the index keeps working after a later save replaces the file.
+    """
+
+    def __init__(self, file_path: str, resident_statuses: Iterable[str] = ()):
+        """
+        Indexes a snapshot file.
+
+        Args:
+            file_path (str): The path to the snapshot.
+            resident_statuses (Iterable[str], optional): Incident status names
+                whose keys are collected in resident_ids while scanning.
+                Defaults to none.
+
+        Raises:
+            LegacySnapshotError: If the file is plain JSON without a header.
+            SnapshotCorruptError: If the checksum or record count does not match.
+        """
+        self.file_path = file_path
+        self.offsets: Dict[str, int] = {}
+        self.resident_ids: List[str] = []
+        self._decoder = json.JSONDecoder()
+        self._lock = threading.Lock()
+        self._file = open(file_path, "rb")
+        try:
+            self._scan(frozenset(resident_statuses))
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _scan(self, resident_statuses: frozenset) -> None:
+        header = _parse_header(self._file.readline())
+        if header is None:
+            raise LegacySnapshotError(f"{self.file_path} has no snapshot header")
+        digest = hashlib.sha256()
+        offset = self._file.tell()
+        for line in self._file:
+            digest.update(line)
+            if line.startswith(b'"'):  # Body lines other than the opening and closing braces
+                key, value = self._split(line)
+                self.offsets[key] = offset
+                if resident_statuses and self._status(value) in resident_statuses:
+                    self.resident_ids.append(key)
+            offset += len(line)
+        if digest.hexdigest() != header["sha256"]:
+            raise SnapshotCorruptError(f"Checksum mismatch in {self.file_path}")
+        if len(self.offsets) != header["records"]:
+            raise SnapshotCorruptError(
+                f"Expected {header['records']} records in {self.file_path}, found {len(self.offsets)}"
+            )
+
+    def _split(self, line: bytes) -> Tuple[str, bytes]:
+        """Splits a body line into its decoded key and the raw JSON of its value."""
+        text = line.rstrip(b",\r\n")
+        end = text.find(b'": ')
+        if end > 0 and b"\\" not in text[:end]:  # Plain key such as a UUID
+            return text[1:end].decode("ascii"), text[end + 3:]
+        key, end = self._decoder.raw_decode(text.decode("utf-8"))
+        # The key is ASCII-escaped by json.dumps, so character and byte positions agree
+        return key, text[end + 2:]
+
+    @staticmethod
+    def _status(value: bytes) -> Optional[str]:
+        match = _INCIDENT_STATUS_TAIL.fullmatch(value, max(value.rfind(b'"status": "'), 0))
+        if match:
+            return match.group(1).decode("ascii")
+        return json.loads(value).get("status")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Parses and returns the record stored under a key, or None."""
+        offset = self.offsets.get(key)
+        if offset is None:
+            return None
+        with self._lock:
+            self._file.seek(offset)
+            line = self._file.readline()
+        return json.loads(self._split(line)[1])
+
+    def contains(self, key: str) -> bool:
+        return key in self.offsets
+
+    def ids(self) -> Iterator[str]:
+        """Yields the keys in file order."""
+        return iter(self.offsets)
+
+    def records(self) -> Iterator[Tuple[str, Any]]:
+        """Yields (key, record) pairs in file order, parsing one at a time."""
+        return ((key, self.get(key)) for key in self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _open_with_fallback(file_path: str, data_name: str, open_file: Callable[[str], Any], verb: str) -> Optional[Any]:
+    """
+    Returns open_file(file_path), or open_file() of the previous generation if that
+    fails; None if neither exists. LegacySnapshotError is passed on as it is.
+    """
+    previous_path = previous_generation_path(file_path)
+    try:
+        opened = open_file(file_path)
+        logger.info("Successfully %s %s from %s", verb, data_name, file_path)
+        return opened
+    except FileNotFoundError:
+        if not os.path.exists(previous_path):
+            logger.info("File %s not found.  Starting with no %s.", file_path, data_name)
+            return None
+        error: Exception = FileNotFoundError(file_path)
+    except LegacySnapshotError:
+        raise
+    except (IOError, OSError, ValueError) as e:
+        logger.error("Error reading %s from %s: %s", data_name, file_path, e)
+        if not os.path.exists(previous_path):
+            raise
+        error = e
+
+    logger.warning("Falling back to previous generation %s (%s)", previous_path, error)
+    opened = open_file(previous_path)
+    logger.info("Successfully %s %s from %s", verb, data_name, previous_path)
+    return opened
+
+
+def index_snapshot_file(file_path: str, data_name: str = "data",
+                        resident_statuses: Iterable[str] = ()) -> Optional[SnapshotIndex]:
+    """
+    Indexes a snapshot file, falling back to the previous generation like
+    load_data_from_file.
+
+    Returns:
+        Optional[SnapshotIndex]: The index, or None if neither the file nor its
+            previous generation exists.
+
+    Raises:
+        LegacySnapshotError: If the file is plain JSON (load it with load_data_from_file).
+        SnapshotCorruptError: If the file fails verification and there is no
+            usable previous generation.
+    """
+    return _open_with_fallback(file_path, data_name,
+                               lambda path: SnapshotIndex(path, resident_statuses), "indexed")
+
+
+# Binary snapshots
+
+BINARY_MAGIC = b"EMSB"
+BINARY_VERSION = 3
+_BINARY_PREFIX = struct.Struct("<4sBB")  # Magic, version, record kind
+_BINARY_HEADERS = {
+    # Version 1: then record count and SHA-256 of the body; the records follow
+    1: struct.Struct("<4sBBxxQ32s"),
+    # Version 2 adds the offsets of the tables written after the records: the string
+    # table, the record offset table, the key hash table (and its number of slots) and
+    # the per-status record lists (and the number of statuses)
+    2: struct.Struct("<4sBBxxQ32sQQQQQQ"),
+    # Version 3 adds ULID IDs (the _ULID_ID flag and reference tag 3); the layout is version 2's
+    3: struct.Struct("<4sBBxxQ32sQQQQQQ"),
+}
+_KIND_INCIDENTS = 1
+_KIND_RESOURCES = 2
+_EMPTY_SLOT = 0xFFFFFFFF
+_UINT32 = struct.Struct("<I")
+_UINT64 = struct.Struct("<Q")
+# Each record starts with a fixed head: flags, enum codes, created_at and updated_at
+_INCIDENT_HEAD = struct.Struct("<BBBqq")  # Flags, priority, status, timestamps
+_RESOURCE_HEAD = struct.Struct("<BBqq")  # Flags, status, timestamps
+_UUID_ID = 1  # Flag: the record's ID is a UUID stored as 16 raw bytes
+_OTHER_KEY = 2  # Flag: the record is stored under a key other than its ID
+_ULID_ID = 4  # Flag: the record's ID is a ULID stored as 16 raw bytes
+_FLUSH_BYTES = 1 << 16
+_EPOCH = datetime(1970, 1, 1)  # Timestamps are naive local times, stored as microseconds since this
+_MICROSECOND = timedelta(microseconds=1)
+_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+# Enums are stored as their index in declaration order, so new members must be added last
+_PRIORITIES = list(Priority)
+_INCIDENT_STATUSES = list(IncidentStatus)
+_RESOURCE_STATUSES = list(ResourceStatus)
+_PRIORITY_CODES = {member: code for code, member in enumerate(_PRIORITIES)}
+_INCIDENT_STATUS_CODES = {member: code for code, member in enumerate(_INCIDENT_STATUSES)}
+_RESOURCE_STATUS_CODES = {member: code for code, member in enumerate(_RESOURCE_STATUSES)}
+
+
+def _is_uuid(value: str) -> bool:
+    return len(value) == 36 and _UUID.fullmatch(value) is not None
+
+
+def _id_flag(value: str) -> int:
+    """The head flag for storing an ID in binary form (_UUID_ID or _ULID_ID), or 0 to store it as text."""
+    if _is_uuid(value):
+        return _UUID_ID
+    return _ULID_ID if is_ulid(value) else 0
+
+
+def _timestamp(value: datetime) -> int:
+    if value.tzinfo is not None:
+        raise ValueError(f"Binary snapshots store naive timestamps, got {value.isoformat()}")
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _key_hash(key: str) -> int:
+    return zlib.crc32(key.encode("utf-8"))
+
+
+class _BinaryWriter:
+    """
+    Appends encoded fields to a buffer. Integers are varints; locations, types and
+    unit names repeat across records, so each distinct one is numbered and records
+    refer to it by number + 1, with the strings themselves in a table at the end.
+    (Version 1 wrote a string in full, after a 0, where it first appeared.)
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._strings: Dict[str, int] = {}
+
+    def uint(self, value: int) -> None:
+        while value >= 0x80:
+            self.buffer.append(value & 0x7F | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+
+    def text(self, value: str) -> None:
+        """A string in full: its UTF-8 length and bytes (IDs and keys, which are not shared)."""
+        data = value.encode("utf-8")
+        self.uint(len(data))
+        self.buffer += data
+
+    def string(self, value: str) -> None:
+        """A shared string, as its number in the string table + 1."""
+        ref = self._strings.get(value)
+        if ref is None:
+            ref = self._strings[value] = len(self._strings)
+        self.uint(ref + 1)
+
+    def string_table(self) -> None:
+        """The shared strings in number order, after their count."""
+        self.uint(len(self._strings))
+        for value in self._strings:  # Dicts keep insertion order, which is number order
+            self.text(value)
+
+    def record_id(self, value: str, flags: int) -> None:
+        """The record's own ID, in the form its head's _UUID_ID / _ULID_ID flags say."""
+        if flags & _UUID_ID:
+            self.buffer += bytes.fromhex(value.replace("-", ""))
+        elif flags & _ULID_ID:
+            self.buffer += ulid_to_bytes(value)
+        else:
+            self.text(value)
+
+    def reference(self, value: Optional[str]) -> None:
+        """An ID of another record (or None), tagged: 0 None, 1 UUID bytes, 2 in full, 3 ULID bytes."""
+        if value is None:
+            self.buffer.append(0)
+        elif _is_uuid(value):
+            self.buffer.append(1)
+            self.buffer += bytes.fromhex(value.replace("-", ""))
+        elif is_ulid(value):
+            self.buffer.append(3)
+            self.buffer += ulid_to_bytes(value)
+        else:
+            self.buffer.append(2)
+            self.text(value)
+
+
+# The decoders below read the buffer with plain functions and local variables rather
+# than a reader object, since they run once per field of every record on load
+
+def _read_uint(data: bytes, position: int) -> Tuple[int, int]:
+    value = data[position]
+    if value < 0x80:
+        return value, position + 1
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _read_text(data: bytes, position: int) -> Tuple[str, int]:
+    length = data[position]
+    if length < 0x80:
+        position += 1
+    else:
+        length, position = _read_uint(data, position)
+    end = position + length
+    if end > len(data):
+        raise IndexError("string runs past the end of the data")
+    return data[position:end].decode("utf-8"), end
+
+
+def _read_string_table(data: bytes, position: int) -> List[str]:
+    count, position = _read_uint(data, position)
+    strings = []
+    for _ in range(count):
+        value, position = _read_text(data, position)
+        strings.append(sys.intern(value))
+    return strings
+
+
+def _read_string(data: bytes, position: int, strings: List[str]) -> Tuple[str, int]:
+    ref = data[position]
+    if ref >= 0x80:
+        ref, position = _read_uint(data, position)
+    else:
+        position += 1
+    if ref:
+        return strings[ref - 1], position
+    value, position = _read_text(data, position)
+    value = sys.intern(value)
+    strings.append(value)
+    return value, position
+
+
+def _read_uuid(data: bytes, position: int) -> Tuple[str, int]:
+    digits = data[position:position + 16].hex()
+    if len(digits) != 32:
+        raise IndexError("UUID runs past the end of the data")
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}", position + 16
+
+
+def _read_ulid(data: bytes, position: int) -> Tuple[str, int]:
+    raw = data[position:position + 16]
+    if len(raw) != 16:
+        raise IndexError("ULID runs past the end of the data")
+    return ulid_from_bytes(raw), position + 16
+
+
+def _read_id(data: bytes, position: int, flags: int) -> Tuple[str, int]:
+    """A record's own ID, in the form its head's flags say."""
+    if flags & _ULID_ID:
+        return _read_ulid(data, position)
+    if flags & _UUID_ID:
+        return _read_uuid(data, position)
+    return _read_text(data, position)
+
+
+def _read_reference(data: bytes, position: int) -> Tuple[Optional[str], int]:
+    tag = data[position]
+    if tag == 1:
+        return _read_uuid(data, position + 1)
+    if tag == 3:
+        return _read_ulid(data, position + 1)
+    if tag == 2:
+        return _read_text(data, position + 1)
+    if tag == 0:
+        return None, position + 1
+    raise ValueError(f"Unknown reference tag {tag}")
+
+
+def _read_key(data: bytes, position: int, head_size: int) -> str:
+    """The key of the record at position (a record's ID and key follow its head)."""
+    flags = data[position]
+    record_id, position = _read_id(data, position + head_size, flags)
+    return _read_text(data, position)[0] if flags & _OTHER_KEY else record_id
+
+
+def _encode_incident(writer: _BinaryWriter, key: str, incident: Incident) -> int:
+    """Encodes one incident and returns its status code."""
+    incident_id = incident.incident_id
+    flags = _id_flag(incident_id) | (_OTHER_KEY if key != incident_id else 0)
+    writer.buffer += _INCIDENT_HEAD.pack(flags, _PRIORITY_CODES[incident.priority],
+                                         _INCIDENT_STATUS_CODES[incident.status],
+                                         _timestamp(incident.created_at), _timestamp(incident.updated_at))
+    writer.record_id(incident_id, flags)
+    if flags & _OTHER_KEY:
+        writer.text(key)
+    writer.string(incident.location)
+    writer.string(incident.emerg_type)
+    writer.uint(len(incident.required_resources))
+    for name in incident.required_resources:
+        writer.string(name)
+    writer.uint(len(incident.assigned_resources))
+    for resource_id in incident.assigned_resources:
+        writer.reference(resource_id)
+    return _INCIDENT_STATUS_CODES[incident.status]
+
+
+def _decode_incidents(data: bytes, position: int, count: int,
+                      strings: List[str]) -> Tuple[Dict[str, Incident], int]:
+    """
+    Decodes count incident records starting at position; returns them and the end
+    position. Strings are looked up in (and, in version 1, added to) strings.
+    """
+    incidents: Dict[str, Incident] = {}
+    unpack_head, head_size = _INCIDENT_HEAD.unpack_from, _INCIDENT_HEAD.size
+    for _ in range(count):
+        flags, priority, status, created, updated = unpack_head(data, position)
+        position += head_size
+        incident_id, position = _read_id(data, position, flags)
+        key = incident_id
+        if flags & _OTHER_KEY:
+            key, position = _read_text(data, position)
+        ref = data[position]
+        if 0 < ref < 0x80:  # A string seen before, the usual case: inlined
+            location, position = strings[ref - 1], position + 1
+        else:
+            location, position = _read_string(data, position, strings)
+        ref = data[position]
+        if 0 < ref < 0x80:
+            emergency_type, position = strings[ref - 1], position + 1
+        else:
+            emergency_type, position = _read_string(data, position, strings)
+        required, position = _read_uint(data, position)
+        required_resources = []
+        for _ in range(required):
+            name, position = _read_string(data, position, strings)
+            required_resources.append(name)
+        assigned, position = _read_uint(data, position)
+        assigned_resources = []
+        for _ in range(assigned):
+            resource_id, position = _read_reference(data, position)
+            assigned_resources.append(resource_id)
+        incidents[key] = Incident.trusted(
+            incident_id, location, emergency_type, _PRIORITIES[priority], required_resources,
+            _INCIDENT_STATUSES[status], assigned_resources,
+            _EPOCH + timedelta(0, 0, created), _EPOCH + timedelta(0, 0, updated),
+        )
+    return incidents, position
+
+
+def _encode_resource(writer: _BinaryWriter, key: str, resource: Resource) -> int:
+    """Encodes one resource and returns its status code."""
+    resource_id = resource.resource_id
+    flags = _id_flag(resource_id) | (_OTHER_KEY if key != resource_id else 0)
+    writer.buffer += _RESOURCE_HEAD.pack(flags, _RESOURCE_STATUS_CODES[resource.status],
+                                         _timestamp(resource.created_at), _timestamp(resource.updated_at))
+    writer.record_id(resource_id, flags)
+    if flags & _OTHER_KEY:
+        writer.text(key)
+    writer.string(resource.name)
+    writer.string(resource.resource_type)
+    writer.string(resource.location)
+    writer.reference(resource.assigned_incident_id)
+    return _RESOURCE_STATUS_CODES[resource.status]
+
+
+def _decode_resources(data: bytes, position: int, count: int,
+                      strings: List[str]) -> Tuple[Dict[str, Resource], int]:
+    """Decodes count resource records starting at position, as _decode_incidents does."""
+    resources: Dict[str, Resource] = {}
+    for _ in range(count):
+        flags, status, created, updated = _RESOURCE_HEAD.unpack_from(data, position)
+        position += _RESOURCE_HEAD.size
+        resource_id, position = _read_id(data, position, flags)
+        key = resource_id
+        if flags & _OTHER_KEY:
+            key, position = _read_text(data, position)
+        name, position = _read_string(data, position, strings)
+        resource_type, position = _read_string(data, position, strings)
+        location, position = _read_string(data, position, strings)
+        assigned_incident_id, position = _read_reference(data, position)
+        resources[key] = Resource.trusted(
+            resource_id, name, resource_type, location, _RESOURCE_STATUSES[status], assigned_incident_id,
+            _EPOCH + timedelta(0, 0, created), _EPOCH + timedelta(0, 0, updated),
+        )
+    return resources, position
+
+
+# Record kind -> (head size, decoder, statuses)
+_BINARY_KINDS = {
+    _KIND_INCIDENTS: (_INCIDENT_HEAD.size, _decode_incidents, _INCIDENT_STATUSES),
+    _KIND_RESOURCES: (_RESOURCE_HEAD.size, _decode_resources, _RESOURCE_STATUSES),
+}
+
+
+def _save_binary(objects: Iterable[Tuple[str, Any]], file_path: str, kind: int,
+                 encode: Callable[[_BinaryWriter, str, Any], int], data_name: str) -> None:
+    """
+    Streams objects into a crash-safe binary snapshot, encoding a buffer's worth at
+    a time, then writes the tables that let MappedSnapshot find records without
+    reading them all: string table, record offsets, key hash table (open
+    addressing, at most 3/4 full) and the record numbers of each status.
+    """
+    header = _BINARY_HEADERS[BINARY_VERSION]
+    statuses = len(_BINARY_KINDS[kind][2])
+
+    def write(f: BinaryIO) -> None:
+        f.write(bytes(header.size))  # Placeholder, rewritten below
+        digest = hashlib.sha256()
+        writer = _BinaryWriter()
+        position = header.size
+        offsets, hashes = array("Q"), array("I")
+        by_status = [array("I") for _ in range(statuses)]
+
+        def flush() -> None:
+            nonlocal position
+            digest.update(writer.buffer)
+            f.write(writer.buffer)
+            position += len(writer.buffer)
+            writer.buffer.clear()
+
+        for key, obj in objects:
+            offsets.append(position + len(writer.buffer))
+            hashes.append(_key_hash(key))
+            by_status[encode(writer, key, obj)].append(len(offsets) - 1)
+            if len(writer.buffer) >= _FLUSH_BYTES:
+                flush()
+        flush()
+        count = len(offsets)
+
+        strings_at = position
+        writer.string_table()
+        flush()
+
+        offsets_at = position
+        writer.buffer += _little_endian(offsets)
+        flush()
+
+        index_at, slots = position, 1
+        while slots * 3 < count * 4 + 1:  # Keeps at least one slot empty
+            slots *= 2
+        slot_hashes, slot_records = array("I", [0]) * slots, array("I", [_EMPTY_SLOT]) * slots
+        for record, key_hash in enumerate(hashes):
+            slot = key_hash & (slots - 1)
+            while slot_records[slot] != _EMPTY_SLOT:
+                slot = (slot + 1) & (slots - 1)
+            slot_hashes[slot], slot_records[slot] = key_hash, record
+        writer.buffer += _little_endian(slot_hashes) + _little_endian(slot_records)
+        flush()
+
+        statuses_at = position  # The length of each status's list, then the lists back to back
+        writer.buffer += _little_endian(array("I", [len(records) for records in by_status]))
+        for records in by_status:
+            writer.buffer += _little_endian(records)
+        flush()
+
+        f.seek(0)
+        f.write(header.pack(BINARY_MAGIC, BINARY_VERSION, kind, count, digest.digest(),
+                            strings_at, offsets_at, index_at, slots, statuses_at, statuses))
+
+    _write_atomically(file_path, data_name, write)
+
+
+def _binary_header(data, file_path: str, kind: int) -> tuple:
+    """Returns the header fields of a binary snapshot (any known version) of the given kind."""
+    if len(data) < _BINARY_PREFIX.size:
+        raise SnapshotCorruptError(f"{file_path} is too short to be a binary snapshot")
+    magic, version, file_kind = _BINARY_PREFIX.unpack_from(data)
+    header = _BINARY_HEADERS.get(version)
+    if magic != BINARY_MAGIC or header is None or file_kind != kind:
+        raise SnapshotCorruptError(f"{file_path} is not a binary snapshot of this kind")
+    if len(data) < header.size:
+        raise SnapshotCorruptError(f"{file_path} is too short to be a binary snapshot")
+    return header.unpack_from(data)
+
+
+def _read_binary(file_path: str, kind: int) -> Dict[str, Any]:
+    """
+    Reads and verifies one binary snapshot, decoding every record in order.
+
+    Raises:
+        SnapshotCorruptError: If the header, checksum or records do not match.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    fields = _binary_header(data, file_path, kind)
+    version, count, checksum = fields[1], fields[3], fields[4]
+    start = _BINARY_HEADERS[version].size
+    if hashlib.sha256(memoryview(data)[start:]).digest() != checksum:
+        raise SnapshotCorruptError(f"Checksum mismatch in {file_path}")
+    decode = _BINARY_KINDS[kind][1]
+    try:
+        if version == 1:
+            strings, records_end = [], len(data)
+        else:
+            strings, records_end = _read_string_table(data, fields[5]), fields[5]
+        records, end = decode(data, start, count, strings)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SnapshotCorruptError(f"Malformed record in {file_path}: {e}") from e
+    if end != records_end:
+        raise SnapshotCorruptError(f"Unexpected data after {count} records in {file_path}")
+    return records
+
+
+class MappedSnapshot:
+    """
+    Read-only view of a binary snapshot through mmap: record key -> object.
+
+    Opening reads only the header, the string table and the record lists of the
+    resident statuses, so it takes the same time however many records the file
+    holds. Lookups go through the file's key hash table and decode one record
+    (as a new object) per access; the operating system pages in only what is
+    read. The whole-file checksum is not verified here (reading it all is what
+    this avoids): the file is trusted as written by an atomic rename, and
+    malformed records raise SnapshotCorruptError when read.
+    """
+
+    def __init__(self, file_path: str, kind: int = _KIND_INCIDENTS, resident_statuses: Iterable[str] = ()):
+        """
+        Maps a binary snapshot file.
+
+        Args:
+            file_path (str): The path to the snapshot.
+            kind (int, optional): The record kind the file must hold. Defaults to incidents.
+            resident_statuses (Iterable[str], optional): Status names whose keys
+                are listed in resident_ids. Defaults to none.
+
+        Raises:
+            LegacySnapshotError: If the file is a version 1 snapshot, which has no tables.
+            SnapshotCorruptError: If the header or tables do not fit the file.
+        """
+        self.file_path = file_path
+        self._head_size, self._decode, statuses = _BINARY_KINDS[kind]
+        with open(file_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        try:
+            fields = _binary_header(self._map, file_path, kind)
+            if fields[1] == 1:
+                raise LegacySnapshotError(f"{file_path} is a version 1 binary snapshot without record tables")
+            (self._count, strings_at, self._offsets_at, self._index_at, self._slots,
+             statuses_at, status_count) = (fields[3],) + fields[5:]
+            if not (strings_at <= self._offsets_at <= self._index_at <= statuses_at <= len(self._map)
+                    and self._offsets_at + 8 * self._count <= self._index_at
+                    and self._index_at + 8 * self._slots <= statuses_at and self._count < self._slots
+                    and self._slots & (self._slots - 1) == 0 and status_count == len(statuses)):
+                raise SnapshotCorruptError(f"Malformed tables in {file_path}")
+            self._strings = _read_string_table(self._map, strings_at)
+            self.resident_ids: List[str] = []
+            wanted = set(resident_statuses)
+            list_at = statuses_at + 4 * status_count
+            for code, status in enumerate(statuses):
+                length = _UINT32.unpack_from(self._map, statuses_at + 4 * code)[0]
+                if list_at + 4 * length > len(self._map):
+                    raise SnapshotCorruptError(f"Malformed status lists in {file_path}")
+                if status.name in wanted:
+                    records = array("I", self._map[list_at:list_at + 4 * length])
+                    self.resident_ids.extend(self._key(record) for record in array("I", _little_endian(records)))
+                list_at += 4 * length
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise SnapshotCorruptError(f"Malformed tables in {file_path}: {e}") from e
+        except BaseException:
+            self.close()
+            raise
+
+    def _offset(self, record: int) -> int:
+        return _UINT64.unpack_from(self._map, self._offsets_at + 8 * record)[0]
+
+    def _key(self, record: int) -> str:
+        try:
+            return _read_key(self._map, self._offset(record), self._head_size)
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise SnapshotCorruptError(f"Malformed record {record} in {self.file_path}: {e}") from e
+
+    def _find(self, key: str) -> Optional[int]:
+        """The record number stored under key, by linear probing from its hash slot."""
+        key_hash, mask = _key_hash(key), self._slots - 1
+        slot = key_hash & mask
+        records_at = self._index_at + 4 * self._slots
+        while True:
+            record = _UINT32.unpack_from(self._map, records_at + 4 * slot)[0]
+            if record == _EMPTY_SLOT:
+                return None
+            if _UINT32.unpack_from(self._map, self._index_at + 4 * slot)[0] == key_hash and self._key(record) == key:
+                return record
+            slot = (slot + 1) & mask
+
+    def _record(self, record: int) -> Tuple[str, Any]:
+        try:
+            decoded, _ = self._decode(self._map, self._offset(record), 1, self._strings)
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise SnapshotCorruptError(f"Malformed record {record} in {self.file_path}: {e}") from e
+        return next(iter(decoded.items()))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Decodes and returns the object stored under a key, or None."""
+        record = self._find(key)
+        return None if record is None else self._record(record)[1]
+
+    def contains(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def ids(self) -> Iterator[str]:
+        """Yields the keys in file order."""
+        return (self._key(record) for record in range(self._count))
+
+    def records(self) -> Iterator[Tuple[str, Any]]:
+        """Yields (key, object) pairs in file order, decoding one at a time."""
+        return (self._record(record) for record in range(self._count))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+
+def map_snapshot_file(file_path: str, data_name: str = "incidents",
+                      resident_statuses: Iterable[str] = ()) -> Optional[MappedSnapshot]:
+    """
+    Maps a binary incidents snapshot, falling back to the previous generation like
+    load_data_from_file.
+
+    Returns:
+        Optional[MappedSnapshot]: The mapping, or None if neither the file nor its
+            previous generation exists.
+
+    Raises:
+        LegacySnapshotError: If the file is version 1 (load it with load_incidents_from_file).
+        SnapshotCorruptError: If the file is malformed and there is no usable
+            previous generation.
+    """
+    return _open_with_fallback(file_path, data_name,
+                               lambda path: MappedSnapshot(path, _KIND_INCIDENTS, resident_statuses), "mapped")
+
+
+# Serializer registry
+
+class SnapshotSerializer(ABC):
+    """
+    A snapshot file format for incidents and resources. Formats are registered
+    under a file extension with register_serializer() and picked by
+    serializer_for(); each writes crash-safe files with a previous generation.
+    Formats that can be loaded lazily also override index_incidents() and
+    incident_from_record().
+    """
+
+    @abstractmethod
+    def save_incidents(self, incidents: Mapping[str, Incident], file_path: str) -> None:
+        """Writes the incidents to the file."""
+
+    @abstractmethod
+    def load_incidents(self, file_path: str) -> Dict[str, Incident]:
+        """Reads the incidents from the file, falling back to the previous generation."""
+
+    @abstractmethod
+    def save_resources(self, resources: Mapping[str, Resource], file_path: str) -> None:
+        """Writes the resources to the file."""
+
+    @abstractmethod
+    def load_resources(self, file_path: str) -> Dict[str, Resource]:
+        """Reads the resources from the file, falling back to the previous generation."""
+
+    def index_incidents(self, file_path: str, resident_statuses: Iterable[str] = ()) -> Optional[Any]:
+        """
+        Opens an incidents file for lazy loading, falling back to the previous
+        generation: returns a source with get(), contains(), ids(), records(),
+        close() and the resident_ids of the given statuses (see LazyIncidents),
+        or None if there is no file.
+
+        Raises:
+            LegacySnapshotError: If the file (or this format) cannot be read lazily.
+        """
+        raise LegacySnapshotError(f"{type(self).__name__} files cannot be loaded lazily")
+
+    def incident_from_record(self, record: Any) -> Incident:
+        """Turns a record read from an index_incidents() source into an Incident."""
+        raise LegacySnapshotError(f"{type(self).__name__} files cannot be loaded lazily")
+
+
+class JsonSnapshotSerializer(SnapshotSerializer):
+    """The JSON snapshot (see save_records_to_file): human-readable, and indexable for lazy loading."""
+
+    def save_incidents(self, incidents: Mapping[str, Incident], file_path: str) -> None:
+        records = ((incident_id, incident.to_dict()) for incident_id, incident in incidents.items())
+        save_records_to_file(records, file_path, "incidents")
+
+    def load_incidents(self, file_path: str) -> Dict[str, Incident]:
+        incident_data = load_data_from_file(file_path, "incidents")
+        return {incident_id: Incident.from_trusted_dict(data) for incident_id, data in incident_data.items()}
+
+    def save_resources(self, resources: Mapping[str, Resource], file_path: str) -> None:
+        records = ((key, resource.to_dict()) for key, resource in resources.items())
+        save_records_to_file(records, file_path, "resources")
+
+    def load_resources(self, file_path: str) -> Dict[str, Resource]:
+        resource_data = load_data_from_file(file_path, "resources")
+        return {key: Resource.from_trusted_dict(data) for key, data in resource_data.items()}
+
+    def index_incidents(self, file_path: str, resident_statuses: Iterable[str] = ()) -> Optional[SnapshotIndex]:
+        return index_snapshot_file(file_path, "incidents", resident_statuses)
+
+    def incident_from_record(self, record: Dict[str, Any]) -> Incident:
+        return Incident.from_trusted_dict(record)
+
+
+class BinarySnapshotSerializer(SnapshotSerializer):
+    """
+    A compact binary snapshot: a fixed header (magic, version, record kind, count,
+    SHA-256 of the body and table offsets) followed by the records, then the
+    tables (see _save_binary). Enums are one byte, timestamps 8-byte microsecond
+    counts, UUIDs and ULIDs 16 raw bytes, and repeated strings numbers into the string
+    table, so there are no names or ISO strings to parse on load. Lazy loading
+    maps the file (see MappedSnapshot).
+    """
+
+    def save_incidents(self, incidents: Mapping[str, Incident], file_path: str) -> None:
+        _save_binary(incidents.items(), file_path, _KIND_INCIDENTS, _encode_incident, "incidents")
+
+    def load_incidents(self, file_path: str) -> Dict[str, Incident]:
+        return _load_with_fallback(file_path, "incidents",
+                                   lambda path: _read_binary(path, _KIND_INCIDENTS))
+
+    def save_resources(self, resources: Mapping[str, Resource], file_path: str) -> None:
+        _save_binary(resources.items(), file_path, _KIND_RESOURCES, _encode_resource, "resources")
+
+    def load_resources(self, file_path: str) -> Dict[str, Resource]:
+        return _load_with_fallback(file_path, "resources",
+                                   lambda path: _read_binary(path, _KIND_RESOURCES))
+
+    def index_incidents(self, file_path: str, resident_statuses: Iterable[str] = ()) -> Optional[MappedSnapshot]:
+        return map_snapshot_file(file_path, "incidents", resident_statuses)
+
+    def incident_from_record(self, record: Incident) -> Incident:
+        return record  # Decoded as a new Incident on every access
+
+
+SERIALIZERS: Dict[str, SnapshotSerializer] = {}  # File extension -> format
+
+
+def register_serializer(extension: str, serializer: SnapshotSerializer) -> None:
+    """Registers a snapshot format for files with the given extension (e.g. ".bin")."""
+    SERIALIZERS[extension.lower()] = serializer
+
+
+def serializer_for(file_path: str) -> SnapshotSerializer:
+    """Returns the format registered for the file's extension; other extensions get JSON."""
+    return SERIALIZERS.get(os.path.splitext(file_path)[1].lower(), SERIALIZERS[".json"])
+
+
+register_serializer(".json", JsonSnapshotSerializer())
+register_serializer(".bin", BinarySnapshotSerializer())
 
 
-def save_incidents_to_file(incidents: Dict[str, Incident], file_path: str) -> None:
-    """Saves incidents to a JSON file."""
-    incident_data = {incident_id: incident.to_dict() for incident_id, incident in incidents.items()}
-    save_data_to_file(incident_data, file_path, "incidents")
+def save_incidents_to_file(incidents: Mapping[str, Incident], file_path: str) -> None:
+    """Saves incidents in the format of the file's extension, serializing one incident at a time."""
+    serializer_for(file_path).save_incidents(incidents, file_path)
 
 
 def load_incidents_from_file(file_path: str) -> Dict[str, Incident]:
-    """Loads incidents from a JSON file."""
-    incident_data = load_data_from_file(file_path, "incidents")
-    return {incident_id: Incident.from_dict(data) for incident_id, data in incident_data.items()}
+    """Loads incidents from a file in the format of its extension."""
+    return serializer_for(file_path).load_incidents(file_path)
 
 
-def save_resources_to_file(resources: Dict[str, Resource], file_path: str) -> None:
-    """Saves resources to a JSON file."""
-    resource_data = {key: resource.to_dict() for key, resource in resources.items()}
-    save_data_to_file(resource_data, file_path, "resources")
+def save_resources_to_file(resources: Mapping[str, Resource], file_path: str) -> None:
+    """Saves resources in the format of the file's extension, serializing one resource at a time."""
+    serializer_for(file_path).save_resources(resources, file_path)
 
 
 def load_resources_from_file(file_path: str) -> Dict[str, Resource]:
-    """Loads resources from a JSON file."""
-    resource_data = load_data_from_file(file_path, "resources")
-    return {key: Resource.from_dict(data) for key, data in resource_data.items()} 
\ No newline at end of file
+    """Loads resources from a file in the format of its extension."""
+    return serializer_for(file_path).load_resources(file_path)
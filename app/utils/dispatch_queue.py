@@ -0,0 +1,139 @@
+import heapq
+import itertools
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.utils.dispatch_score import StrictPriority
+
+ACTIVE_STATUSES = (IncidentStatus.OPEN, IncidentStatus.IN_PROGRESS)
+
+_REMOVED = "<removed>"  # Placeholder for an entry whose incident left the queue or changed key
+
+
+class DispatchQueue:
+    """
+    Persistent priority queue of active (OPEN / IN_PROGRESS) incidents, most urgent first.
+
+    Incidents are keyed by their dispatch policy's (tier, value) key, by default
+    (priority order, created_at), with a per-incident arrival sequence number as a
+    stable tie-breaker. Keys do not change with time (see app.utils.dispatch_score),
+    so an aging policy needs no periodic re-ranking. Changing an incident's priority pushes a
+    fresh entry and marks the old one as removed; incidents that are resolved or
+    closed are dropped the same way. Removed entries are skipped when they reach the
+    top of the heap, so every change costs O(log n).
+    """
+
+    def __init__(self, policy=None):
+        """
+        Initializes an empty queue.
+
+        Args:
+            policy (optional): How incidents are ranked, e.g. AgingPolicy.
+                Defaults to None, which uses StrictPriority.
+        """
+        self.policy = policy if policy is not None else StrictPriority()
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}  # incident_id -> live heap entry
+        self._seq: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def rank(self, incident_id: str, incident: Incident) -> Tuple[int, float, int]:
+        """
+        Returns the dispatch rank of an incident (lower is more urgent).
+
+        Args:
+            incident_id (str): The ID of the incident.
+            incident (Incident): The incident.
+
+        Returns:
+            tuple: (tier, value, arrival sequence); with the default policy,
+                (priority order, creation timestamp, arrival sequence).
+        """
+        seq = self._seq.get(incident_id)
+        if seq is None:
+            seq = self._seq[incident_id] = next(self._counter)
+        tier, value = self.policy.key(incident.priority, incident.created_at)
+        return tier, value, seq
+
+    def sync(self, incident_id: str, incident: Incident) -> None:
+        """Queues, re-keys or drops an incident according to its current status and priority."""
+        if incident.status in ACTIVE_STATUSES:
+            self.push(incident_id, incident)
+        else:
+            self.discard(incident_id)
+
+    def push(self, incident_id: str, incident: Incident) -> None:
+        """Adds an incident, or updates its key if it is already queued."""
+        rank = self.rank(incident_id, incident)
+        entry = self._entries.get(incident_id)
+        if entry is not None and tuple(entry[:3]) == rank:
+            return
+        self.discard(incident_id)
+        entry = [*rank, incident_id]
+        self._entries[incident_id] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def discard(self, incident_id: str) -> None:
+        """Drops an incident from the queue (lazily; its heap entry is skipped later)."""
+        entry = self._entries.pop(incident_id, None)
+        if entry is not None:
+            entry[-1] = _REMOVED
+
+    def pop(self) -> Optional[str]:
+        """Removes and returns the ID of the most urgent incident, or None if empty."""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry[-1] is not _REMOVED:
+                del self._entries[entry[-1]]
+                return entry[-1]
+        return None
+
+    def peek(self) -> Optional[str]:
+        """Returns the ID of the most urgent incident without removing it."""
+        while self._heap and self._heap[0][-1] is _REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][-1] if self._heap else None
+
+    def in_order(self) -> Iterator[str]:
+        """
+        Yields queued incident IDs from most to least urgent without consuming the queue.
+
+        Each step costs O(log n), so callers that stop early never pay for a full sort.
+        """
+        heap = list(self._heap)  # A copy of a heap is still a valid heap
+        while heap:
+            entry = heapq.heappop(heap)
+            if entry[-1] is not _REMOVED:
+                yield entry[-1]
+
+    def ranked(self) -> Iterator[Tuple[str, Tuple[int, float, int]]]:
+        """Yields (incident_id, rank) for every queued incident, in no particular order."""
+        for incident_id, entry in list(self._entries.items()):
+            yield incident_id, (entry[0], entry[1], entry[2])
+
+    def rebuild(self, incidents: Dict[str, Incident]) -> None:
+        """Rebuilds the queue from scratch."""
+        self._heap = []
+        self._entries = {}
+        for incident_id, incident in incidents.items():
+            if incident.status in ACTIVE_STATUSES:
+                entry = [*self.rank(incident_id, incident), incident_id]
+                self._entries[incident_id] = entry
+                self._heap.append(entry)
+        heapq.heapify(self._heap)
+
+    def _compact(self) -> None:
+        """Drops removed entries once they outnumber the live ones."""
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
+
+    def __contains__(self, incident_id: str) -> bool:
+        return incident_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over queued incident IDs in no particular order."""
+        return iter(list(self._entries))
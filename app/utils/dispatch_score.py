@@ -0,0 +1,102 @@
+"""
+Dispatch scores: how urgent an active incident is, from its priority and its age.
+
+StrictPriority, the default, ranks by priority alone (oldest first within a
+priority), so a LOW incident waits as long as any HIGH is unserved.
+
+AgingPolicy gives every incident a score that starts at its priority's weight and
+grows while it waits:
+
+    score(t) = weight[priority] + aging_rate * (t - created_at)
+
+so a waiting LOW incident eventually outranks newly arriving HIGHs. Every incident
+ages at the same rate, so the aging_rate * t term is common to all of them and the
+order of two incidents never changes as time passes: ranking by the time-free key
+created_at - weight / aging_rate gives the same order as ranking by score at any
+moment. The dispatch queue therefore keys an incident once, when it arrives or
+changes, and keeping the ranking current costs one O(log n) heap update per change
+rather than re-scoring every incident on each pass.
+
+A policy's key is (tier, value), lower first; tiers are never crossed, and the
+value orders incidents within a tier. A policy whose ages attribute is True
+measures urgency with the value as well, so a cost-based allocator weighs it
+rather than using it only to break ties.
+"""
+import math
+import time
+from datetime import datetime
+from typing import Mapping, Optional, Tuple
+from app.priorities.emerg_priority import Priority
+
+DEFAULT_WEIGHTS = {Priority.HIGH: 1800.0, Priority.MEDIUM: 600.0, Priority.LOW: 0.0}  # Seconds of head start
+
+
+class StrictPriority:
+    """Ranks by priority, then creation time: the priority order is the tier."""
+
+    ages = False  # The value only breaks ties by arrival
+
+    def key(self, priority: Priority, created_at: datetime) -> Tuple[int, float]:
+        """Returns the ranking key of an incident (lower is more urgent)."""
+        return priority.order, created_at.timestamp()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class AgingPolicy:
+    """Ranks by a score that combines priority weight and waiting time; every incident is in tier 0."""
+
+    ages = True  # The value is the urgency
+
+    def __init__(self, weights: Optional[Mapping[Priority, float]] = None, aging_rate: float = 1.0):
+        """
+        Initializes the policy.
+
+        Args:
+            weights (Optional[Mapping[Priority, float]], optional): The score of each
+                priority at creation. Defaults to DEFAULT_WEIGHTS, under which a HIGH
+                incident outranks a LOW one created up to 30 minutes earlier.
+            aging_rate (float, optional): Score gained per second of waiting.
+                Defaults to 1.0.
+
+        Raises:
+            ValueError: If a priority has no finite weight or aging_rate is not positive.
+        """
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        missing = [priority.name for priority in Priority if priority not in weights]
+        if missing:
+            raise ValueError(f"No weight for priorities: {', '.join(missing)}")
+        if not all(math.isfinite(weight) for weight in weights.values()):
+            raise ValueError("Priority weights must be finite")
+        if not (math.isfinite(aging_rate) and aging_rate > 0):
+            raise ValueError(f"aging_rate must be positive, got {aging_rate}")
+        self.weights = {priority: float(weights[priority]) for priority in Priority}
+        self.aging_rate = float(aging_rate)
+        # Head start in seconds, indexed by priority order, so key() does no dict lookup
+        self._offsets = tuple(weight / self.aging_rate
+                              for _, weight in sorted(self.weights.items(), key=lambda item: item[0].order))
+
+    def key(self, priority: Priority, created_at: datetime) -> Tuple[int, float]:
+        """Returns the ranking key of an incident (lower is more urgent); it does not change with time."""
+        return 0, created_at.timestamp() - self._offsets[priority.order]
+
+    def score(self, priority: Priority, created_at: datetime, now: Optional[float] = None) -> float:
+        """
+        Returns the score of an incident at a point in time (higher is more urgent).
+
+        Args:
+            priority (Priority): The incident's priority.
+            created_at (datetime): When the incident was created.
+            now (Optional[float], optional): The time as a Unix timestamp.
+                Defaults to the current time.
+
+        Returns:
+            float: weight[priority] + aging_rate * seconds waited.
+        """
+        now = time.time() if now is None else now
+        return self.weights[priority] + self.aging_rate * (now - created_at.timestamp())
+
+    def __repr__(self):
+        weights = ", ".join(f"{priority.name}: {weight:g}" for priority, weight in self.weights.items())
+        return f"{self.__class__.__name__}(weights={{{weights}}}, aging_rate={self.aging_rate:g})"
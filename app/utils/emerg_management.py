@@ -1,31 +1,198 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import os
+import sys
 import json
+import logging
+import functools
+import itertools
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.incidents.emerg_incident import Incident, IncidentStatus, new_incident_id
 from app.resources.emerg_resource import Resource, ResourceStatus
 from app.priorities.emerg_priority import Priority
-from app.utils.data_persistence import save_data_to_file, load_data_from_file
+from app.utils.allocation import IncrementalAllocator
+from app.utils.allocation_engine import GreedyAllocationEngine
+from app.utils.creation_index import CreationIndex
+from app.utils.resource_index import ResourceIndex
+from app.utils.dispatch_queue import DispatchQueue
+from app.utils.metrics import REGISTRY as METRICS, instrumented, timed
+from app.utils.reports import IncidentReport
+from app.utils.snapshot import FrozenIncident, FrozenResource, SnapshotTable, StateSnapshot
+from app.utils.spatial_index import SpatialIndex
+from app.utils.storage import StorageBackend, JsonFileStorage, LazyIncidents
 
+logger = logging.getLogger(__name__)
 
+DEFAULT_LOCATION_MAPPING: Dict[str, tuple] = {
+    "Zone 1": (51.4592, -0.2567),  # Example coordinates
+    "Zone 2": (51.4761, -0.1441),
+    "Zone 3": (51.4575, -0.1165),
+}
+
+
+class InvalidEventsError(ValueError):
+    """Raised by ingest_batch when events fail validation; errors lists (event index, message) pairs."""
+
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        shown = "; ".join(f"event {index}: {message}" for index, message in errors[:5])
+        more = f" (and {len(errors) - 5} more)" if len(errors) > 5 else ""
+        super().__init__(f"{len(errors)} invalid event(s): {shown}{more}")
+
+
+def _enum(enum_type, value):
+    """Accepts an enum member or its name; None passes through."""
+    if value is None or isinstance(value, enum_type):
+        return value
+    try:
+        return enum_type[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown {enum_type.__name__.lower()}: {value}") from None
+
+
+def _check_event_fields(location, emergency_type, required_resources, optional: bool = False) -> None:
+    """Validates the incident fields of an ingest_batch event; with optional, None (unchanged) is allowed."""
+    for name, value in (("location", location), ("emergency_type", emergency_type)):
+        if not isinstance(value, str) and not (optional and value is None):
+            raise ValueError(f"{name} must be a string.")
+    if required_resources is None and optional:
+        return
+    if not isinstance(required_resources, list) or not all(isinstance(name, str) for name in required_resources):
+        raise ValueError("required_resources must be a list of strings.")
+
+
+def _unchanged(resource: Resource, expected_updated_at: Optional[datetime]) -> bool:
+    """Compare-and-set check: True unless an expected version is given and the resource has moved on."""
+    return expected_updated_at is None or resource.updated_at == expected_updated_at
+
+
+def _journaled_operation(method):
+    """Records all changes made by a public mutating method as one journal record."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._journaled(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _locked(method):
+    """Runs a method under the system lock (a no-op unless the system is thread-safe)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@instrumented
 class EmergencyManagement:
     """Class to manage emergency incidents, resources, and priorities."""
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        proximity_dispatch: bool = False,
+        journal: bool = False,
+        compact_every: int = 10_000,
+        lazy_load: bool = False,
+        storage: Optional[StorageBackend] = None,
+        allocation_engine=None,
+        default_resources: bool = True,
+        thread_safe: bool = False,
+        snapshot_extension: str = ".json",
+        dispatch_policy=None,
+    ):
         """
         Initializes the EmergencyManagement system.
 
         Args:
             data_dir (str, optional): The directory to store data files.
                 Defaults to "data".
+            proximity_dispatch (bool, optional): If True, each requirement is served
+                by the nearest available unit of its type (by zone coordinates)
+                instead of the first one found. Defaults to False.
+            journal (bool, optional): If True, every mutation is appended to
+                journal.jsonl as it happens, so a crash does not lose the session.
+                Defaults to False.
+            compact_every (int, optional): In journal mode, the number of journal
+                records after which a snapshot is written and the journal emptied.
+                Defaults to 10,000.
+            lazy_load (bool, optional): If True, the incidents snapshot is indexed
+                (JSON) or memory-mapped (binary) at startup and only active
+                incidents are materialized; closed history is read from disk when
+                accessed. Defaults to False.
+            storage (Optional[StorageBackend], optional): Where incidents and
+                resources are kept, e.g. SQLiteStorage. Defaults to None, which
+                uses the JSON files in data_dir (with the journal if requested).
+            allocation_engine (optional): How process_resource_allocation assigns
+                units, e.g. MinCostAllocationEngine for a globally optimal assignment.
+                Defaults to None, which uses GreedyAllocationEngine. Single-incident
+                updates between full passes are always allocated greedily.
+            default_resources (bool, optional): If True, a system that starts with
+                no resources gets the three default units. Defaults to True.
+            thread_safe (bool, optional): If True, operations may be called from
+                several threads: each mutation (with everything it calls) and
+                each indexed read runs under one re-entrant lock. Required if the
+                metrics are served over HTTP (metrics.start_metrics_server), which
+                reads the state gauges from another thread. Defaults to False.
+            snapshot_extension (str, optional): The format of the snapshot files in
+                data_dir, by extension: ".json", or ".bin" for the compact binary
+                format. Defaults to ".json".
+            dispatch_policy (optional): How active incidents are ranked for
+                allocation, e.g. AgingPolicy so that long-waiting incidents
+                overtake newer ones of higher priority. Defaults to None, which
+                ranks by priority alone (StrictPriority).
         """
         self.data_dir = data_dir
-        self.incidents: Dict[str, Incident] = {}
+        self.proximity_dispatch = proximity_dispatch
+        self.allocation_engine = allocation_engine if allocation_engine is not None else GreedyAllocationEngine()
+        if storage is None:
+            storage = JsonFileStorage(data_dir, journal, compact_every, lazy_load, snapshot_extension)
+        self.storage = storage
+        self._lock = threading.RLock() if thread_safe else nullcontext()
+        self._mutation_depth = 0
+        self._snapshot: Optional[StateSnapshot] = None  # Published after every operation once snapshot() is used
+        self._track_changes = self.storage.records_mutations
+        self._dirty_incidents: set = set()
+        self._dirty_resources: set = set()
+        self.incidents: Dict[str, Incident] = {}  # A LazyIncidents mapping with lazy storage backends
         self.resources: Dict[str, Resource] = {}
+        self.manual_holds: set = set()  # Units placed by a dispatcher; the allocator never moves them
         self.location_mapping: Dict[str, tuple] = self._initialize_location_mapping()  # Use the private method
+        self.allocator = IncrementalAllocator(self)
+        self.resource_index = ResourceIndex()
+        self.dispatch_queue = DispatchQueue(dispatch_policy)
+        self.spatial_index = SpatialIndex(self.location_mapping)
+        self._creation_index: Optional[CreationIndex] = None  # Built by the first time-range query
         self.load_data()  # Load data on startup
-        self._add_default_resources()  # Add default resources
+        if default_resources:
+            self._add_default_resources()  # Add default resources
+        self._rebuild_resource_indexes()
+        self.dispatch_queue.rebuild(self._resident_incidents())
+        self.allocator.rebuild()
+        METRICS.add_collector(self._metric_gauges)
 
+    @_locked
+    def _metric_gauges(self) -> list:
+        """
+        Returns the state gauges for metrics export: open incidents per priority,
+        available units per type. Scrapes from another thread need thread_safe=True.
+        """
+        open_counts = {priority: 0 for priority in Priority}
+        for incident_id in self.dispatch_queue:
+            incident = self.incidents.get(incident_id)
+            if incident is not None and incident.status == IncidentStatus.OPEN:
+                open_counts[incident.priority] += 1
+        samples = [("emergency_open_incidents", "Open incidents by priority.", {"priority": priority.name}, count)
+                   for priority, count in open_counts.items()]
+        for resource_type in self.resource_index.types():
+            samples.append(("emergency_available_resources", "Available resources by type.",
+                            {"resource_type": resource_type}, self.resource_index.available_count(resource_type)))
+        return samples
+
+    @_journaled_operation
     def _add_default_resources(self):
         """Add default resources to the system."""
         if not self.resources:  # Only add default resources if none exist
@@ -35,7 +202,108 @@ class EmergencyManagement:
                 Resource(name="Police Car 1", resource_type="Police Car", location="Zone 3", status=ResourceStatus.AVAILABLE),
             ]
             for resource in default_resources:
-                self.resources[resource.resource_id] = resource    
+                self.resources[resource.resource_id] = resource
+                self._mark_resource(resource.resource_id)
+
+    @contextmanager
+    def _journaled(self, op: str):
+        """
+        Groups the changes made by one public operation (and anything it calls) into
+        one journal record; in thread-safe mode the operation holds the lock throughout.
+        """
+        with self._lock:
+            self._mutation_depth += 1
+            try:
+                yield
+            finally:
+                self._mutation_depth -= 1
+                if self._mutation_depth == 0:
+                    self._flush_changes(op)
+
+    def _mark_incident(self, incident_id: str) -> None:
+        """Notes that an incident changed during the current operation."""
+        if self._track_changes:
+            self._dirty_incidents.add(incident_id)
+
+    def _mark_resource(self, resource_id: str) -> None:
+        """Notes that a resource changed during the current operation."""
+        if self._track_changes:
+            self._dirty_resources.add(resource_id)
+
+    def _flush_changes(self, op: str) -> None:
+        """
+        Hands the records changed by one operation to the storage backend (compacting
+        it when due) and publishes them as a new state snapshot, if snapshots are in use.
+        """
+        if not (self._dirty_incidents or self._dirty_resources):
+            return
+        resident = self._resident_incidents()
+        if self._snapshot is not None:
+            self._publish_snapshot(resident)
+        if self.storage.records_mutations:
+            incidents = {
+                incident_id: resident[incident_id].to_dict()
+                for incident_id in self._dirty_incidents if incident_id in resident
+            }
+            resources = {
+                resource_id: self.resources[resource_id].to_dict() if resource_id in self.resources else None
+                for resource_id in self._dirty_resources  # None records a removed resource
+            }
+            self.storage.record(op, incidents, resources)
+        self._dirty_incidents.clear()
+        self._dirty_resources.clear()
+        if self.storage.compaction_due():
+            self.save_data()  # Snapshot, then empty the journal
+
+    def _publish_snapshot(self, resident: Dict[str, Incident]) -> None:
+        """Replaces the current snapshot with a new version holding frozen copies of the changed records."""
+        current = self._snapshot
+        incidents = current.incidents.updated({
+            incident_id: FrozenIncident.of(resident[incident_id])
+            for incident_id in self._dirty_incidents if incident_id in resident
+        })
+        resources = current.resources.updated({
+            resource_id: FrozenResource.of(self.resources[resource_id]) if resource_id in self.resources else None
+            for resource_id in self._dirty_resources
+        })
+        self._snapshot = StateSnapshot(current.generation + 1, incidents, resources)
+
+    def snapshot(self) -> StateSnapshot:
+        """
+        Returns a consistent, immutable view of all incidents and resources in O(1).
+
+        The first call copies the current state (O(n)) and turns on change tracking.
+        From then on, each operation publishes the records it changed as a new
+        version that shares everything else with the previous one, O(log n) per
+        record, and this returns the latest version. A snapshot is never modified,
+        so readers need no lock and are never blocked by writers; its records are
+        shared by all readers and read-only (copy() one to change it). Changes made by
+        replacing incidents or resources wholesale, rather than through the
+        operations, are not tracked.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._track_changes = True
+                    self._snapshot = StateSnapshot(
+                        0,
+                        SnapshotTable.build((key, FrozenIncident.of(incident)) for key, incident in self.incidents.items()),
+                        SnapshotTable.build((key, FrozenResource.of(resource)) for key, resource in self.resources.items()),
+                    )
+                snapshot = self._snapshot
+        return snapshot
+
+    def close(self) -> None:
+        """Flushes and closes the storage backend (journal file or database)."""
+        METRICS.remove_collector(self._metric_gauges)
+        self.storage.close()
+
+    def _resident_incidents(self) -> Dict[str, Incident]:
+        """Incidents currently held in memory (all of them unless storage is lazy)."""
+        if isinstance(self.incidents, LazyIncidents):
+            return self.incidents.resident
+        return self.incidents
 
     def _get_data_file_path(self, filename: str) -> str:
         """
@@ -49,41 +317,29 @@ class EmergencyManagement:
         """
         return os.path.join(self.data_dir, filename)
 
+    @timed("save_data")
+    @_locked
     def save_data(self) -> None:
-        """Saves incidents and resources to JSON files."""
-        print("Saving incidents and resources...")
+        """Saves incidents and resources through the storage backend (crash-safe JSON snapshots by default)."""
+        logger.info("Saving incidents and resources...")
         try:
-            save_data_to_file(
-                data={incident_id: incident.to_dict() for incident_id, incident in self.incidents.items()},
-                file_path=self._get_data_file_path("incidents.json"),
-                data_name="incidents",
-            )
-            save_data_to_file(
-                data={resource_id: resource.to_dict() for resource_id, resource in self.resources.items()},
-                file_path=self._get_data_file_path("resources.json"),
-                data_name="resources",
-            )
-            print("Successfully saved incidents and resources.")
+            self.storage.save(self.incidents, self.resources)
+            logger.info("Successfully saved incidents and resources.")
         except Exception as e:
-            print(f"An error occurred while saving data: {e}")
+            logger.error("An error occurred while saving data: %s", e)
             # Consider re-raising the exception if you want the caller to handle it
             raise
 
+    @timed("load_data")
     def load_data(self) -> None:
-        """Loads incidents and resources from JSON files."""
-        print("Loading incidents and resources...")
+        """Loads incidents and resources from the storage backend (JSON snapshots plus journal by default)."""
+        logger.info("Loading incidents and resources...")
+        self._creation_index = None
         try:
-            incidents_data = load_data_from_file(
-                file_path=self._get_data_file_path("incidents.json"), data_name="incidents"
-            )
-            resources_data = load_data_from_file(
-                file_path=self._get_data_file_path("resources.json"), data_name="resources"
-            )
-            self.incidents = {incident_id: Incident.from_dict(data) for incident_id, data in incidents_data.items()}
-            self.resources = {resource_id: Resource.from_dict(data) for resource_id, data in resources_data.items()}
-            print("Successfully loaded incidents and resources.")
+            self.incidents, self.resources = self.storage.load()
+            logger.info("Successfully loaded incidents and resources.")
         except Exception as e:
-            print(f"An error occurred while loading data: {e}")
+            logger.error("An error occurred while loading data: %s", e)
             #  Do NOT re-raise here, because an empty system state is valid on first run
             #   Instead, ensure that the program can start with empty data.
             self.incidents = {}
@@ -91,64 +347,135 @@ class EmergencyManagement:
 
     def _initialize_location_mapping(self) -> Dict[str, tuple]:
         """Initializes the location mapping for resources (private method)."""
-        return {
-            "Zone 1": (51.4592, -0.2567),  # Example coordinates
-            "Zone 2": (51.4761, -0.1441),
-            "Zone 3": (51.4575, -0.1165),
-        }
+        return dict(DEFAULT_LOCATION_MAPPING)
+
+    @_locked
+    def add_zone(self, zone: str, coordinates: tuple) -> None:
+        """
+        Adds (or moves) a zone in the location mapping and re-indexes resources spatially.
+
+        Args:
+            zone (str): The zone name.
+            coordinates (tuple): The (latitude, longitude) of the zone.
+        """
+        self.location_mapping[zone] = coordinates
+        self.spatial_index.set_zones(self.location_mapping)
+        self.spatial_index.rebuild(self.resources)
+
+    def _reindex_resource(self, resource_id: str, resource: Resource) -> None:
+        """Refreshes a resource in the type and spatial indexes after a change."""
+        self.resource_index.update(resource_id, resource)
+        self.spatial_index.update(resource_id, resource)
+
+    def _rebuild_resource_indexes(self) -> None:
+        """Rebuilds the type and spatial indexes from the resources."""
+        self.resource_index.rebuild(self.resources)
+        self.spatial_index.rebuild(self.resources)
+
+    def find_available_resource(self, resource_type: str, location: Optional[str] = None) -> Optional[str]:
+        """
+        Finds an available resource of a type for an incident at a location.
 
+        In proximity mode the nearest unit (by zone coordinates) is chosen; units in
+        unmapped zones, or incidents in unmapped zones, fall back to any available unit.
+
+        Args:
+            resource_type (str): The required resource type.
+            location (Optional[str], optional): The incident's zone. Defaults to None.
+
+        Returns:
+            Optional[str]: The ID of the resource, or None if none of the type is available.
+        """
+        if self.proximity_dispatch and location is not None:
+            resource_id = self.spatial_index.nearest_available(resource_type, location)
+            if resource_id is not None:
+                return resource_id
+        return self.resource_index.first_available(resource_type)
+
+    @timed("process_resource_allocation")
+    @_journaled_operation
     def process_resource_allocation(self) -> None:
         """Allocate available resources to open incidents based on priority."""
-        available_resources = [res for res in self.resources.values() if res.status == ResourceStatus.AVAILABLE]
-        open_incidents = sorted(
-            [inc for inc in self.incidents.values() if inc.status in (IncidentStatus.OPEN, IncidentStatus.IN_PROGRESS)],
-            key=lambda inc: inc.priority,  # Sort by priority
-            reverse=True,  # Assuming higher priority enums come first
+        self._reallocate_all()
+
+        assigned = sum(1 for resource in self.resources.values() if resource.status == ResourceStatus.ASSIGNED)
+        logger.info(
+            "Resource allocation processed: %d active incidents, %d of %d units assigned.",
+            len(self.dispatch_queue), assigned, len(self.resources),
+            extra={"event": "allocation_processed", "active_incidents": len(self.dispatch_queue),
+                   "assigned_units": assigned, "units": len(self.resources)},
         )
+        if logger.isEnabledFor(logging.DEBUG):  # The full dump costs O(incidents) to format
+            lines = ["", "--- Resource Allocation Processed ---"]
+            for incident_id, incident in self.incidents.items():
+                lines.append(f"Incident {incident_id}: Assigned Resources: {incident.assigned_resources}")
+            for resource_id, resource in self.resources.items():
+                lines.append(
+                    f"Resource {resource_id}: Status: {resource.status.value}, Assigned to: {resource.assigned_incident_id}"
+                )
+            lines.append("-------------------------------------\n")
+            logger.debug("\n".join(lines))
+
+    def _reallocate_all(self, changed: Optional[set] = None) -> None:
+        """
+        Runs a full allocation pass with the allocation engine, from scratch.
 
-        # Reset assignments before re-allocating
-        for resource in self.resources.values():
-            if resource.status == ResourceStatus.ASSIGNED:
+        Args:
+            changed (Optional[set], optional): The IDs of the only incidents changed
+                since the incremental allocator was last in sync, so it can refresh
+                its heaps rather than rebuild them. Defaults to None (rebuild).
+        """
+        # Reset assignments before re-allocating: every incident holding a unit, plus all active ones.
+        # Units a dispatcher placed by hand stay where they are.
+        held = self.manual_holds
+        released = set()
+        for resource_id, resource in self.resources.items():
+            if resource.status == ResourceStatus.ASSIGNED and resource_id not in held:
+                holder = self.incidents.get(resource.assigned_incident_id) if resource.assigned_incident_id else None
+                if holder is not None and holder.assigned_resources:
+                    kept = [unit_id for unit_id in holder.assigned_resources if unit_id in held] if held else []
+                    if kept != holder.assigned_resources:
+                        holder.assigned_resources = kept
+                        self._mark_incident(resource.assigned_incident_id)
+                        released.add(resource.assigned_incident_id)
                 resource.status = ResourceStatus.AVAILABLE
                 resource.assigned_incident_id = None
-        for incident in self.incidents.values():
-            incident.assigned_resources = []
-
-        for incident in open_incidents:
-            for required_resource_type in incident.required_resources:
-                # Find an available resource of the required type
-                suitable_resource = next(
-                    (
-                        res
-                        for res in available_resources
-                        if res.resource_type == required_resource_type and res.status == ResourceStatus.AVAILABLE
-                    ),
-                    None,
-                )
-                if suitable_resource:
-                    self.allocate_resource(incident.incident_id, suitable_resource.resource_id)
-                    available_resources.remove(
-                        suitable_resource
-                    )  # Ensure resource isn't allocated again in this cycle
-
-        print("\n--- Resource Allocation Processed ---")
-        for incident_id, incident in self.incidents.items():
-            print(f"Incident {incident_id}: Assigned Resources: {incident.assigned_resources}")
-        for resource_id, resource in self.resources.items():
-            print(
-                f"Resource {resource_id}: Status: {resource.status.value}, Assigned to: {resource.assigned_incident_id}"
-            )
-        print("-------------------------------------\n")
+                resource.touch()
+                self._mark_resource(resource_id)
+        for incident_id in self.dispatch_queue:
+            incident = self.incidents[incident_id]
+            if incident.assigned_resources:
+                kept = [unit_id for unit_id in incident.assigned_resources if unit_id in held] if held else []
+                if kept != incident.assigned_resources:
+                    incident.assigned_resources = kept
+                    self._mark_incident(incident_id)
+                    released.add(incident_id)
+        # Re-index only after the reset so previously assigned units are reconsidered
+        self._rebuild_resource_indexes()
+
+        self.allocation_engine.allocate(self)
+        # Resync the incremental allocator with the new assignments
+        if changed is None:
+            self.allocator.rebuild()
+        else:
+            self.allocator.refresh(changed | released)
 
+    @timed("add_incident")
+    @_journaled_operation
     def add_incident(
         self, location: str, emergency_type: str, priority: Priority, required_resources: List[str]
     ) -> str:
         """Add a new incident to the system."""
         incident = Incident(location, emergency_type, priority, required_resources)
         self.incidents[incident.incident_id] = incident  # Store the incident
-        self.process_resource_allocation()  # Allocate resources immediately
+        self._mark_incident(incident.incident_id)
+        self._index_creation(incident.incident_id, incident)
+        self.dispatch_queue.sync(incident.incident_id, incident)
+        self.allocator.rebalance(incident.incident_id)  # Allocate resources immediately
         return incident.incident_id
 
+    @timed("update_incident")
+    @_journaled_operation
     def update_incident(
         self,
         incident_id: str,
@@ -161,53 +488,457 @@ class EmergencyManagement:
         """Update an existing incident."""
         incident = self.incidents.get(incident_id)  # Directly get the incident by its ID
         if incident:
-            if location:
-                incident.location = location
-            if emergency_type:
-                incident.emerg_type = emergency_type
-            if priority:
-                incident.priority = priority
-            if required_resources:
-                incident.required_resources = required_resources
-            if status:
-                incident.update_status(status)  # Use the update_status method
-            self.process_resource_allocation()
+            self._apply_incident_update(incident_id, incident, location, emergency_type, priority,
+                                        required_resources, status)
+            self.allocator.rebalance(incident_id)
             return True
         return False
 
+    def _apply_incident_update(
+        self,
+        incident_id: str,
+        incident: Incident,
+        location: Optional[str] = None,
+        emergency_type: Optional[str] = None,
+        priority: Optional[Priority] = None,
+        required_resources: Optional[List[str]] = None,
+        status: Optional[IncidentStatus] = None,
+    ) -> None:
+        """Changes the given fields of an incident and re-queues it, without allocating."""
+        if location:
+            incident.location = location
+        if emergency_type:
+            incident.emerg_type = emergency_type
+        if priority:
+            incident.priority = priority
+        if required_resources:
+            incident.required_resources = required_resources
+        if status:
+            incident.update_status(status)  # Use the update_status method
+        self._mark_incident(incident_id)
+        self.dispatch_queue.sync(incident_id, incident)  # Re-key on priority change, drop when resolved
+
+    @timed("ingest_batch")
+    @_journaled_operation
+    def ingest_batch(self, events: Iterable[dict]) -> List[str]:
+        """
+        Applies a batch of incident events, then runs one allocation pass for the whole batch.
+
+        Each event is a dict in the JSON form used by the dispatch service, e.g.
+        {"op": "add_incident", "location": "Zone 1", "emergency_type": "fire",
+        "priority": "HIGH", "required_resources": ["Fire Truck"]} or
+        {"op": "update_incident", "incident_id": "...", "status": "RESOLVED"}.
+        Enum fields may be given by name or as enum members. An add may carry its
+        own incident_id (e.g. when replaying a feed), and an update may refer to an
+        incident added earlier in the same batch.
+
+        The whole batch is validated before anything changes, so it is applied
+        either completely or not at all. The batch is one journal record.
+
+        Args:
+            events (Iterable[dict]): The events, in the order to apply them.
+
+        Returns:
+            List[str]: The IDs of the added incidents, in order.
+
+        Raises:
+            InvalidEventsError: If any event is invalid; nothing is applied.
+        """
+        return self._apply_events(self._parse_events(events))
+
+    def _parse_events(self, events: Iterable[dict]) -> List[tuple]:
+        """Validates a batch of events without changing anything; raises InvalidEventsError."""
+        operations, errors, added = [], [], set()
+        for index, event in enumerate(events):
+            try:
+                operations.append(self._parse_event(event, added))
+            except (ValueError, TypeError, KeyError) as e:
+                errors.append((index, str(e) or type(e).__name__))
+        if errors:
+            raise InvalidEventsError(errors)
+        return operations
+
+    def _apply_events(self, operations: List[tuple]) -> List[str]:
+        """Applies validated events, then runs one allocation pass; returns the added incident IDs."""
+        added_ids, changed = [], set()
+        for op, incident_id, fields in operations:
+            changed.add(incident_id)
+            if op == "add_incident":
+                self.incidents[incident_id] = fields
+                self._mark_incident(incident_id)
+                self._index_creation(incident_id, fields)
+                self.dispatch_queue.sync(incident_id, fields)
+                added_ids.append(incident_id)
+            else:
+                self._apply_incident_update(incident_id, self.incidents[incident_id], **fields)
+        if operations:
+            self._reallocate_all(changed)
+        return added_ids
+
+    def _parse_event(self, event: dict, added: set) -> tuple:
+        """Validates one ingest_batch event and returns it as (op, incident_id, Incident or update fields)."""
+        if not isinstance(event, dict):
+            raise ValueError(f"Event must be an object, got {type(event).__name__}.")
+        op = event.get("op")
+        if op == "add_incident":
+            incident_id = event.get("incident_id")
+            if incident_id is not None and (incident_id in added or incident_id in self.incidents):
+                raise ValueError(f"Incident {incident_id} already exists.")
+            location, emergency_type = event["location"], event["emergency_type"]
+            priority, required_resources = _enum(Priority, event["priority"]), event["required_resources"]
+            if isinstance(required_resources, tuple):
+                required_resources = list(required_resources)
+            if priority is None:
+                raise ValueError("priority is required.")
+            _check_event_fields(location, emergency_type, required_resources)
+            now = datetime.now()
+            # Checked field by field above, so the constructor's checks would only repeat them
+            incident = Incident.trusted(incident_id or new_incident_id(), location, emergency_type, priority,
+                                        list(required_resources), IncidentStatus.OPEN, [], now, now)
+            added.add(incident.incident_id)
+            return op, incident.incident_id, incident
+        if op == "update_incident":
+            incident_id = event["incident_id"]
+            if incident_id not in added and incident_id not in self.incidents:
+                raise ValueError(f"Incident {incident_id} not found.")
+            fields = {
+                "location": event.get("location"),
+                "emergency_type": event.get("emergency_type"),
+                "priority": _enum(Priority, event.get("priority")),
+                "required_resources": event.get("required_resources"),
+                "status": _enum(IncidentStatus, event.get("status")),
+            }
+            _check_event_fields(fields["location"], fields["emergency_type"], fields["required_resources"],
+                                optional=True)
+            return op, incident_id, fields
+        raise ValueError(f"Unknown event op: {op}")
+
+    @_journaled_operation
+    def add_resource(self, resource_id: str, resource: Resource) -> None:
+        """Add a resource to the system and offer it to any incident waiting for its type."""
+        self.resources[resource_id] = resource
+        self._mark_resource(resource_id)
+        self._reindex_resource(resource_id, resource)
+        self.allocator.resource_freed(resource_id)
+
+    @_journaled_operation
+    def remove_resource(self, resource_id: str) -> Optional[Resource]:
+        """
+        Removes a resource from the system, releasing it from its incident first
+        (which is then re-served from the remaining fleet).
+
+        Returns:
+            Optional[Resource]: The removed resource, or None if it was not found.
+        """
+        resource = self.resources.get(resource_id)
+        if resource is None:
+            return None
+        incident_id = resource.assigned_incident_id
+        self._release(resource_id)
+        del self.resources[resource_id]
+        self.manual_holds.discard(resource_id)
+        self._mark_resource(resource_id)
+        self.resource_index.remove(resource_id)
+        self.spatial_index.remove(resource_id)
+        if incident_id:
+            self.allocator.rebalance(incident_id)
+        return resource
+
+    @_journaled_operation
+    def update_resource_status(self, resource_id: str, status: ResourceStatus) -> bool:
+        """
+        Changes the status of a resource, keeping assignments and the type index in sync.
+
+        A resource taken out of service is released from its incident, which is then
+        re-served from the remaining fleet; a resource coming back into service is
+        offered to the most urgent incident waiting for its type.
+        """
+        resource = self.resources.get(resource_id)
+        if not resource or not isinstance(status, ResourceStatus):
+            return False
+        incident_id = resource.assigned_incident_id
+        if resource.status == ResourceStatus.ASSIGNED and status != ResourceStatus.ASSIGNED:
+            self._release(resource_id)
+        resource.status = status
+        resource.touch()
+        self._mark_resource(resource_id)
+        self._reindex_resource(resource_id, resource)
+        if incident_id and status != ResourceStatus.ASSIGNED:
+            self.allocator.rebalance(incident_id)
+        self.allocator.resource_freed(resource_id)
+        return True
+
+    @_locked
+    def get_available_resources(self, resource_type: Optional[str] = None) -> Dict[str, Resource]:
+        """Get available resources, optionally only those of one type (served from the index)."""
+        if resource_type is None:
+            resource_ids = [res_id for res_type in self.resource_index.types()
+                            for res_id in self.resource_index.available(res_type)]
+        else:
+            resource_ids = self.resource_index.available(resource_type)
+        return {resource_id: self.resources[resource_id] for resource_id in resource_ids}
+
+    @_locked
+    def find_incidents(
+        self,
+        status: Optional[IncidentStatus] = None,
+        priority: Optional[Priority] = None,
+        location: Optional[str] = None,
+    ) -> List[Incident]:
+        """
+        Find incidents by status, priority and/or location.
+
+        With a storage backend that supports queries (e.g. SQLiteStorage) this runs
+        as an indexed query and only the matches are materialized.
+        """
+        if self.storage.supports_queries:
+            resident = self._resident_incidents()
+            rows = self.storage.query_incidents(
+                status=status.name if status else None,
+                priority=priority.name if priority else None,
+                location=location,
+            )
+            return [resident.get(incident_id) or Incident.from_trusted_dict(data) for incident_id, data in rows]
+        return [
+            incident for incident in self.incidents.values()
+            if (status is None or incident.status == status)
+            and (priority is None or incident.priority == priority)
+            and (location is None or incident.location == location)
+        ]
+
+    @_locked
+    def find_resources(
+        self,
+        resource_type: Optional[str] = None,
+        status: Optional[ResourceStatus] = None,
+        assigned_incident_id: Optional[str] = None,
+    ) -> List[Resource]:
+        """Find resources by type, status and/or assigned incident (an indexed query when supported)."""
+        if self.storage.supports_queries:
+            resource_ids = self.storage.query_resources(
+                resource_type=resource_type,
+                status=status.name if status else None,
+                assigned_incident_id=assigned_incident_id,
+            )
+            return [self.resources[resource_id] for resource_id in resource_ids if resource_id in self.resources]
+        return [
+            resource for resource in self.resources.values()
+            if (resource_type is None or resource.resource_type == resource_type)
+            and (status is None or resource.status == status)
+            and (assigned_incident_id is None or resource.assigned_incident_id == assigned_incident_id)
+        ]
+
     def view_incidents(self) -> List[Incident]:
-        """View all incidents."""
-        return list(self.incidents.values())  # Return a list of Incident objects
+        """
+        View all incidents as of the last completed operation: read-only records
+        from the current snapshot (see snapshot()), so the list is consistent, read
+        without locking, and not changed by later writes. With lazy storage, where a
+        snapshot would hold the whole history in memory, the incidents are streamed
+        from storage under the lock and frozen as they are read instead.
+        """
+        if isinstance(self.incidents, LazyIncidents):
+            with self._lock:
+                return [FrozenIncident.of(incident) for incident in self.incidents.values()]
+        return list(self.snapshot().incidents.values())
+
+    def _index_creation(self, incident_id: str, incident: Incident) -> None:
+        if self._creation_index is not None:
+            self._creation_index.add(incident_id, incident.created_at)
+
+    def _fetch_incidents(self, incident_ids: List[str]) -> List[Incident]:
+        """The incidents with the given IDs; with lazy storage, history is not made resident."""
+        if isinstance(self.incidents, LazyIncidents):
+            return [self.incidents.fetch(incident_id) for incident_id in incident_ids]
+        return [self.incidents[incident_id] for incident_id in incident_ids]
+
+    def _creation_order(self) -> CreationIndex:
+        if self._creation_index is None:
+            self._creation_index = CreationIndex()
+            self._creation_index.rebuild(self.incidents.items())
+        return self._creation_index
+
+    @_locked
+    def _created_between(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         after: Optional[Tuple[datetime, str]] = None) -> List[str]:
+        """The IDs of incidents created in [since, until), read from the creation-time index under the lock."""
+        return self._creation_order().between(since, until, after)
+
+    @_locked
+    def incidents_created_between(self, since: Optional[datetime] = None,
+                                  until: Optional[datetime] = None) -> List[Incident]:
+        """
+        Incidents created in [since, until), oldest first; None leaves that end open.
+
+        A range scan of the creation-time index, O(log n + matches), built by the
+        first call; with a storage backend that supports queries, an indexed query.
+        """
+        if self.storage.supports_queries:
+            resident = self._resident_incidents()
+            rows = self.storage.query_incidents(since=since.isoformat() if since else None,
+                                                until=until.isoformat() if until else None)
+            return [resident.get(incident_id) or Incident.from_trusted_dict(data) for incident_id, data in rows]
+        return self._fetch_incidents(self._creation_order().between(since, until))
+
+    @_locked
+    def recent_incidents(self, count: int = 10) -> List[Incident]:
+        """The count most recently created incidents, newest first (a range scan, as incidents_created_between)."""
+        if self.storage.supports_queries:
+            resident = self._resident_incidents()
+            rows = self.storage.query_incidents(newest_first=True, limit=max(count, 0))
+            return [resident.get(incident_id) or Incident.from_trusted_dict(data) for incident_id, data in rows]
+        return self._fetch_incidents(self._creation_order().latest(count))
 
-    def view_resources(self) -> List[Resource]:
-        """View all resources."""
-        return list(self.resources.values())
+    @_locked
+    def page_incidents(self, start: int = 0, count: int = 50) -> List[Incident]:
+        """View a page of incidents in stored order; with lazy storage, history is not kept in memory."""
+        if isinstance(self.incidents, LazyIncidents):
+            return self.incidents.page(start, count)
+        return list(itertools.islice(self.incidents.values(), start, start + count))
 
-    def allocate_resource(self, incident_id: str, resource_id: str) -> bool:
-        """Allocates a specific resource to a specific incident."""
+    @_locked
+    def view_resources(self, resource_type: Optional[str] = None) -> List[Resource]:
+        """View all resources, or only those of the given type."""
+        if resource_type is None:
+            return list(self.resources.values())
+        return [self.resources[resource_id] for resource_id in self.resource_index.of_type(resource_type)]
+
+    @_journaled_operation
+    def allocate_resource(self, incident_id: str, resource_id: str,
+                          expected_updated_at: Optional[datetime] = None) -> bool:
+        """
+        Allocates a specific resource to a specific incident, if it is available.
+
+        The check and the assignment are one atomic step in thread-safe mode, so
+        two dispatchers can never both get the same unit. The unit becomes a manual
+        hold (see manual_holds): the allocator never moves it, full allocation
+        passes leave it in place, and it counts towards the incident's requirements.
+        The hold ends when the unit is released or the incident is resolved; it is
+        not kept across restarts.
+
+        Args:
+            expected_updated_at (Optional[datetime], optional): The resource's
+                updated_at as the caller last saw it; the allocation fails if the
+                resource has changed since (compare-and-set). Defaults to None.
+        """
+        resource = self.resources.get(resource_id)
+        if resource is None or not _unchanged(resource, expected_updated_at):
+            return False
+        if not self._assign(incident_id, resource_id):
+            return False
+        self.manual_holds.add(resource_id)
+        self.allocator.rebalance(incident_id)  # Hands back any unit the hold makes surplus
+        return True
+
+    @_journaled_operation
+    def release_resource(self, resource_id: str, expected_updated_at: Optional[datetime] = None) -> bool:
+        """
+        Releases a resource from its current incident and makes it available again
+        (if it is unchanged since expected_updated_at, when given), ending any manual hold.
+
+        The unit is then offered to the most urgent incident waiting for its type and
+        the incident re-served, as after any other change. If that gives the
+        unit straight back to the same incident (it still requires the unit and
+        nothing more urgent is waiting), nothing was released and False is
+        returned; resolve the incident or change its requirements instead.
+        """
+        resource = self.resources.get(resource_id)
+        if resource is None or not _unchanged(resource, expected_updated_at):
+            return False
+        incident_id = resource.assigned_incident_id
+        if not self._release(resource_id):
+            return False
+        self.allocator.resource_freed(resource_id)  # Incidents already waiting come first
+        if incident_id:
+            self.allocator.rebalance(incident_id)
+        return incident_id is None or resource.assigned_incident_id != incident_id
+
+    @_journaled_operation
+    def reallocate_resource(self, new_incident_id: str, resource_id: str,
+                            expected_updated_at: Optional[datetime] = None) -> bool:
+        """
+        Reallocates a resource from its current incident to a new incident
+        (if it is unchanged since expected_updated_at, when given).
+
+        The unit becomes a manual hold of the new incident, as with allocate_resource,
+        so the allocator does not move it back. The incident that lost it is re-served
+        like any other changed incident.
+        """
+        resource = self.resources.get(resource_id)
+        if resource is None or not _unchanged(resource, expected_updated_at):
+            return False
+        previous_incident_id = resource.assigned_incident_id
+        if not self._reassign(new_incident_id, resource_id):
+            return False
+        self.manual_holds.add(resource_id)
+        self.allocator.rebalance(new_incident_id)
+        if previous_incident_id and previous_incident_id != new_incident_id:
+            self.allocator.rebalance(previous_incident_id)
+        return True
+
+    def _unmet_requirements(self, incident: Incident) -> List[str]:
+        """The incident's required resource types not covered by the units it already holds."""
+        if not incident.assigned_resources:
+            return incident.required_resources
+        held = Counter(self.resources[resource_id].resource_type
+                       for resource_id in incident.assigned_resources if resource_id in self.resources)
+        unmet = []
+        for resource_type in incident.required_resources:
+            if held[resource_type] > 0:
+                held[resource_type] -= 1
+            else:
+                unmet.append(resource_type)
+        return unmet
+
+    def _assign(self, incident_id: str, resource_id: str) -> bool:
+        """Assigns an available resource to an incident; the allocator's primitive (no resync)."""
         resource = self.resources.get(resource_id)
         incident = self.incidents.get(incident_id)
         if resource and resource.status == ResourceStatus.AVAILABLE and incident:
             resource.status = ResourceStatus.ASSIGNED
             resource.assigned_incident_id = incident_id
+            resource.touch()
             incident.assigned_resources.append(resource_id)
+            self._mark_resource(resource_id)
+            self._mark_incident(incident_id)
+            self._reindex_resource(resource_id, resource)
             return True
         return False
 
-    def reallocate_resource(self, new_incident_id: str, resource_id: str) -> bool:
-        """Reallocates a resource from its current incident to a new incident."""
+    def _release(self, resource_id: str) -> bool:
+        """Makes an assigned resource available again; the allocator's primitive (no resync)."""
         resource = self.resources.get(resource_id)
-        new_incident = self.incidents.get(new_incident_id)
+        if resource and resource.status == ResourceStatus.ASSIGNED:
+            current_incident = self.incidents.get(resource.assigned_incident_id)
+            if current_incident and resource_id in current_incident.assigned_resources:
+                current_incident.assigned_resources.remove(resource_id)
+                self._mark_incident(resource.assigned_incident_id)
+            resource.status = ResourceStatus.AVAILABLE
+            resource.assigned_incident_id = None
+            resource.touch()
+            self.manual_holds.discard(resource_id)
+            self._mark_resource(resource_id)
+            self._reindex_resource(resource_id, resource)
+            return True
+        return False
 
+    def _reassign(self, new_incident_id: str, resource_id: str) -> bool:
+        """Moves a resource to another incident; the allocator's primitive (no resync)."""
+        resource = self.resources.get(resource_id)
+        new_incident = self.incidents.get(new_incident_id)
         if resource and new_incident:
             current_incident_id = resource.assigned_incident_id
             if current_incident_id:
                 current_incident = self.incidents.get(current_incident_id)
                 if current_incident:
                     current_incident.assigned_resources.remove(resource_id)
+                    self._mark_incident(current_incident_id)
             resource.assigned_incident_id = new_incident_id
             resource.status = ResourceStatus.ASSIGNED
+            resource.touch()
             new_incident.assigned_resources.append(resource_id)
+            self._mark_resource(resource_id)
+            self._mark_incident(new_incident_id)
+            self._reindex_resource(resource_id, resource)
             return True
         return False
 
@@ -218,15 +949,90 @@ class EmergencyManagement:
         incident = self.incidents.get(new_incident_id)
         if incident and incident.priority == Priority.HIGH:  # Adjust based on your highest priority
             print(f"Initiating resource reallocation for new high-priority incident: {new_incident_id}")
-            self.process_resource_allocation()
+            self.allocator.rebalance(new_incident_id)
 
     def get_incident_report(self) -> List[Incident]:
-        """Generate a report of all incidents."""
-        return list(self.incidents.values())
+        """
+        Generate a report of all incidents: read-only records that never change,
+        listed as by view_incidents.
+        """
+        return self.view_incidents()
+
+    def stream_incident_report(
+        self,
+        status: Optional[IncidentStatus] = None,
+        priority: Optional[Priority] = None,
+        location: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "arrival",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> IncidentReport:
+        """
+        A filtered, paginated incident report that is streamed rather than built in
+        memory (see IncidentReport for the arguments and output formats).
 
+        Each page reads the snapshot current when it is opened, so it is consistent
+        while other threads dispatch, and a cursor stays valid across versions.
+        With lazy storage the report streams from storage instead. A time range is
+        read from the creation-time index (see incidents_created_between), so only
+        the incidents created in it are read.
+        """
+        source = self.incidents if isinstance(self.incidents, LazyIncidents) else self.snapshot().incidents
+        return IncidentReport(source, status, priority, location, since, until, sort, cursor, limit,
+                              time_index=self._created_between)
+
+    def _print_report(self) -> None:
+        """Menu option 7: asks for filters and a format, then pages the report or writes it to a file."""
+        status_str = input("Filter by status (OPEN, IN_PROGRESS, RESOLVED, CLOSED, or leave blank): ").strip()
+        priority_str = input("Filter by priority (HIGH, MEDIUM, LOW, or leave blank): ").strip()
+        location = input("Filter by zone (or leave blank): ").strip() or None
+        since_str = input("Created since (YYYY-MM-DD [HH:MM], or leave blank): ").strip()
+        until_str = input("Created before (YYYY-MM-DD [HH:MM], or leave blank): ").strip()
+        sort = input("Sort by (arrival, priority) [arrival]: ").strip().lower() or "arrival"
+        fmt = input("Format (text, csv, jsonl) [text]: ").strip().lower() or "text"
+        path = input("Write to file (or leave blank to show on screen): ").strip()
+        filters = {
+            "status": IncidentStatus[status_str.upper()] if status_str else None,
+            "priority": Priority[priority_str.upper()] if priority_str else None,
+            "location": location,
+            "since": datetime.fromisoformat(since_str) if since_str else None,
+            "until": datetime.fromisoformat(until_str) if until_str else None,
+            "sort": sort,
+        }
+        if path:
+            with open(path, "w", newline="") as out:
+                written = self.stream_incident_report(**filters).write(out, fmt)
+            print(f"{written} incident(s) written to {path}.")
+            return
+        cursor, shown = None, 0
+        while True:
+            page = self.stream_incident_report(**filters, cursor=cursor, limit=20)
+            shown += page.write(sys.stdout, fmt)
+            cursor = page.next_cursor
+            if cursor is None or input("Press Enter for the next page, or q to stop: ").strip().lower() == "q":
+                break
+        if not shown:
+            print("No incidents to report.")
+
+    @_locked
     def get_active_incidents(self) -> List[Incident]:
-        """Get all active incidents."""
-        return [incident for incident in self.incidents.values() if incident.status == IncidentStatus.OPEN]
+        """Get all active incidents (only the dispatch queue is scanned, not the full history)."""
+        return [
+            self.incidents[incident_id]
+            for incident_id in self.dispatch_queue
+            if self.incidents[incident_id].status == IncidentStatus.OPEN
+        ]
+
+    @_locked
+    def get_open_incidents(self) -> Dict[str, Incident]:
+        """Get open incidents keyed by ID, most urgent first."""
+        return {
+            incident_id: self.incidents[incident_id]
+            for incident_id in self.dispatch_queue.in_order()
+            if self.incidents[incident_id].status == IncidentStatus.OPEN
+        }
 
     def run(self) -> None:
         """Run the emergency management system."""
@@ -311,7 +1117,8 @@ class EmergencyManagement:
                         print("Failed to reallocate resource. Check IDs and resource assignment.")
 
                 elif choice == "6":
-                    resources = self.view_resources()
+                    resource_type = input("Enter resource type to filter by (or leave blank): ").strip() or None
+                    resources = self.view_resources(resource_type)
                     if resources:
                         for resource in resources:
                             print(f"Resource ID: {resource.resource_id}")
@@ -324,16 +1131,12 @@ class EmergencyManagement:
                         print("No resources to display.")
 
                 elif choice == "7":
-                    report = self.get_incident_report()
-                    if report:
-                        for incident in report:
-                            print(incident)
-                    else:
-                        print("No incidents to report.")
+                    self._print_report()
 
                 elif choice == "8":
                     # Save data before exiting
                     self.save_data()
+                    self.close()
                     print("Exiting Emergency Management System.  Goodbye!")
                     break
                 else:
@@ -344,7 +1147,9 @@ class EmergencyManagement:
                 print("Please try again.")  # Provide a user-friendly message
 
 if __name__ == "__main__":
-    ems = EmergencyManagement()
+    from app.utils.log import configure_logging
+    configure_logging(level="DEBUG")
+    ems = EmergencyManagement(journal=True)
     ems.run()
 
         
\ No newline at end of file
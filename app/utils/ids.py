@@ -0,0 +1,74 @@
+"""
+Time-sortable record IDs.
+
+new_id() returns a ULID: 48 bits of Unix time in milliseconds followed by 80
+random bits, written as 26 Crockford base32 characters. The text sorts as the
+time does, and IDs issued by one process are strictly increasing even within a
+millisecond (the previous ID is then incremented). An ID is still a plain
+string: IDs of any other form, such as the UUIDs of older records or IDs chosen
+by a feed, are accepted everywhere as before.
+"""
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+ULID_LENGTH = 26
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_PAIRS = [first + second for first in _ALPHABET for second in _ALPHABET]  # 10 bits -> two characters
+_VALUES = {character: value for value, character in enumerate(_ALPHABET)}
+_ULID = re.compile(r"[0-7][0-9A-HJKMNP-TV-Z]{25}")  # Canonical form only, so the text round-trips through bytes
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last = 0  # The last ID issued, as an integer
+
+
+def _encode(value: int) -> str:
+    pairs = []
+    for _ in range(ULID_LENGTH // 2):
+        pairs.append(_PAIRS[value & 0x3FF])
+        value >>= 10
+    return "".join(reversed(pairs))
+
+
+def _decode(identifier: str) -> int:
+    value = 0
+    for character in identifier:
+        value = value << 5 | _VALUES[character]
+    return value
+
+
+def new_id() -> str:
+    """Returns a new ULID, greater than every ID this process issued before."""
+    global _last
+    value = time.time_ns() // 1_000_000 << _RANDOM_BITS | int.from_bytes(os.urandom(10), "big")
+    with _lock:
+        if value <= _last:  # Same millisecond (or the clock stepped back)
+            value = _last + 1
+        _last = value
+    return _encode(value)
+
+
+def is_ulid(identifier: str) -> bool:
+    """True if the string is a ULID in canonical (upper-case) form."""
+    return len(identifier) == ULID_LENGTH and _ULID.fullmatch(identifier) is not None
+
+
+def ulid_to_bytes(identifier: str) -> bytes:
+    """The 16-byte form of a ULID."""
+    return _decode(identifier).to_bytes(16, "big")
+
+
+def ulid_from_bytes(data: bytes) -> str:
+    """The ULID whose 16-byte form this is."""
+    return _encode(int.from_bytes(data, "big"))
+
+
+def id_time(identifier: str) -> Optional[datetime]:
+    """The local time a ULID was issued (to the millisecond), or None for IDs of other forms."""
+    if not is_ulid(identifier):
+        return None
+    return datetime.fromtimestamp((_decode(identifier) >> _RANDOM_BITS) / 1000)
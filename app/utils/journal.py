@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Append-only JSONL write-ahead log of state changes.
+
+    Each record holds the full after-state of the incidents and resources touched
+    by one mutation, so replaying a record is an idempotent upsert and replaying
+    a record that is already reflected in the snapshot is harmless. A removed
+    resource is recorded as None.
+
+    Records are flushed to the OS on every append (a process crash loses nothing),
+    while fsync is batched: it runs every `fsync_every` records or once
+    `fsync_interval` seconds have passed since the last one.
+    """
+
+    def __init__(self, file_path: str, fsync_every: int = 32, fsync_interval: float = 1.0):
+        """
+        Opens (or creates) the journal for appending.
+
+        Args:
+            file_path (str): The path to the journal file.
+            fsync_every (int, optional): Records per fsync batch. Defaults to 32.
+            fsync_interval (float, optional): Maximum seconds between fsyncs.
+                Defaults to 1.0.
+        """
+        self.file_path = file_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _drop_torn_tail(file_path)  # New records must start on a line of their own
+        self._file = open(file_path, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.records_since_compaction = 0
+
+    def append(self, op: str, incidents: Dict[str, dict], resources: Dict[str, dict]) -> None:
+        """
+        Appends one mutation record.
+
+        Args:
+            op (str): The name of the operation (e.g. "add_incident").
+            incidents (Dict[str, dict]): After-state of the touched incidents.
+            resources (Dict[str, dict]): After-state of the touched resources.
+        """
+        record = {"op": op, "ts": time.time(), "incidents": incidents, "resources": resources}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._pending += 1
+        self.records_since_compaction += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Forces buffered records to stable storage."""
+        if self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def truncate(self) -> None:
+        """Empties the journal once its records are covered by a snapshot."""
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self.records_since_compaction = 0
+
+    def close(self) -> None:
+        """Syncs and closes the journal."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def _drop_torn_tail(file_path: str, chunk_size: int = 65536) -> None:
+    """
+    Cuts a journal back to its last complete line, removing the fragment a crash
+    mid-append leaves behind. Appending after such a fragment would glue the next
+    record onto it, and that line could then no longer be replayed.
+    """
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - chunk_size, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            logger.warning("Dropping incomplete final record (%d bytes) from %s", end - position, file_path)
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def replay_journal(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of a journal file in order.
+
+    A torn final line (from a crash mid-append) is ignored; a corrupt record
+    anywhere else raises json.JSONDecodeError.
+
+    Args:
+        file_path (str): The path to the journal file.
+
+    Yields:
+        dict: Records with "op", "ts", "incidents" and "resources" keys.
+    """
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, "r", encoding="utf-8") as f:
+        pending: Optional[str] = None
+        for line in f:
+            if pending is not None:
+                yield json.loads(pending)
+            pending = line if line.strip() else None
+        if pending is not None:
+            try:
+                record = json.loads(pending)
+            except json.JSONDecodeError:
+                if pending.endswith("\n"):
+                    raise
+                logger.warning("Ignoring incomplete final record in %s", file_path)
+                return
+            yield record
@@ -0,0 +1,60 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional, TextIO, Union
+
+LOGGER_NAME = "app"  # Every module logs under this name via logging.getLogger(__name__)
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object: time, level, logger and message, plus
+    any fields passed through `extra` (e.g. the "event" name and its counts).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    level: Union[int, str] = logging.INFO, json_format: bool = False, stream: Optional[TextIO] = None
+) -> logging.Handler:
+    """
+    Sends the app's log records to a stream, replacing any handler set up by an earlier call.
+
+    Args:
+        level (Union[int, str], optional): The lowest level to emit. DEBUG includes
+            the full per-incident dump after each allocation pass. Defaults to INFO.
+        json_format (bool, optional): If True, emit one JSON object per line;
+            otherwise just the message, as the interactive menu shows it.
+            Defaults to False.
+        stream (Optional[TextIO], optional): Where to write. Defaults to stdout.
+
+    Returns:
+        logging.Handler: The installed handler.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_configured_by_app", False):
+            logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter("%(message)s"))
+    handler._configured_by_app = True
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
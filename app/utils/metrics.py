@@ -0,0 +1,226 @@
+"""
+Timing histograms and state gauges, exported in the Prometheus text format.
+
+Methods are marked with @timed("operation") inside classes decorated with
+@instrumented. Marking changes nothing: the marked methods are only swapped
+for timing wrappers while metrics are enabled, so disabled metrics cost
+nothing on hot paths such as to_dict/from_dict.
+
+    from app.utils import metrics
+    metrics.enable()
+    ...
+    metrics.write_metrics("data/metrics.prom")   # For a textfile collector
+    metrics.start_metrics_server(9100)           # Or serve GET /metrics
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds, from a single to_dict call up to a large allocation pass or save
+DURATION_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+_DURATION_METRIC = "emergency_operation_duration_seconds"
+
+# A gauge sample: (metric name, help text, labels, value)
+GaugeSample = Tuple[str, str, Dict[str, str], float]
+
+
+class MetricsRegistry:
+    """Holds the duration histograms and the gauge collectors."""
+
+    def __init__(self, buckets: Iterable[float] = DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, list] = {}  # operation -> [bucket counts (+Inf last), sum]
+        self._collectors: List[Callable[[], Optional[Callable[[], Iterable[GaugeSample]]]]] = []
+        self._classes: List[type] = []
+        self._originals: List[Tuple[type, str, object]] = []
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Records one duration for an operation."""
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[1] += seconds
+
+    def add_collector(self, collect: Callable[[], Iterable[GaugeSample]]) -> None:
+        """
+        Registers a gauge source, evaluated only when metrics are rendered.
+
+        Bound methods are held weakly, so registering an object's method does not
+        keep the object alive.
+        """
+        if hasattr(collect, "__self__"):
+            self._collectors.append(weakref.WeakMethod(collect))
+        else:
+            self._collectors.append(lambda: collect)
+
+    def remove_collector(self, collect: Callable[[], Iterable[GaugeSample]]) -> None:
+        """Unregisters a gauge source added with add_collector."""
+        self._collectors = [reference for reference in self._collectors if reference() != collect]
+
+    def add_class(self, cls: type) -> None:
+        self._classes.append(cls)
+        if self.enabled:
+            self._patch(cls)
+
+    def enable(self) -> None:
+        """Starts timing the marked methods of every instrumented class."""
+        if not self.enabled:
+            self.enabled = True
+            for cls in self._classes:
+                self._patch(cls)
+
+    def disable(self) -> None:
+        """Restores the original methods; recorded values are kept."""
+        if self.enabled:
+            self.enabled = False
+            for cls, name, original in reversed(self._originals):
+                setattr(cls, name, original)
+            self._originals.clear()
+
+    def reset(self) -> None:
+        """Discards the recorded durations."""
+        with self._lock:
+            self._histograms.clear()
+
+    def _patch(self, cls: type) -> None:
+        for name, attribute in list(vars(cls).items()):
+            is_classmethod = isinstance(attribute, classmethod)
+            function = attribute.__func__ if is_classmethod else attribute
+            operation = getattr(function, "_timed_operation", None)
+            if operation is None:
+                continue
+            wrapper = _timing_wrapper(self, operation, function)
+            setattr(cls, name, classmethod(wrapper) if is_classmethod else wrapper)
+            self._originals.append((cls, name, attribute))
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            histograms = {operation: (list(counts), total) for operation, (counts, total) in self._histograms.items()}
+        if histograms:
+            lines.append(f"# HELP {_DURATION_METRIC} Time spent in instrumented operations.")
+            lines.append(f"# TYPE {_DURATION_METRIC} histogram")
+            for operation in sorted(histograms):
+                counts, total = histograms[operation]
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{_DURATION_METRIC}_bucket{{operation="{operation}",le="{le}"}} {cumulative}')
+                lines.append(f'{_DURATION_METRIC}_sum{{operation="{operation}"}} {total!r}')
+                lines.append(f'{_DURATION_METRIC}_count{{operation="{operation}"}} {cumulative}')
+
+        gauges: Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], float]]] = {}
+        for reference in list(self._collectors):
+            collect = reference()
+            if collect is None:  # Its owner was garbage collected
+                self._collectors.remove(reference)
+                continue
+            for name, help_text, labels, value in collect():
+                samples = gauges.setdefault(name, (help_text, defaultdict(float)))[1]
+                samples[tuple(sorted(labels.items()))] += value  # Summed across collectors
+        for name in sorted(gauges):
+            help_text, samples = gauges[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(samples.items()):
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _timing_wrapper(registry: MetricsRegistry, operation: str, function: Callable) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            registry.observe(operation, time.perf_counter() - start)
+    return wrapper
+
+
+REGISTRY = MetricsRegistry()
+
+
+def timed(operation: str) -> Callable:
+    """Marks a method of an @instrumented class to be timed under an operation name."""
+    def mark(function: Callable) -> Callable:
+        function._timed_operation = operation
+        return function
+    return mark
+
+
+def instrumented(cls: type) -> type:
+    """Class decorator: makes the class's @timed methods timed while metrics are enabled."""
+    REGISTRY.add_class(cls)
+    return cls
+
+
+def enable() -> None:
+    REGISTRY.enable()
+
+
+def disable() -> None:
+    REGISTRY.disable()
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def write_metrics(file_path: str) -> None:
+    """Atomically writes the current metrics to a file (e.g. for node_exporter's textfile collector)."""
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{file_path}.tmp.{os.getpid()}"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(temp_path, file_path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # Scrapes are not worth a log line each
+        pass
+
+
+def start_metrics_server(port: int = 9100, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics from a daemon thread and enables metrics.
+
+    Returns:
+        ThreadingHTTPServer: The server; call shutdown() to stop it. Its
+            server_address holds the bound port (useful with port=0).
+    """
+    enable()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,220 @@
+"""
+Streaming incident reports.
+
+An IncidentReport walks the incidents one at a time, filtering and formatting
+each as it goes, so memory stays flat however many incidents match. A report
+can be cut into pages: after a page, next_cursor names where the following page
+starts, and a report opened at that cursor seeks straight to it (O(log n) on a
+snapshot) instead of re-reading everything before it.
+
+A report limited to a time range reads only the incidents created in it, found
+by bisection in a creation-time index (see CreationIndex) when one is given;
+otherwise every incident is read and the range is a filter like the others.
+The priority sort reads the incidents once per priority level, so it costs up to
+three reads of the range, in exchange for holding nothing in memory.
+"""
+import csv
+import json
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, TextIO, Tuple
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+REPORT_FORMATS = ("text", "csv", "jsonl")
+SORT_ORDERS = ("arrival", "priority")  # Arrival order is insertion order, which is creation order
+
+CSV_COLUMNS = ("incident_id", "status", "priority", "location", "emerg_type", "required_resources",
+               "assigned_resources", "created_at", "updated_at")
+
+_TEXT_HEADER = f"{'Incident ID':<36}  {'Status':<11}  {'Priority':<8}  {'Location':<12}  " \
+               f"{'Type':<16}  {'Created':<16}  Assigned"
+
+
+def _text_line(incident: Incident) -> str:
+    return (f"{incident.incident_id:<36}  {incident.status.value:<11}  {incident.priority.value:<8}  "
+            f"{incident.location:<12}  {incident.emerg_type:<16}  {incident.created_at:%Y-%m-%d %H:%M}  "
+            f"{', '.join(incident.assigned_resources) or '-'}")
+
+
+def _csv_row(incident: Incident) -> tuple:
+    return (incident.incident_id, incident.status.name, incident.priority.name, incident.location,
+            incident.emerg_type, ";".join(incident.required_resources), ";".join(incident.assigned_resources),
+            incident.created_at.isoformat(), incident.updated_at.isoformat())
+
+
+class IncidentReport:
+    """
+    The incidents matching a set of filters, streamed in order, optionally one page at a time.
+
+    Iterate it for the incidents, or write() it in one of REPORT_FORMATS. Once a
+    page has been consumed, next_cursor is the cursor of the page after it, or
+    None if nothing follows.
+    """
+
+    def __init__(
+        self,
+        source,
+        status: Optional[IncidentStatus] = None,
+        priority: Optional[Priority] = None,
+        location: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "arrival",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        time_index: Optional[Callable[..., List[str]]] = None,
+    ):
+        """
+        Initializes the report; nothing is read until it is iterated.
+
+        Args:
+            source: The incidents as a mapping whose items() are in insertion order:
+                a SnapshotTable (whose items_after() is used to seek) or LazyIncidents.
+            status (Optional[IncidentStatus], optional): Only incidents with this status.
+            priority (Optional[Priority], optional): Only incidents with this priority.
+            location (Optional[str], optional): Only incidents in this zone.
+            since (Optional[datetime], optional): Only incidents created at or after this time.
+            until (Optional[datetime], optional): Only incidents created before this time.
+            sort (str, optional): "arrival" for creation order, or "priority" for the
+                most urgent first (then creation order), read as one pass per
+                priority level. Defaults to "arrival". With a time_index and a
+                time range, creation order is by creation time.
+            cursor (Optional[str], optional): The next_cursor of the previous page,
+                opened with the same filters. Defaults to None, the first page.
+            limit (Optional[int], optional): The page size. Defaults to None, the
+                whole report.
+            time_index (Optional[Callable[..., List[str]]], optional): A function
+                called as CreationIndex.between(since, until, after) that returns
+                the IDs created in the range, oldest first, used when since or
+                until is set. IDs missing from the source are skipped. Defaults to
+                None, which reads every incident.
+
+        Raises:
+            ValueError: If the sort order, limit or cursor is invalid.
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order: {sort}. Must be one of {list(SORT_ORDERS)}.")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1.")
+        self._source = source
+        self.status = status
+        self.priority = priority
+        self.location = location
+        self.since = since
+        self.until = until
+        self.sort = sort
+        self.limit = limit
+        self._time_index = time_index
+        self._start: Tuple[Optional[Priority], Optional[str]] = self._parse_cursor(cursor) if cursor else (None, None)
+        self.next_cursor: Optional[str] = None
+
+    def _parse_cursor(self, cursor: str) -> Tuple[Optional[Priority], str]:
+        """Returns (priority level or None, last incident ID shown) from a cursor."""
+        sort, level, incident_id = (cursor.split(":", 2) + ["", ""])[:3]
+        if sort != self.sort or not incident_id:
+            raise ValueError(f"Invalid cursor for a report sorted by {self.sort}: {cursor}")
+        if incident_id not in self._source:
+            raise ValueError(f"Cursor refers to an unknown incident: {incident_id}")
+        try:
+            return (Priority[level] if level else None), incident_id
+        except KeyError:
+            raise ValueError(f"Invalid cursor for a report sorted by {self.sort}: {cursor}") from None
+
+    def _cursor(self, level: Optional[Priority], incident_id: str) -> str:
+        return f"{self.sort}:{level.name if level else ''}:{incident_id}"
+
+    def __iter__(self) -> Iterator[Incident]:
+        self.next_cursor = None
+        shown, last = 0, None
+        for level, incident in self._matches():
+            if shown == self.limit:  # One more match exists, so there is a next page
+                self.next_cursor = self._cursor(*last)
+                return
+            yield incident
+            shown, last = shown + 1, (level, incident.incident_id)
+
+    def _matches(self) -> Iterator[Tuple[Optional[Priority], Incident]]:
+        """Yields (priority level of the pass, incident) for every match, in report order."""
+        start_level, after = self._start
+        if self.sort == "arrival":
+            levels = [None]
+        else:
+            levels = [self.priority] if self.priority else sorted(Priority, key=lambda level: level.order)
+            if start_level is not None:
+                levels = [level for level in levels if level.order >= start_level.order]
+        for level in levels:
+            for incident in self._scan(after if level == start_level else None):
+                if (level is None or incident.priority == level) and self._wanted(incident):
+                    yield level, incident
+
+    def _scan(self, after: Optional[str]) -> Iterator[Incident]:
+        """Streams the source's incidents in insertion order, starting after the given ID."""
+        if self._time_index is not None and (self.since is not None or self.until is not None):
+            yield from self._scan_range(after)
+            return
+        if after is None:
+            items = iter(self._source.items())
+        elif hasattr(self._source, "items_after"):
+            items = self._source.items_after(after)
+        else:  # Storage streams cannot seek: skip to the cursor
+            items = iter(self._source.items())
+            for incident_id, _ in items:
+                if incident_id == after:
+                    break
+        for _, incident in items:
+            yield incident
+
+    def _scan_range(self, after: Optional[str]) -> Iterator[Incident]:
+        """Streams the incidents created in the report's time range, from the index, starting after the given ID."""
+        resume = (self._fetch(after).created_at, after) if after is not None else None
+        for incident_id in self._time_index(self.since, self.until, resume):
+            if incident_id in self._source:  # Not in the source if created after it was read
+                yield self._fetch(incident_id)
+
+    def _fetch(self, incident_id: str) -> Incident:
+        """Reads one incident; from storage, without making it resident."""
+        fetch = getattr(self._source, "fetch", None)
+        return fetch(incident_id) if fetch is not None else self._source[incident_id]
+
+    def _wanted(self, incident: Incident) -> bool:
+        return ((self.status is None or incident.status == self.status)
+                and (self.priority is None or incident.priority == self.priority)
+                and (self.location is None or incident.location == self.location)
+                and (self.since is None or incident.created_at >= self.since)
+                and (self.until is None or incident.created_at < self.until))
+
+    def write(self, out: TextIO, fmt: str = "text") -> int:
+        """
+        Writes the report to a text stream as it is read, one incident at a time.
+
+        Args:
+            out (TextIO): Where to write, e.g. sys.stdout or a file opened with newline="".
+            fmt (str, optional): "text" (a header and one line per incident), "csv"
+                (with a header row; lists are ";"-separated) or "jsonl" (one
+                to_dict() object per line). Defaults to "text".
+
+        Returns:
+            int: The number of incidents written.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}. Must be one of {list(REPORT_FORMATS)}.")
+        written = 0
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(CSV_COLUMNS)
+            for incident in self:
+                writer.writerow(_csv_row(incident))
+                written += 1
+        elif fmt == "jsonl":
+            for incident in self:
+                out.write(json.dumps(incident.to_dict()) + "\n")
+                written += 1
+        else:
+            out.write(_TEXT_HEADER + "\n")
+            for incident in self:
+                out.write(_text_line(incident) + "\n")
+                written += 1
+        return written
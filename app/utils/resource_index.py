@@ -0,0 +1,126 @@
+from typing import Dict, List, Optional
+from app.resources.emerg_resource import Resource, ResourceStatus
+
+
+class _IdSet:
+    """Set of resource IDs with O(1) add, remove and pick (swap-remove list + position map)."""
+
+    def __init__(self):
+        self._items: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def add(self, resource_id: str) -> None:
+        if resource_id not in self._positions:
+            self._positions[resource_id] = len(self._items)
+            self._items.append(resource_id)
+
+    def discard(self, resource_id: str) -> None:
+        position = self._positions.pop(resource_id, None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if last != resource_id:
+            self._items[position] = last
+            self._positions[last] = position
+
+    def pick(self) -> Optional[str]:
+        return self._items[-1] if self._items else None
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self._positions
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+
+class ResourceIndex:
+    """
+    Index of resources by resource type, with a separate view of the units that
+    are currently available. Every status change goes through update() so that
+    looking up a candidate of a given type costs O(1).
+    """
+
+    def __init__(self):
+        self._by_type: Dict[str, _IdSet] = {}
+        self._available: Dict[str, _IdSet] = {}
+        self._indexed_type: Dict[str, str] = {}  # resource_id -> type it is filed under
+
+    def rebuild(self, resources: Dict[str, Resource]) -> None:
+        """Rebuilds the index from scratch."""
+        self._by_type.clear()
+        self._available.clear()
+        self._indexed_type.clear()
+        for resource_id, resource in resources.items():
+            self.update(resource_id, resource)
+
+    def update(self, resource_id: str, resource: Resource) -> None:
+        """
+        Files a resource under its current type and status.
+
+        Args:
+            resource_id (str): The key of the resource in the system.
+            resource (Resource): The resource after the change.
+        """
+        previous_type = self._indexed_type.get(resource_id)
+        if previous_type is not None and previous_type != resource.resource_type:
+            self.remove(resource_id)
+        self._indexed_type[resource_id] = resource.resource_type
+        self._by_type.setdefault(resource.resource_type, _IdSet()).add(resource_id)
+        available = self._available.setdefault(resource.resource_type, _IdSet())
+        if resource.status == ResourceStatus.AVAILABLE:
+            available.add(resource_id)
+        else:
+            available.discard(resource_id)
+
+    def remove(self, resource_id: str) -> None:
+        """Drops a resource from the index."""
+        resource_type = self._indexed_type.pop(resource_id, None)
+        if resource_type is not None:
+            self._by_type[resource_type].discard(resource_id)
+            self._available[resource_type].discard(resource_id)
+
+    def first_available(self, resource_type: str) -> Optional[str]:
+        """Returns the ID of an available resource of the given type, or None."""
+        available = self._available.get(resource_type)
+        return available.pick() if available else None
+
+    def available(self, resource_type: str) -> List[str]:
+        """Returns the IDs of all available resources of the given type."""
+        return list(self._available.get(resource_type, ()))
+
+    def of_type(self, resource_type: str) -> List[str]:
+        """Returns the IDs of all resources of the given type, whatever their status."""
+        return list(self._by_type.get(resource_type, ()))
+
+    def available_count(self, resource_type: str) -> int:
+        """Returns the number of available resources of the given type."""
+        return len(self._available.get(resource_type, ()))
+
+    def total_available(self) -> int:
+        """Returns the number of available resources across all types."""
+        return sum(len(ids) for ids in self._available.values())
+
+    def types(self) -> List[str]:
+        """Returns every resource type that has at least one resource."""
+        return [resource_type for resource_type, ids in self._by_type.items() if len(ids)]
+
+    def is_consistent(self, resources: Dict[str, Resource]) -> bool:
+        """Checks the index against a full scan of the resources."""
+        if set(self._indexed_type) != set(resources):
+            return False
+        for resource_id, resource in resources.items():
+            resource_type = resource.resource_type
+            if self._indexed_type[resource_id] != resource_type:
+                return False
+            if resource_id not in self._by_type.get(resource_type, ()):
+                return False
+            is_available = resource_id in self._available.get(resource_type, ())
+            if is_available != (resource.status == ResourceStatus.AVAILABLE):
+                return False
+        indexed = sum(len(ids) for ids in self._by_type.values())
+        available = sum(len(ids) for ids in self._available.values())
+        expected_available = sum(1 for res in resources.values() if res.status == ResourceStatus.AVAILABLE)
+        return indexed == len(resources) and available == expected_available
@@ -0,0 +1,562 @@
+"""
+Region sharding: one EmergencyManagement per geographic region, each in its own process.
+
+Zones are partitioned into regions by recursive coordinate bisection (so a region
+is a compact block of neighbouring zones), and every region runs its own system,
+with its own data directory, allocator and journal, in a worker process. An
+incident is owned by the region of the zone it was reported in; a unit by the
+region it is stationed in. Allocation passes and batch ingestion run in all
+regions in parallel, so throughput grows with the number of cores.
+
+Regions only interact when one runs out of a resource type: the coordinator then
+borrows idle units of that type from the nearest regions that have some to spare.
+A borrowed unit is removed from the lender and added to the borrower (both
+journaled), and stays there until it is lent on again.
+
+    sharded = ShardedEmergencyManagement("data", regions=4, location_mapping=zones)
+    incident_id = sharded.add_incident("Zone 7", "fire", Priority.HIGH, ["Fire Truck"])
+    sharded.process_resource_allocation()
+    sharded.close()
+
+Workers are started with the "spawn" method, so a script that creates a
+ShardedEmergencyManagement must do so under `if __name__ == "__main__":`.
+"""
+import json
+import logging
+import math
+import multiprocessing
+import os
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+from app.utils.emerg_management import DEFAULT_LOCATION_MAPPING, EmergencyManagement, InvalidEventsError
+from app.utils.utils import calculate_distance
+
+logger = logging.getLogger(__name__)
+
+REGIONS_FILE = "regions.json"
+
+
+def partition_zones(location_mapping: Dict[str, tuple], regions: int) -> Dict[str, int]:
+    """
+    Splits zones into regions of neighbouring zones by recursive coordinate bisection.
+
+    The zones are cut across their wider extent (latitude or longitude) in
+    proportion to the number of regions on each side, until every part is one
+    region. The result depends only on the mapping, not on its order.
+
+    Args:
+        location_mapping (Dict[str, tuple]): Zone -> (latitude, longitude).
+        regions (int): The number of regions.
+
+    Returns:
+        Dict[str, int]: Zone -> region number (0 to regions - 1).
+    """
+    if regions < 1:
+        raise ValueError("regions must be at least 1.")
+    assignment: Dict[str, int] = {}
+
+    def split(zones: List[str], first: int, count: int) -> None:
+        if count == 1 or len(zones) <= 1:
+            for zone in zones:
+                assignment[zone] = first
+            return
+        lats = [location_mapping[zone][0] for zone in zones]
+        lons = [location_mapping[zone][1] for zone in zones]
+        # Degrees of longitude shrink with latitude; compare extents in comparable units
+        lon_scale = math.cos(math.radians(sum(lats) / len(lats)))
+        axis = 0 if max(lats) - min(lats) >= (max(lons) - min(lons)) * lon_scale else 1
+        zones = sorted(zones, key=lambda zone: (location_mapping[zone][axis], zone))
+        left = count // 2
+        cut = round(len(zones) * left / count)
+        split(zones[:cut], first, left)
+        split(zones[cut:], first + left, count - left)
+
+    split(sorted(location_mapping), 0, regions)
+    return assignment
+
+
+class _Shard:
+    """The worker side of a region: wraps its EmergencyManagement for the coordinator."""
+
+    def __init__(self, management: EmergencyManagement):
+        self.management = management
+        self._pending: Optional[List[tuple]] = None
+
+    def available(self) -> Dict[str, int]:
+        """Idle units per type; sent with every reply so the coordinator knows who can lend."""
+        index = self.management.resource_index
+        return {resource_type: index.available_count(resource_type) for resource_type in index.types()}
+
+    def _starved(self, required_resources: Iterable[str]) -> List[str]:
+        """The given types of which this region has no idle unit left."""
+        index = self.management.resource_index
+        return sorted({resource_type for resource_type in required_resources
+                       if index.available_count(resource_type) == 0})
+
+    def shortages(self, resource_types: Optional[List[str]] = None) -> Dict[str, int]:
+        """Units missing across active incidents, per type (only the given types, if any)."""
+        management = self.management
+        wanted = set(resource_types) if resource_types is not None else None
+        missing: Counter = Counter()
+        for incident_id in management.dispatch_queue:
+            incident = management.incidents[incident_id]
+            demand = Counter(incident.required_resources)
+            for resource_id in incident.assigned_resources:
+                resource = management.resources.get(resource_id)
+                if resource is not None:
+                    demand[resource.resource_type] -= 1
+            for resource_type, count in demand.items():
+                if count > 0 and (wanted is None or resource_type in wanted):
+                    missing[resource_type] += count
+        return dict(missing)
+
+    def add_zone(self, zone: str, coordinates: tuple) -> None:
+        self.management.add_zone(zone, coordinates)
+
+    def add_incident(self, location: str, emergency_type: str, priority: Priority,
+                     required_resources: List[str]) -> Tuple[str, List[str]]:
+        incident_id = self.management.add_incident(location, emergency_type, priority, required_resources)
+        return incident_id, self._starved(required_resources)
+
+    def update_incident(self, incident_id: str, fields: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        updated = self.management.update_incident(incident_id, **fields)
+        incident = self.management.incidents.get(incident_id)
+        return updated, self._starved(incident.required_resources) if updated else []
+
+    def add_resource(self, data: dict) -> None:
+        resource = Resource.from_trusted_dict(data)
+        self.management.add_resource(resource.resource_id, resource)
+
+    def update_resource_status(self, resource_id: str, status: ResourceStatus) -> bool:
+        return self.management.update_resource_status(resource_id, status)
+
+    def remove_resource(self, resource_id: str) -> Optional[dict]:
+        resource = self.management.remove_resource(resource_id)
+        return resource.to_dict() if resource is not None else None
+
+    def prepare_batch(self, events: List[dict]) -> List[Tuple[int, str]]:
+        """Validates a batch and holds it for commit_batch; returns the errors (none if valid)."""
+        try:
+            self._pending = self.management._parse_events(events)
+        except InvalidEventsError as e:
+            self._pending = None
+            return e.errors
+        return []
+
+    def commit_batch(self) -> Tuple[List[str], Dict[str, int]]:
+        """Applies the prepared batch as one journal record and runs one allocation pass."""
+        operations, self._pending = self._pending or [], None
+        with self.management._journaled("ingest_batch"):
+            added_ids = self.management._apply_events(operations)
+        return added_ids, self.shortages()
+
+    def discard_batch(self) -> None:
+        self._pending = None
+
+    def process_allocation(self) -> Dict[str, int]:
+        self.management.process_resource_allocation()
+        return self.shortages()
+
+    def lend(self, resource_type: str, count: int, toward: Optional[tuple]) -> List[dict]:
+        """Removes up to count idle units of a type, nearest to the borrower first, and returns them."""
+        management = self.management
+        mapping = management.location_mapping
+
+        def distance(resource_id: str) -> float:
+            coordinates = mapping.get(management.resources[resource_id].location)
+            return calculate_distance(toward, coordinates) if toward and coordinates else math.inf
+
+        chosen = sorted(management.resource_index.available(resource_type), key=distance)[:count]
+        return [management.remove_resource(resource_id).to_dict() for resource_id in chosen]
+
+    def adopt(self, units: List[dict]) -> None:
+        """Adds units lent by another region; each is offered to the most urgent incident waiting for it."""
+        for data in units:
+            resource = Resource.from_trusted_dict(data)
+            self.management.add_resource(resource.resource_id, resource)
+
+    def active_incidents(self) -> List[dict]:
+        return [incident.to_dict() for incident in self.management.get_active_incidents()]
+
+    def incident_report(self) -> List[dict]:
+        return [incident.to_dict() for incident in self.management.get_incident_report()]
+
+    def resources(self, resource_type: Optional[str] = None) -> List[dict]:
+        return [resource.to_dict() for resource in self.management.view_resources(resource_type)]
+
+    def ids(self) -> Tuple[List[str], List[str]]:
+        return list(self.management.incidents.keys()), list(self.management.resources)
+
+    def save(self) -> None:
+        self.management.save_data()
+
+
+def _run_shard(conn, data_dir: str, location_mapping: Dict[str, tuple], options: Dict[str, Any]) -> None:
+    """Worker process: serves (op, args) messages from the coordinator until it sends None."""
+    management = EmergencyManagement(data_dir=data_dir, default_resources=False, **options)
+    management.location_mapping.update(location_mapping)
+    management.spatial_index.set_zones(management.location_mapping)
+    management.spatial_index.rebuild(management.resources)
+    shard = _Shard(management)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            op, args = message
+            try:
+                reply = (True, getattr(shard, op)(*args))
+            except Exception as e:  # Reported to the coordinator, which raises it there
+                reply = (False, f"{type(e).__name__}: {e}")
+            conn.send(reply + (shard.available(),))
+    finally:
+        management.close()
+        conn.close()
+
+
+class ShardedEmergencyManagement:
+    """Coordinates one EmergencyManagement worker process per geographic region."""
+
+    def __init__(
+        self,
+        data_dir: str = "data",
+        regions: Optional[int] = None,
+        location_mapping: Optional[Dict[str, tuple]] = None,
+        **options,
+    ):
+        """
+        Starts the region workers, each loading its own data.
+
+        Args:
+            data_dir (str, optional): The directory holding regions.json and one
+                region-N data directory per region. Defaults to "data".
+            regions (Optional[int], optional): The number of regions. Defaults to
+                None: the number in regions.json if the directory was used before,
+                otherwise the number of CPU cores.
+            location_mapping (Optional[Dict[str, tuple]], optional): Zone ->
+                (latitude, longitude). Defaults to the default zones.
+            **options: Passed to every region's EmergencyManagement (e.g.
+                proximity_dispatch=True, journal=True); must be picklable.
+
+        Raises:
+            ValueError: If regions differs from the number the data was sharded into.
+        """
+        self.data_dir = data_dir
+        self.location_mapping: Dict[str, tuple] = dict(location_mapping or DEFAULT_LOCATION_MAPPING)
+        saved = self._load_regions()
+        if saved is not None:
+            if regions is not None and regions != saved["regions"]:
+                raise ValueError(f"{data_dir} is sharded into {saved['regions']} regions, not {regions}.")
+            self.regions = saved["regions"]
+            self.zone_regions: Dict[str, int] = saved["zones"]
+        else:
+            self.regions = regions or os.cpu_count() or 1
+            self.zone_regions = partition_zones(self.location_mapping, self.regions)
+        self._centroids = self._compute_centroids()
+        for zone in self.location_mapping:
+            if zone not in self.zone_regions:
+                self.zone_regions[zone] = self._nearest_region(self.location_mapping[zone])
+        self._save_regions()
+        self._centroids = self._compute_centroids()
+
+        context = multiprocessing.get_context("spawn")  # No fork of a parent that may hold threads or locks
+        self._connections = []
+        self._processes = []
+        for region in range(self.regions):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_run_shard, name=f"region-{region}", daemon=True,
+                args=(child_conn, os.path.join(data_dir, f"region-{region}"), self.location_mapping, options),
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+        self._spare: List[Dict[str, int]] = [{} for _ in range(self.regions)]
+        self.incident_owner: Dict[str, int] = {}
+        self.resource_owner: Dict[str, int] = {}
+        for region, (incident_ids, resource_ids) in self._broadcast("ids").items():
+            self.incident_owner.update(dict.fromkeys(incident_ids, region))
+            self.resource_owner.update(dict.fromkeys(resource_ids, region))
+        self.units_borrowed = 0
+
+    # Region layout
+
+    def _load_regions(self) -> Optional[dict]:
+        path = os.path.join(self.data_dir, REGIONS_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_regions(self) -> None:
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = os.path.join(self.data_dir, REGIONS_FILE)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"regions": self.regions, "zones": self.zone_regions}, f, indent=2)
+        os.replace(temp_path, path)
+
+    def _compute_centroids(self) -> List[Optional[tuple]]:
+        members: Dict[int, List[tuple]] = {}
+        for zone, region in self.zone_regions.items():
+            if zone in self.location_mapping:
+                members.setdefault(region, []).append(self.location_mapping[zone])
+        return [
+            (sum(lat for lat, _ in members[region]) / len(members[region]),
+             sum(lon for _, lon in members[region]) / len(members[region])) if region in members else None
+            for region in range(self.regions)
+        ]
+
+    def _nearest_region(self, coordinates: tuple) -> int:
+        candidates = [(calculate_distance(coordinates, centroid), region)
+                      for region, centroid in enumerate(self._centroids) if centroid is not None]
+        return min(candidates)[1] if candidates else 0
+
+    def region_of(self, location: str) -> int:
+        """The region a zone belongs to; unmapped zones are spread over regions by a stable hash."""
+        region = self.zone_regions.get(location)
+        if region is None:
+            region = zlib.crc32(str(location).encode("utf-8")) % self.regions
+        return region
+
+    def add_zone(self, zone: str, coordinates: tuple) -> None:
+        """Adds (or moves) a zone; a new zone joins the region with the nearest centre."""
+        self.location_mapping[zone] = coordinates
+        if zone not in self.zone_regions:
+            self.zone_regions[zone] = self._nearest_region(coordinates)
+            self._save_regions()
+        self._centroids = self._compute_centroids()
+        self._broadcast("add_zone", zone, coordinates)
+
+    # Worker calls
+
+    def _send(self, region: int, op: str, *args) -> None:
+        self._connections[region].send((op, args))
+
+    def _receive(self, region: int) -> Any:
+        ok, value, available = self._connections[region].recv()
+        self._spare[region] = available
+        if not ok:
+            raise RuntimeError(f"Region {region}: {value}")
+        return value
+
+    def _call(self, region: int, op: str, *args) -> Any:
+        self._send(region, op, *args)
+        return self._receive(region)
+
+    def _broadcast(self, op: str, *args, regions: Optional[Iterable[int]] = None) -> Dict[int, Any]:
+        """Runs one operation in several regions at once (all of them by default)."""
+        regions = list(range(self.regions)) if regions is None else list(regions)
+        for region in regions:
+            self._send(region, op, *args)
+        results, error = {}, None
+        for region in regions:  # Collect every reply, even after a failure, to keep the pipes in step
+            try:
+                results[region] = self._receive(region)
+            except RuntimeError as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    # Borrowing between regions
+
+    def _borrow(self, region: int, shortages: Dict[str, int]) -> int:
+        """Moves idle units from the nearest regions with spare ones to cover a region's shortages."""
+        borrowed = 0
+        for resource_type, needed in sorted(shortages.items()):
+            donors = sorted(
+                (donor for donor in range(self.regions)
+                 if donor != region and self._spare[donor].get(resource_type, 0) > 0),
+                key=lambda donor: self._region_distance(region, donor),
+            )
+            for donor in donors:
+                if needed <= 0:
+                    break
+                units = self._call(donor, "lend", resource_type, needed, self._centroids[region])
+                if not units:
+                    continue
+                self._call(region, "adopt", units)
+                for data in units:
+                    self.resource_owner[data["resource_id"]] = region
+                needed -= len(units)
+                borrowed += len(units)
+                logger.info(
+                    "Region %d borrowed %d %s unit(s) from region %d.", region, len(units), resource_type, donor,
+                    extra={"event": "units_borrowed", "region": region, "lender": donor,
+                           "resource_type": resource_type, "units": len(units)},
+                )
+        self.units_borrowed += borrowed
+        return borrowed
+
+    def _region_distance(self, first: int, second: int) -> float:
+        a, b = self._centroids[first], self._centroids[second]
+        return calculate_distance(a, b) if a and b else math.inf
+
+    def _relieve(self, region: int, starved: List[str]) -> None:
+        """After a single change: borrows for the starved types, if any other region has spare units."""
+        lendable = [resource_type for resource_type in starved
+                    if any(self._spare[donor].get(resource_type, 0) for donor in range(self.regions) if donor != region)]
+        if lendable:
+            shortages = self._call(region, "shortages", lendable)
+            if shortages:
+                self._borrow(region, shortages)
+
+    # EmergencyManagement operations
+
+    def add_incident(self, location: str, emergency_type: str, priority: Priority,
+                     required_resources: List[str]) -> str:
+        """Adds an incident in the region of its zone; returns its ID."""
+        region = self.region_of(location)
+        incident_id, starved = self._call(region, "add_incident", location, emergency_type, priority,
+                                          required_resources)
+        self.incident_owner[incident_id] = region
+        self._relieve(region, starved)
+        return incident_id
+
+    def update_incident(
+        self,
+        incident_id: str,
+        location: Optional[str] = None,
+        emergency_type: Optional[str] = None,
+        priority: Optional[Priority] = None,
+        required_resources: Optional[List[str]] = None,
+        status: Optional[IncidentStatus] = None,
+    ) -> bool:
+        """Updates an incident in the region that owns it (incidents do not move between regions)."""
+        region = self.incident_owner.get(incident_id)
+        if region is None:
+            return False
+        fields = {"location": location, "emergency_type": emergency_type, "priority": priority,
+                  "required_resources": required_resources, "status": status}
+        updated, starved = self._call(region, "update_incident", incident_id, fields)
+        self._relieve(region, starved)
+        return updated
+
+    def add_resource(self, resource_id: str, resource: Resource) -> None:
+        """Adds a unit to the region it is stationed in."""
+        region = self.resource_owner.get(resource_id, self.region_of(resource.location))
+        data = resource.to_dict()
+        data["resource_id"] = resource_id
+        self._call(region, "add_resource", data)
+        self.resource_owner[resource_id] = region
+
+    def update_resource_status(self, resource_id: str, status: ResourceStatus) -> bool:
+        region = self.resource_owner.get(resource_id)
+        return region is not None and self._call(region, "update_resource_status", resource_id, status)
+
+    def remove_resource(self, resource_id: str) -> Optional[Resource]:
+        region = self.resource_owner.pop(resource_id, None)
+        if region is None:
+            return None
+        data = self._call(region, "remove_resource", resource_id)
+        return Resource.from_trusted_dict(data) if data is not None else None
+
+    def ingest_batch(self, events: Iterable[dict]) -> List[str]:
+        """
+        Applies a batch of incident events (as EmergencyManagement.ingest_batch),
+        each region's share in parallel with one allocation pass per region.
+
+        Every region validates its share before any region applies anything, so
+        the batch is applied either completely or not at all.
+
+        Returns:
+            List[str]: The IDs of the added incidents, in event order.
+
+        Raises:
+            InvalidEventsError: If any event is invalid; nothing is applied.
+        """
+        shares: Dict[int, Tuple[List[dict], List[int]]] = {}
+        errors: List[Tuple[int, str]] = []
+        added_here: Dict[str, int] = {}
+        adds: List[Tuple[int, int]] = []  # (event index, region) of every add
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                errors.append((index, f"Event must be an object, got {type(event).__name__}."))
+                continue
+            incident_id = event.get("incident_id")
+            if event.get("op") == "add_incident":
+                location = event.get("location")
+                region = self.region_of(location if isinstance(location, str) else "")
+                if incident_id is not None:
+                    if incident_id in self.incident_owner or incident_id in added_here:
+                        errors.append((index, f"Incident {incident_id} already exists."))
+                        continue
+                    added_here[incident_id] = region
+                adds.append((index, region))
+            else:
+                region = self.incident_owner.get(incident_id, added_here.get(incident_id))
+                if region is None:
+                    if event.get("op") == "update_incident":
+                        errors.append((index, f"Incident {incident_id} not found."))
+                        continue
+                    region = 0  # An unknown op; the region reports it
+            share = shares.setdefault(region, ([], []))
+            share[0].append(event)
+            share[1].append(index)
+
+        for region in shares:
+            self._send(region, "prepare_batch", shares[region][0])
+        for region in shares:
+            errors.extend((shares[region][1][local], message) for local, message in self._receive(region))
+        if errors:
+            self._broadcast("discard_batch", regions=shares)
+            raise InvalidEventsError(sorted(errors))
+
+        committed = self._broadcast("commit_batch", regions=shares)
+        pending = {region: iter(added_ids) for region, (added_ids, _) in committed.items()}
+        added_ids = []
+        for _, region in adds:
+            incident_id = next(pending[region])
+            self.incident_owner[incident_id] = region
+            added_ids.append(incident_id)
+        for region, (_, shortages) in sorted(committed.items()):
+            if shortages:
+                self._borrow(region, shortages)
+        return added_ids
+
+    def process_resource_allocation(self) -> None:
+        """Runs a full allocation pass in every region in parallel, then borrows units for shortages."""
+        shortages = self._broadcast("process_allocation")
+        for region in range(self.regions):
+            if shortages[region]:
+                self._borrow(region, shortages[region])
+
+    def get_active_incidents(self) -> List[Incident]:
+        """Copies of the active incidents of every region."""
+        return [Incident.from_trusted_dict(data) for records in self._broadcast("active_incidents").values()
+                for data in records]
+
+    def get_incident_report(self) -> List[Incident]:
+        """Copies of all incidents, region by region."""
+        return [Incident.from_trusted_dict(data) for records in self._broadcast("incident_report").values()
+                for data in records]
+
+    def view_resources(self, resource_type: Optional[str] = None) -> List[Resource]:
+        """Copies of all resources, or only those of the given type."""
+        return [Resource.from_trusted_dict(data) for records in self._broadcast("resources", resource_type).values()
+                for data in records]
+
+    def save_data(self) -> None:
+        self._broadcast("save")
+
+    def close(self) -> None:
+        """Stops the region workers (each closes its storage first)."""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections, self._processes = [], []
@@ -0,0 +1,246 @@
+"""
+Versioned, immutable views of the system state for readers that must not block writers.
+
+A StateSnapshot holds a SnapshotTable of incidents and one of resources. A table
+is a persistent map: publishing a change returns a new table that shares all
+untouched structure with the old one, so a snapshot never changes once taken and
+taking one is O(1). Records in a table are frozen copies (FrozenIncident,
+FrozenResource), never the live objects the system mutates, and every reader
+gets the same ones, so they refuse changes; copy() one to get a mutable record.
+
+A table keeps insertion order (as a dict does). Its records sit in a 32-way trie
+by position; an update copies only the root-to-leaf paths it touches, O(log32 n)
+per record. Keys map to positions through an index that is shared by every
+version and only ever appended to, so an older table simply ignores positions
+past its own length.
+"""
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+from app.incidents.emerg_incident import Incident
+from app.resources.emerg_resource import Resource
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class SnapshotTable:
+    """An immutable, insertion-ordered mapping that is cheap to update into a new version."""
+
+    __slots__ = ("_root", "_shift", "_length", "_count", "_positions", "_removed")
+
+    def __init__(self, _root: Optional[list] = None, _shift: int = 0, _length: int = 0, _count: int = 0,
+                 _positions: Optional[Dict[Hashable, List[int]]] = None, _removed: Optional[set] = None):
+        self._root = _root
+        self._shift = _shift  # Bits below the root level; 0 when the root is a leaf
+        self._length = _length  # Positions in use, including removed ones
+        self._count = _count
+        # Shared by all versions and only ever added to:
+        self._positions = _positions if _positions is not None else {}  # key -> positions, oldest first
+        self._removed = _removed if _removed is not None else set()  # Keys removed in some version
+
+    @classmethod
+    def build(cls, items: Iterator[Tuple[Hashable, Any]]) -> "SnapshotTable":
+        """Builds a table from (key, value) pairs in bulk, O(n)."""
+        positions: Dict[Hashable, List[int]] = {}
+        slots: List[Tuple[Hashable, Any]] = []
+        for item in items:
+            positions[item[0]] = [len(slots)]
+            slots.append(tuple(item))
+        if not slots:
+            return cls(_positions=positions)
+        level, shift = [slots[i:i + _WIDTH] for i in range(0, len(slots), _WIDTH)], 0
+        while len(level) > 1:
+            level, shift = [level[i:i + _WIDTH] for i in range(0, len(level), _WIDTH)], shift + _BITS
+        root = level[0]
+        return cls(root, shift, len(slots), len(slots), positions)
+
+    def _slot(self, position: int) -> Optional[Tuple[Hashable, Any]]:
+        """The (key, value) pair at a position, or None if it was removed."""
+        node = self._root
+        for level in range(self._shift, -1, -_BITS):
+            index = (position >> level) & _MASK
+            if node is None or index >= len(node):
+                return None
+            node = node[index]
+        return node
+
+    def _position(self, key: Hashable) -> Optional[int]:
+        """The key's position in this version (latest one below its length), or None."""
+        for position in reversed(self._positions.get(key, ())):
+            if position < self._length:
+                return position
+        return None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        position = self._position(key)
+        slot = self._slot(position) if position is not None else None
+        return default if slot is None else slot[1]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        position = self._position(key)
+        slot = self._slot(position) if position is not None else None
+        if slot is None:
+            raise KeyError(key)
+        return slot[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        position = self._position(key)
+        return position is not None and self._slot(position) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Yields (key, value) pairs in insertion order."""
+        return self._items_from(0)
+
+    def items_after(self, key: Hashable) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Yields the (key, value) pairs inserted after the given key, in insertion
+        order, without visiting the ones before it (O(log n) to start).
+
+        Raises:
+            KeyError: If the key was never in this version.
+        """
+        position = self._position(key)
+        if position is None:
+            raise KeyError(key)
+        return self._items_from(position + 1)
+
+    def _items_from(self, start: int) -> Iterator[Tuple[Hashable, Any]]:
+        if self._root is None:
+            return
+        stack = [(self._root, self._shift, 0)]  # (node, level, first position)
+        while stack:
+            node, shift, first = stack.pop()
+            if shift == 0:
+                for slot in node[max(start - first, 0):self._length - first]:
+                    if slot is not None:
+                        yield slot
+                continue
+            span = 1 << shift
+            for index in range(len(node) - 1, -1, -1):  # Pushed in reverse, so popped in order
+                child_first = first + index * span
+                if child_first < self._length and child_first + span > start:
+                    stack.append((node[index], shift - _BITS, child_first))
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for key, _ in self.items():
+            yield key
+
+    def updated(self, changes: Dict[Hashable, Any]) -> "SnapshotTable":
+        """
+        Returns a new version with the changes applied (None removes a key); this
+        version is left as it is. Each trie node is copied at most once per call.
+
+        Writer-side only: calls must be serialized, since versions share the key index.
+        """
+        if not changes:
+            return self
+        root, shift, length, count = self._root, self._shift, self._length, self._count
+        writes: List[Tuple[int, Any]] = []
+        for key, value in changes.items():
+            position = self._position(key)
+            if position is not None and (key not in self._removed or self._slot(position) is not None):
+                writes.append((position, None if value is None else (key, value)))
+                if value is None:
+                    self._removed.add(key)
+                    count -= 1
+            elif value is not None:  # New, or re-added after removal: takes the next position
+                self._positions.setdefault(key, []).append(length)
+                writes.append((length, (key, value)))
+                length += 1
+                count += 1
+        if not writes:
+            return self
+
+        root = list(root) if root is not None else []
+        while length > _WIDTH << shift:  # Grow the trie by a level
+            root, shift = [root], shift + _BITS
+        levels = range(shift, 0, -_BITS)
+        # (level, position >> level) -> node copied by this call; a single write needs no memo
+        copied: Optional[Dict[Tuple[int, int], list]] = {} if len(writes) > 1 else None
+        writes.sort()  # Positions are contiguous, so a new one is always the next slot of its node
+        for position, slot in writes:
+            node = root
+            for level in levels:
+                index = (position >> level) & _MASK
+                child = copied.get((level, position >> level)) if copied is not None else None
+                if child is None:
+                    if index < len(node):
+                        child = node[index] = list(node[index])
+                    else:
+                        child = []
+                        node.append(child)
+                    if copied is not None:
+                        copied[level, position >> level] = child
+                node = child
+            index = position & _MASK
+            if index < len(node):
+                node[index] = slot
+            else:
+                node.append(slot)
+        return SnapshotTable(root, shift, length, count, self._positions, self._removed)
+
+
+def _read_only(self, name, value=None):
+    raise AttributeError(f"{type(self).__name__} is a read-only snapshot record; copy() it to make changes")
+
+
+class FrozenIncident(Incident):
+    """An Incident as held by a snapshot: fields cannot be set and the lists are tuples."""
+
+    __slots__ = ()
+    __setattr__ = _read_only
+    __delattr__ = _read_only
+
+    @classmethod
+    def of(cls, incident: Incident) -> "FrozenIncident":
+        """A frozen copy of an incident."""
+        frozen = cls.__new__(cls)
+        for name in Incident.__slots__:
+            value = getattr(incident, name)
+            object.__setattr__(frozen, name, tuple(value) if isinstance(value, list) else value)
+        return frozen
+
+    def to_dict(self) -> dict:
+        """As Incident.to_dict, with fresh lists, so the record reads the same as a live one."""
+        data = super().to_dict()
+        data["required_resources"] = list(self.required_resources)
+        data["assigned_resources"] = list(self.assigned_resources)
+        return data
+
+
+class FrozenResource(Resource):
+    """A Resource as held by a snapshot: fields cannot be set."""
+
+    __slots__ = ()
+    __setattr__ = _read_only
+    __delattr__ = _read_only
+
+    @classmethod
+    def of(cls, resource: Resource) -> "FrozenResource":
+        """A frozen copy of a resource."""
+        frozen = cls.__new__(cls)
+        for name in Resource.__slots__:
+            object.__setattr__(frozen, name, getattr(resource, name))
+        return frozen
+
+
+class StateSnapshot:
+    """A consistent view of all incidents and resources as of one completed operation."""
+
+    __slots__ = ("generation", "incidents", "resources")
+
+    def __init__(self, generation: int, incidents: SnapshotTable, resources: SnapshotTable):
+        self.generation = generation  # Operations published before this snapshot; increases by one each
+        self.incidents = incidents
+        self.resources = resources
+
+    def __repr__(self) -> str:
+        return (f"StateSnapshot(generation={self.generation}, incidents={len(self.incidents)}, "
+                f"resources={len(self.resources)})")
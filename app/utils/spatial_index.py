@@ -0,0 +1,168 @@
+import math
+from typing import Dict, List, Optional, Tuple
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.utils.resource_index import _IdSet
+
+
+def _to_unit_vector(coords: Tuple[float, float]) -> Tuple[float, float, float]:
+    """Converts (latitude, longitude) in degrees to a point on the unit sphere."""
+    lat, lon = math.radians(coords[0]), math.radians(coords[1])
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+class _Node:
+    """A k-d tree node holding one zone."""
+
+    __slots__ = ("zone", "point", "axis", "left", "right", "parent", "counts")
+
+    def __init__(self, zone: str, point: Tuple[float, float, float], axis: int):
+        self.zone = zone
+        self.point = point
+        self.axis = axis
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.parent: Optional["_Node"] = None
+        self.counts: Dict[str, int] = {}  # resource_type -> available units in this subtree
+
+
+class SpatialIndex:
+    """
+    Nearest-available-resource lookup over the zone coordinates in location_mapping.
+
+    Zones are stored in a k-d tree over 3-D unit vectors, where straight-line (chord)
+    distance orders points exactly like haversine distance. Every node keeps, per
+    resource type, the number of available units in its subtree, so a nearest-neighbour
+    query prunes both by distance and by subtrees with nothing of the requested type.
+    Marking a unit available or busy updates the counts along one root path, O(log z).
+    """
+
+    def __init__(self, location_mapping: Dict[str, tuple]):
+        """
+        Initializes the index.
+
+        Args:
+            location_mapping (Dict[str, tuple]): Zone name -> (latitude, longitude).
+        """
+        self._coords: Dict[str, Tuple[float, float]] = {}
+        self._nodes: Dict[str, _Node] = {}
+        self._root: Optional[_Node] = None
+        self._units: Dict[str, Dict[str, _IdSet]] = {}  # zone -> resource_type -> available IDs
+        self._filed: Dict[str, Tuple[str, str]] = {}  # resource_id -> (zone, resource_type)
+        self.set_zones(location_mapping)
+
+    def set_zones(self, location_mapping: Dict[str, tuple]) -> None:
+        """Rebuilds the tree for a new set of zones, keeping units in zones that still exist."""
+        self._coords = {zone: tuple(coords) for zone, coords in location_mapping.items()}
+        self._nodes = {}
+        items = [(zone, _to_unit_vector(coords)) for zone, coords in self._coords.items()]
+        self._root = self._build(items, None)
+        for resource_id, (zone, resource_type) in list(self._filed.items()):
+            if zone in self._nodes:
+                self._adjust(zone, resource_type, 1)
+            else:
+                self._units[zone][resource_type].discard(resource_id)
+                del self._filed[resource_id]
+
+    def _build(self, items: List[tuple], parent: Optional[_Node]) -> Optional[_Node]:
+        """Builds a balanced subtree, splitting on the axis with the widest spread."""
+        if not items:
+            return None
+        spreads = [max(p[axis] for _, p in items) - min(p[axis] for _, p in items) for axis in range(3)]
+        axis = spreads.index(max(spreads))
+        items.sort(key=lambda item: item[1][axis])
+        middle = len(items) // 2
+        zone, point = items[middle]
+        node = _Node(zone, point, axis)
+        node.parent = parent
+        self._nodes[zone] = node
+        node.left = self._build(items[:middle], node)
+        node.right = self._build(items[middle + 1:], node)
+        return node
+
+    def coordinates(self, zone: str) -> Optional[Tuple[float, float]]:
+        """Returns the (latitude, longitude) of a zone, or None if it is not mapped."""
+        return self._coords.get(zone)
+
+    def rebuild(self, resources: Dict[str, Resource]) -> None:
+        """Re-files every resource."""
+        for node in self._nodes.values():
+            node.counts.clear()
+        self._units.clear()
+        self._filed.clear()
+        for resource_id, resource in resources.items():
+            self.update(resource_id, resource)
+
+    def update(self, resource_id: str, resource: Resource) -> None:
+        """
+        Files a resource under its zone if it is available, or removes it otherwise.
+
+        Resources in zones that are not in location_mapping are not indexed.
+        """
+        target = (resource.location, resource.resource_type)
+        filed = self._filed.get(resource_id)
+        is_available = resource.status == ResourceStatus.AVAILABLE and resource.location in self._nodes
+        if filed == target and is_available:
+            return
+        if filed is not None:
+            self.remove(resource_id)
+        if is_available:
+            self._units.setdefault(resource.location, {}).setdefault(resource.resource_type, _IdSet()).add(resource_id)
+            self._filed[resource_id] = target
+            self._adjust(resource.location, resource.resource_type, 1)
+
+    def remove(self, resource_id: str) -> None:
+        """Drops a resource from the index."""
+        filed = self._filed.pop(resource_id, None)
+        if filed is not None:
+            zone, resource_type = filed
+            self._units[zone][resource_type].discard(resource_id)
+            self._adjust(zone, resource_type, -1)
+
+    def _adjust(self, zone: str, resource_type: str, delta: int) -> None:
+        """Updates the per-type counts from a zone's node up to the root."""
+        node = self._nodes[zone]
+        while node is not None:
+            node.counts[resource_type] = node.counts.get(resource_type, 0) + delta
+            node = node.parent
+
+    def nearest_available(self, resource_type: str, location: str) -> Optional[str]:
+        """
+        Returns the ID of the nearest available resource of a type to a zone.
+
+        Args:
+            resource_type (str): The required resource type.
+            location (str): The zone of the incident.
+
+        Returns:
+            Optional[str]: The resource ID, or None if the zone is unmapped or no
+                mapped zone has an available unit of the type.
+        """
+        coords = self._coords.get(location)
+        if coords is None:
+            return None
+        zone = self.nearest_zone(resource_type, coords)
+        return self._units[zone][resource_type].pick() if zone is not None else None
+
+    def nearest_zone(self, resource_type: str, coords: Tuple[float, float]) -> Optional[str]:
+        """Returns the nearest zone to a coordinate that has an available unit of a type."""
+        target = _to_unit_vector(coords)
+        best_zone: Optional[str] = None
+        best_distance = math.inf
+        # Each stack entry carries a lower bound on the squared distance to its subtree
+        stack = [(self._root, 0.0)] if self._root is not None else []
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_distance or not node.counts.get(resource_type):
+                continue
+            point = node.point
+            distance = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if distance < best_distance and self._units.get(node.zone, {}).get(resource_type):
+                best_zone, best_distance = node.zone, distance
+            diff = target[node.axis] - point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            if far is not None:
+                stack.append((far, max(bound, diff * diff)))
+            if near is not None:
+                stack.append((near, bound))  # Searched first (LIFO) so the bound tightens early
+        return best_zone
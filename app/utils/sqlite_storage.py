@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+from app.incidents.emerg_incident import Incident
+from app.resources.emerg_resource import Resource
+from app.utils.storage import ACTIVE_STATUS_NAMES, LazyIncidents, StorageBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    incident_id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    location TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_status ON incidents (status);
+CREATE INDEX IF NOT EXISTS idx_incidents_priority ON incidents (priority);
+CREATE INDEX IF NOT EXISTS idx_incidents_location ON incidents (location);
+CREATE INDEX IF NOT EXISTS idx_incidents_created_at ON incidents (created_at);
+
+CREATE TABLE IF NOT EXISTS resources (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    resource_id TEXT NOT NULL UNIQUE,
+    resource_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    location TEXT NOT NULL,
+    assigned_incident_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resources_type ON resources (resource_type);
+CREATE INDEX IF NOT EXISTS idx_resources_status ON resources (status);
+CREATE INDEX IF NOT EXISTS idx_resources_assigned_incident ON resources (assigned_incident_id);
+"""
+
+_UPSERT_INCIDENT = """
+INSERT INTO incidents (incident_id, status, priority, location, created_at, data)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (incident_id) DO UPDATE SET
+    status = excluded.status, priority = excluded.priority, location = excluded.location,
+    created_at = excluded.created_at, data = excluded.data
+"""
+
+_UPSERT_RESOURCE = """
+INSERT INTO resources (resource_id, resource_type, status, location, assigned_incident_id, data)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (resource_id) DO UPDATE SET
+    resource_type = excluded.resource_type, status = excluded.status, location = excluded.location,
+    assigned_incident_id = excluded.assigned_incident_id, data = excluded.data
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite storage (stdlib sqlite3, WAL mode) with indexes on incident status,
+    priority and location and on resource type, status and assigned incident.
+
+    Every mutation is written as one transaction, so no separate journal or
+    snapshot is needed. At load only resources and active (OPEN / IN_PROGRESS)
+    incidents are materialized; the rest of the history is fetched on access.
+    """
+
+    records_mutations = True
+    supports_queries = True
+
+    def __init__(self, db_path: str):
+        """
+        Opens (or creates) the database.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Durable at WAL checkpoints; safe against corruption
+        self._conn.executescript(_SCHEMA)
+
+    def load(self) -> Tuple[LazyIncidents, Dict[str, Resource]]:
+        """Materializes resources and active incidents only."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT incident_id, data FROM incidents WHERE status IN (?, ?) ORDER BY seq", ACTIVE_STATUS_NAMES
+            ).fetchall()
+            resource_rows = self._conn.execute("SELECT resource_id, data FROM resources ORDER BY seq").fetchall()
+        resident = {incident_id: Incident.from_trusted_dict(json.loads(data)) for incident_id, data in rows}
+        resources = {resource_id: Resource.from_trusted_dict(json.loads(data)) for resource_id, data in resource_rows}
+        return LazyIncidents(self, resident), resources
+
+    def record(self, op: str, incidents: Dict[str, dict], resources: Dict[str, dict]) -> None:
+        """Upserts the touched records (deleting removed resources) in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT_INCIDENT, [self._incident_row(key, data) for key, data in incidents.items()])
+            self._conn.executemany(_UPSERT_RESOURCE, [self._resource_row(key, data) for key, data in resources.items()
+                                                      if data is not None])
+            self._conn.executemany("DELETE FROM resources WHERE resource_id = ?",
+                                   [(key,) for key, data in resources.items() if data is None])
+
+    def save(self, incidents, resources: Dict[str, Resource]) -> None:
+        """Upserts every resident incident and every resource (history on disk is already current)."""
+        resident = incidents.resident if isinstance(incidents, LazyIncidents) else incidents
+        with self._lock, self._conn:
+            self._conn.executemany(
+                _UPSERT_INCIDENT, (self._incident_row(key, inc.to_dict()) for key, inc in resident.items())
+            )
+            self._conn.executemany(
+                _UPSERT_RESOURCE, (self._resource_row(key, res.to_dict()) for key, res in resources.items())
+            )
+
+    @staticmethod
+    def _incident_row(incident_id: str, data: dict) -> tuple:
+        return (incident_id, data["status"], data["priority"], data["location"], data["created_at"],
+                json.dumps(data))
+
+    @staticmethod
+    def _resource_row(resource_id: str, data: dict) -> tuple:
+        return (resource_id, data["resource_type"], data["status"], data["location"],
+                data.get("assigned_incident_id"), json.dumps(data))
+
+    # Source interface for LazyIncidents
+
+    def get(self, incident_id: str) -> Optional[dict]:
+        """Returns the stored record of one incident, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM incidents WHERE incident_id = ?", (incident_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def contains(self, incident_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM incidents WHERE incident_id = ?", (incident_id,)).fetchone()
+        return row is not None
+
+    def ids(self) -> Iterator[str]:
+        """Yields every stored incident ID in insertion order."""
+        return (incident_id for incident_id, _ in self._batches("incident_id"))
+
+    def records(self) -> Iterator[Tuple[str, dict]]:
+        """Streams every stored incident record in insertion order."""
+        return ((incident_id, json.loads(data)) for incident_id, data in self._batches("incident_id, data"))
+
+    def _batches(self, columns: str, batch_size: int = 1000) -> Iterator[tuple]:
+        """Pages through the incidents table by seq so no cursor is held between batches."""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, {columns} FROM incidents WHERE seq > ? ORDER BY seq LIMIT ?", (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[1:] if len(row) > 2 else (row[1], None)
+            last_seq = rows[-1][0]
+
+    # Indexed queries
+
+    def query_incidents(self, status: Optional[str] = None, priority: Optional[str] = None,
+                        location: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                        newest_first: bool = False, limit: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+        clauses, params = [], []
+        for column, value in (("status", status), ("priority", priority), ("location", location)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        # ISO timestamps compare as text (the optional fraction sorts after the whole second)
+        for clause, value in (("created_at >= ?", since), ("created_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = " ORDER BY created_at DESC, seq DESC" if newest_first else (
+            " ORDER BY created_at, seq" if since is not None or until is not None else " ORDER BY seq")
+        if limit is not None:
+            order += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT incident_id, data FROM incidents{where}{order}", params).fetchall()
+        return ((incident_id, json.loads(data)) for incident_id, data in rows)
+
+    def query_resources(self, resource_type: Optional[str] = None, status: Optional[str] = None,
+                        assigned_incident_id: Optional[str] = None) -> Iterator[str]:
+        clauses, params = [], []
+        filters = (("resource_type", resource_type), ("status", status), ("assigned_incident_id", assigned_incident_id))
+        for column, value in filters:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT resource_id FROM resources{where} ORDER BY seq", params).fetchall()
+        return (row[0] for row in rows)
+
+    def explain(self, sql: str, params: tuple = ()) -> str:
+        """Returns SQLite's query plan for a statement (used to check index usage)."""
+        with self._lock:
+            rows = self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return "\n".join(row[-1] for row in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
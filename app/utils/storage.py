@@ -0,0 +1,273 @@
+import itertools
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.incidents.emerg_incident import Incident
+from app.resources.emerg_resource import Resource
+from app.utils.data_persistence import (
+    SERIALIZERS,
+    LegacySnapshotError,
+    load_incidents_from_file,
+    load_resources_from_file,
+    save_incidents_to_file,
+    save_resources_to_file,
+)
+from app.utils.dispatch_queue import ACTIVE_STATUSES
+from app.utils.journal import Journal, replay_journal
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUS_NAMES = tuple(status.name for status in ACTIVE_STATUSES)
+
+
+class StorageBackend(ABC):
+    """
+    Where EmergencyManagement keeps its incidents and resources.
+
+    Backends must implement load() and save(). Those that persist the records
+    touched by each mutation set records_mutations and implement record(); those
+    that can answer filtered lookups themselves set supports_queries and implement
+    the query methods, which are only called when it is True.
+    """
+
+    records_mutations = False
+    supports_queries = False
+
+    @abstractmethod
+    def load(self) -> Tuple[MutableMapping, Dict[str, Resource]]:
+        """Returns the incidents mapping and the resources dictionary."""
+
+    def record(self, op: str, incidents: Dict[str, dict], resources: Dict[str, dict]) -> None:
+        """Persists the after-state of the records touched by one mutation (None for a removed resource)."""
+
+    @abstractmethod
+    def save(self, incidents: MutableMapping, resources: Dict[str, Resource]) -> None:
+        """Persists the full state."""
+
+    def compaction_due(self) -> bool:
+        """Returns True when the backend wants a full save to fold in its log."""
+        return False
+
+    def query_incidents(self, status: Optional[str] = None, priority: Optional[str] = None,
+                        location: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                        newest_first: bool = False, limit: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+        """
+        Yields (incident_id, record) pairs matching the filters (enum names for
+        status/priority; since and until bound created_at as ISO timestamps, until
+        exclusive), in stored order, or newest first by creation time, up to limit.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support queries")
+
+    def query_resources(self, resource_type: Optional[str] = None, status: Optional[str] = None,
+                        assigned_incident_id: Optional[str] = None) -> Iterator[str]:
+        """Yields the IDs of resources matching the filters (enum name for status)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support queries")
+
+    def close(self) -> None:
+        """Releases any files or connections held by the backend."""
+
+
+class JsonFileStorage(StorageBackend):
+    """
+    The snapshot files in the data directory (incidents.json, resources.json, or
+    another registered format such as incidents.bin), optionally with an
+    append-only journal of mutations replayed on top at load.
+
+    In lazy mode the incidents snapshot is indexed rather than parsed (a JSON
+    snapshot is scanned once, a binary one is memory-mapped): only active
+    incidents (and any the journal touched) are materialized at startup, and
+    closed history is read from the file on access.
+    """
+
+    def __init__(self, data_dir: str, journal: bool = False, compact_every: int = 10_000, lazy: bool = False,
+                 snapshot_extension: str = ".json"):
+        """
+        Initializes the backend.
+
+        Args:
+            data_dir (str): The directory holding the data files.
+            journal (bool, optional): If True, every mutation is appended to
+                journal.jsonl as it happens. Defaults to False.
+            compact_every (int, optional): Journal records after which a full save
+                is requested. Defaults to 10,000.
+            lazy (bool, optional): If True, incidents are loaded lazily through the
+                format's index (SnapshotIndex for JSON, MappedSnapshot for binary
+                snapshots). Defaults to False.
+            snapshot_extension (str, optional): The extension of the snapshot files,
+                which picks their format (see data_persistence.SERIALIZERS), e.g.
+                ".bin" for the compact binary format. Defaults to ".json".
+
+        Raises:
+            ValueError: If no format is registered for the extension.
+        """
+        if snapshot_extension not in SERIALIZERS:
+            raise ValueError(f"Unknown snapshot format {snapshot_extension}. Must be one of {list(SERIALIZERS)}.")
+        self.data_dir = data_dir
+        self.snapshot_extension = snapshot_extension
+        self.compact_every = compact_every
+        self.lazy = lazy
+        self._index = None  # The lazy mode's index of the incidents snapshot
+        self.journal: Optional[Journal] = Journal(self._path("journal.jsonl")) if journal else None
+        self.records_mutations = journal
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.data_dir, filename)
+
+    def load(self) -> Tuple[MutableMapping, Dict[str, Resource]]:
+        """Loads both snapshots, then replays the journal on top."""
+        incidents = {} if self.lazy else load_incidents_from_file(self._snapshot_path("incidents"))
+        resources = load_resources_from_file(self._snapshot_path("resources"))
+        incidents_data, resources_data = {}, {}  # The journaled after-state of each record
+        replayed = 0
+        for record in replay_journal(self._path("journal.jsonl")):
+            incidents_data.update(record["incidents"])
+            resources_data.update(record["resources"])
+            replayed += 1
+        if replayed:
+            logger.info("Replayed %d journal records.", replayed)
+        for resource_id, data in resources_data.items():
+            if data is None:  # Removed
+                resources.pop(resource_id, None)
+            else:
+                resources[resource_id] = Resource.from_trusted_dict(data)
+        if self.lazy:
+            return self._load_lazily(incidents_data), resources
+        for incident_id, data in incidents_data.items():
+            incidents[incident_id] = Incident.from_trusted_dict(data)
+        return incidents, resources
+
+    def _snapshot_path(self, name: str) -> str:
+        return self._path(name + self.snapshot_extension)
+
+    def _load_lazily(self, journaled: Dict[str, dict]) -> MutableMapping:
+        """Indexes the incidents snapshot and materializes active and journaled incidents only."""
+        path = self._snapshot_path("incidents")
+        serializer = SERIALIZERS[self.snapshot_extension]
+        try:
+            self._index = serializer.index_incidents(path, ACTIVE_STATUS_NAMES)
+        except LegacySnapshotError:  # Written before the format could be indexed; the next save converts it
+            incidents = load_incidents_from_file(path)
+            for incident_id, data in journaled.items():
+                incidents[incident_id] = Incident.from_trusted_dict(data)
+            return incidents
+        if self._index is None:
+            return {incident_id: Incident.from_trusted_dict(data) for incident_id, data in journaled.items()}
+        materialize = serializer.incident_from_record
+        resident = {incident_id: materialize(self._index.get(incident_id))
+                    for incident_id in self._index.resident_ids if incident_id not in journaled}
+        for incident_id, data in journaled.items():
+            resident[incident_id] = Incident.from_trusted_dict(data)
+        return LazyIncidents(self._index, resident, materialize)
+
+    def record(self, op: str, incidents: Dict[str, dict], resources: Dict[str, dict]) -> None:
+        if self.journal is not None:
+            self.journal.append(op, incidents, resources)
+
+    def compaction_due(self) -> bool:
+        return self.journal is not None and self.journal.records_since_compaction >= self.compact_every
+
+    def save(self, incidents: MutableMapping, resources: Dict[str, Resource]) -> None:
+        """Writes both snapshots; the journal is then emptied since the snapshot covers it."""
+        save_incidents_to_file(incidents, self._snapshot_path("incidents"))
+        save_resources_to_file(resources, self._snapshot_path("resources"))
+        if self.journal is not None:
+            self.journal.truncate()
+        elif os.path.exists(self._path("journal.jsonl")):
+            os.remove(self._path("journal.jsonl"))
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+        if self._index is not None:
+            self._index.close()
+
+
+class LazyIncidents(MutableMapping):
+    """
+    Incident mapping that keeps only part of the history in memory.
+
+    Incidents that have been loaded, added or looked up are resident (and stay so,
+    since callers may mutate them). Everything else is fetched from a source with
+    get(incident_id) -> record, contains(), ids() and records() on first access, and
+    turned into an Incident by materialize. Iterating
+    values() or items() streams non-resident incidents as temporary objects
+    without making them resident.
+    """
+
+    def __init__(self, source, resident: Optional[Dict[str, Incident]] = None,
+                 materialize: Callable[[Any], Incident] = Incident.from_trusted_dict):
+        """
+        Initializes the mapping.
+
+        Args:
+            source: Provides get(incident_id), contains(incident_id), ids() and records() over stored
+                incident records, in insertion order.
+            resident (Optional[Dict[str, Incident]], optional): Incidents to keep in
+                memory from the start. Defaults to None.
+            materialize (Callable[[Any], Incident], optional): Turns a stored record
+                into a new Incident. Defaults to Incident.from_trusted_dict, for dictionaries.
+        """
+        self._source = source
+        self._materialize = materialize
+        self.resident: Dict[str, Incident] = resident if resident is not None else {}
+
+    def __getitem__(self, incident_id: str) -> Incident:
+        incident = self.resident.get(incident_id)
+        if incident is None:
+            data = self._source.get(incident_id)
+            if data is None:
+                raise KeyError(incident_id)
+            incident = self.resident[incident_id] = self._materialize(data)
+        return incident
+
+    def __setitem__(self, incident_id: str, incident: Incident) -> None:
+        self.resident[incident_id] = incident
+
+    def __delitem__(self, incident_id: str) -> None:
+        del self.resident[incident_id]
+
+    def __contains__(self, incident_id) -> bool:
+        return incident_id in self.resident or self._source.contains(incident_id)
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for incident_id in self._source.ids():
+            seen.add(incident_id)
+            yield incident_id
+        for incident_id in list(self.resident):
+            if incident_id not in seen:
+                yield incident_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def items(self) -> Iterator[Tuple[str, Incident]]:
+        """Streams (incident_id, incident) pairs; non-resident incidents are not cached."""
+        seen = set()
+        for incident_id, data in self._source.records():
+            seen.add(incident_id)
+            incident = self.resident.get(incident_id)
+            yield incident_id, incident if incident is not None else self._materialize(data)
+        for incident_id, incident in list(self.resident.items()):
+            if incident_id not in seen:
+                yield incident_id, incident
+
+    def values(self) -> Iterator[Incident]:
+        """Streams incidents; non-resident incidents are not cached."""
+        return (incident for _, incident in self.items())
+
+    def fetch(self, incident_id: str) -> Incident:
+        """Returns an incident without making it resident (a temporary object if it is not)."""
+        incident = self.resident.get(incident_id)
+        if incident is None:
+            data = self._source.get(incident_id)
+            if data is None:
+                raise KeyError(incident_id)
+            incident = self._materialize(data)
+        return incident
+
+    def page(self, start: int, count: int) -> List[Incident]:
+        """Returns incidents [start, start + count) in stored order without making them resident."""
+        return [self.fetch(incident_id) for incident_id in itertools.islice(self, start, start + count)]
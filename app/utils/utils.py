@@ -1,5 +1,13 @@
 import math
 
+try:  # NumPy is optional; the batch helpers fall back to pure Python without it
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
+
+
 def calculate_distance(coord1, coord2):
     """
     Calculate the Haversine distance between two points on the Earth specified by latitude and longitude.
@@ -11,7 +19,7 @@ def calculate_distance(coord1, coord2):
     Returns:
     float: The distance between the two points in kilometers.
     """
-    R = 6371.0  # Radius of the Earth in kilometers
+    R = EARTH_RADIUS_KM  # Radius of the Earth in kilometers
 
     lat1, lon1 = coord1
     lat2, lon2 = coord2
@@ -23,4 +31,73 @@ def calculate_distance(coord1, coord2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     distance = R * c
-    return distance
\ No newline at end of file
+    return distance
+
+
+def distance_matrix(origins, destinations):
+    """
+    Calculate the Haversine distance from every origin to every destination in one call.
+
+    Uses NumPy broadcasting when NumPy is installed, and calculate_distance otherwise.
+
+    Parameters:
+    origins (sequence): (latitude, longitude) pairs, e.g. incident coordinates. Shape (n, 2).
+    destinations (sequence): (latitude, longitude) pairs, e.g. resource coordinates. Shape (m, 2).
+
+    Returns:
+    numpy.ndarray or list: An (n, m) matrix of distances in kilometers (a list of lists
+    without NumPy).
+    """
+    if np is None:
+        return [[calculate_distance(origin, destination) for destination in destinations] for origin in origins]
+
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+
+    # Expand sin((x2 - x1) / 2) with the angle-difference identity so that all the
+    # trigonometry is done once per point, leaving only products on the n x m matrix
+    half_o = origins / 2
+    half_d = destinations / 2
+    sin_o, cos_o = np.sin(half_o), np.cos(half_o)
+    sin_d, cos_d = np.sin(half_d), np.cos(half_d)
+    sin_dlat = np.outer(cos_o[:, 0], sin_d[:, 0]) - np.outer(sin_o[:, 0], cos_d[:, 0])
+    sin_dlon = np.outer(cos_o[:, 1], sin_d[:, 1]) - np.outer(sin_o[:, 1], cos_d[:, 1])
+
+    a = sin_dlat * sin_dlat + np.outer(np.cos(origins[:, 0]), np.cos(destinations[:, 0])) * (sin_dlon * sin_dlon)
+    np.clip(a, 0.0, 1.0, out=a)  # Guard against rounding just outside [0, 1]
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a, out=a), out=a)
+
+
+def nearest_k(origins, destinations, k):
+    """
+    Find the k nearest destinations to every origin.
+
+    Parameters:
+    origins (sequence): (latitude, longitude) pairs. Shape (n, 2).
+    destinations (sequence): (latitude, longitude) pairs. Shape (m, 2).
+    k (int): How many neighbours to return per origin (capped at m).
+
+    Returns:
+    tuple: (indices, distances), each of shape (n, min(k, m)), sorted nearest first.
+    Lists of lists without NumPy.
+    """
+    matrix = distance_matrix(origins, destinations)
+    if np is None:
+        indices, distances = [], []
+        for row in matrix:
+            order = sorted(range(len(row)), key=row.__getitem__)[:k]
+            indices.append(order)
+            distances.append([row[index] for index in order])
+        return indices, distances
+
+    k = min(k, matrix.shape[1])
+    if k == 0:
+        empty = np.empty((matrix.shape[0], 0))
+        return empty.astype(int), empty
+    if k < matrix.shape[1]:
+        candidates = np.argpartition(matrix, k - 1, axis=1)[:, :k]  # Unordered k smallest, O(m) per row
+    else:
+        candidates = np.broadcast_to(np.arange(k), (matrix.shape[0], k))
+    candidate_distances = np.take_along_axis(matrix, candidates, axis=1)
+    order = np.argsort(candidate_distances, axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_distances, order, axis=1)
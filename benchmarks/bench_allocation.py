@@ -0,0 +1,70 @@
+"""
+Write-latency benchmark for incremental resource allocation.
+
+Seeds a system with a growing number of open incidents and measures the mean
+latency of add_incident/update_incident at each size. With incremental
+allocation the per-write cost should stay roughly flat as the open backlog grows.
+
+Run with:
+    python -m benchmarks.bench_allocation
+"""
+import argparse
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+
+RESOURCE_TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+
+
+def build_system(data_dir: str, open_incidents: int, units_per_type: int, rng: random.Random) -> EmergencyManagement:
+    """Creates a system with the given fleet and number of open incidents."""
+    with redirect_stdout(StringIO()):
+        management = EmergencyManagement(data_dir=data_dir)
+    for resource_type in RESOURCE_TYPES:
+        for index in range(units_per_type):
+            resource = Resource(name=f"{resource_type} {index}", resource_type=resource_type, location="Zone 1")
+            management.add_resource(resource.resource_id, resource)
+    for _ in range(open_incidents):
+        management.add_incident("Zone 1", "medical", rng.choice(list(Priority)), [rng.choice(RESOURCE_TYPES)])
+    return management
+
+
+def measure_writes(management: EmergencyManagement, writes: int, rng: random.Random) -> dict:
+    """Returns mean add/update latency in microseconds."""
+    incident_ids = list(management.incidents)
+    start = time.perf_counter()
+    for _ in range(writes):
+        management.add_incident("Zone 2", "fire", rng.choice(list(Priority)), [rng.choice(RESOURCE_TYPES)])
+    add_us = (time.perf_counter() - start) / writes * 1e6
+
+    start = time.perf_counter()
+    for _ in range(writes):
+        management.update_incident(rng.choice(incident_ids), priority=rng.choice(list(Priority)))
+    update_us = (time.perf_counter() - start) / writes * 1e6
+    return {"add_us": add_us, "update_us": update_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--units-per-type", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'open incidents':>15} {'add_incident (us)':>18} {'update_incident (us)':>21}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        with tempfile.TemporaryDirectory() as data_dir:
+            management = build_system(data_dir, size, args.units_per_type, rng)
+            result = measure_writes(management, args.writes, rng)
+        print(f"{size:>15} {result['add_us']:>18.1f} {result['update_us']:>21.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Distance-ranking benchmark: batch haversine vs calculate_distance.
+
+Ranks every available unit against every open incident, once with the
+vectorized distance_matrix/nearest_k helpers and once with scalar calls.
+
+Run with:
+    python -m benchmarks.bench_distance
+"""
+import argparse
+import random
+import time
+from app.utils import utils
+from app.utils.utils import calculate_distance, distance_matrix, nearest_k
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidents", type=int, default=500)
+    parser.add_argument("--units", type=int, default=5_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    incidents = [(rng.uniform(51.3, 51.7), rng.uniform(-0.5, 0.3)) for _ in range(args.incidents)]
+    units = [(rng.uniform(51.3, 51.7), rng.uniform(-0.5, 0.3)) for _ in range(args.units)]
+
+    start = time.perf_counter()
+    distance_matrix(incidents, units)
+    matrix_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    nearest_k(incidents, units, args.k)
+    top_k_ms = (time.perf_counter() - start) * 1e3
+
+    sample = incidents[: max(1, len(incidents) // 10)]
+    start = time.perf_counter()
+    for incident in sample:
+        sorted(calculate_distance(incident, unit) for unit in units)[: args.k]
+    scalar_ms = (time.perf_counter() - start) * 1e3 * len(incidents) / len(sample)
+
+    backend = "numpy" if utils.np is not None else "pure python"
+    print(f"{args.incidents} incidents x {args.units} units ({backend})")
+    print(f"distance_matrix:              {matrix_ms:10.1f} ms")
+    print(f"nearest_k (k={args.k}):             {top_k_ms:10.1f} ms")
+    print(f"scalar calculate_distance:    {scalar_ms:10.1f} ms (extrapolated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Memory benchmark: retained bytes per incident record.
+
+Generates a history of closed incidents, serializes it to JSON and measures the
+memory still held after loading it as
+  - the raw JSON dictionaries,
+  - unslotted Incident objects: the class as it was before __slots__ and
+    string interning, the baseline for the slotted one,
+  - Incident objects keyed by ID (what load_data keeps),
+  - an IncidentColumns store (benchmarks.columnar).
+
+Run with:
+    python -m benchmarks.bench_memory
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from datetime import datetime
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+from benchmarks.columnar import IncidentColumns
+
+LOCATIONS = [f"Zone {index}" for index in range(1, 11)]
+EMERGENCY_TYPES = ["fire", "medical", "flood", "accident"]
+RESOURCE_TYPES = ["Ambulance", "Fire Truck", "Police Car", "Rescue Team"]
+
+
+def make_history(count: int, rng: random.Random) -> str:
+    """Returns a JSON object of closed incidents in the to_dict format."""
+    records = {}
+    for _ in range(count):
+        incident = Incident(location=rng.choice(LOCATIONS), emergency_type=rng.choice(EMERGENCY_TYPES),
+                            priority=rng.choice(list(Priority)),
+                            required_resources=rng.sample(RESOURCE_TYPES, rng.randint(1, 2)),
+                            status=IncidentStatus.CLOSED)
+        records[incident.incident_id] = incident.to_dict()
+    return json.dumps(records)
+
+
+class UnslottedIncident:
+    """Incident as it was before __slots__ and interning: one __dict__ and unshared strings per record."""
+
+    def __init__(self, incident_id, location, emerg_type, priority, required_resources, status,
+                 assigned_resources, created_at, updated_at):
+        self.incident_id = incident_id
+        self.location = location
+        self.emerg_type = emerg_type
+        self.priority = priority
+        self.required_resources = required_resources
+        self.status = status
+        self.assigned_resources = assigned_resources
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UnslottedIncident":
+        """Parses a to_dict record as the old Incident.from_dict did."""
+        return cls(data["incident_id"], data.get("location", ""), data.get("emerg_type", ""),
+                   Priority[data.get("priority", "LOW")], data.get("required_resources", []),
+                   IncidentStatus[data.get("status", "OPEN")], data.get("assigned_resources", []),
+                   datetime.fromisoformat(data["created_at"]), datetime.fromisoformat(data["updated_at"]))
+
+
+def retained_bytes(blob: str, build) -> float:
+    """Parses the JSON, builds a representation from it and returns bytes retained per record."""
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(blob)
+    count = len(data)
+    result = build(data)
+    if result is not data:
+        del data
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    blob = make_history(args.records, random.Random(args.seed))
+    builders = {
+        "JSON dicts": lambda data: data,
+        "Incident (before)": lambda data: {key: UnslottedIncident.from_dict(value) for key, value in data.items()},
+        "Incident (slotted)": lambda data: {key: Incident.from_dict(value) for key, value in data.items()},
+        "IncidentColumns": lambda data: IncidentColumns(Incident.from_dict(value) for value in data.values()),
+    }
+    print(f"{args.records} records")
+    print(f"{'representation':>18} {'bytes/record':>13} {'vs before':>10}")
+    results = {name: retained_bytes(blob, build) for name, build in builders.items()}
+    for name, retained in results.items():
+        print(f"{name:>18} {retained:>13.0f} {retained / results['Incident (before)']:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
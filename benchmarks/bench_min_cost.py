@@ -0,0 +1,82 @@
+"""
+Benchmark for the min-cost allocation engine against greedy nearest-first dispatch.
+
+Scatters zones around a city, then adds incidents and a smaller fleet across them
+and runs a full allocation pass with each engine. Reports planning time, whether
+the min-cost engine stayed within its budget, and the total incident-to-unit
+distance of each allocation.
+
+Run with:
+    python -m benchmarks.bench_min_cost
+"""
+import argparse
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.allocation_engine import GreedyAllocationEngine, MinCostAllocationEngine
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.utils import calculate_distance
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+
+RESOURCE_TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+
+
+def build_system(data_dir: str, zones: int, incidents: int, units: int, rng: random.Random) -> EmergencyManagement:
+    """Creates a proximity-dispatch system with random zones, fleet and incidents."""
+    with redirect_stdout(StringIO()):
+        management = EmergencyManagement(data_dir=data_dir, proximity_dispatch=True)
+    names = [f"Zone {index}" for index in range(1, zones + 1)]
+    for name in names:
+        management.add_zone(name, (51.5 + rng.uniform(-0.2, 0.2), -0.12 + rng.uniform(-0.3, 0.3)))
+    management.resources = {}
+    management._rebuild_resource_indexes()
+    for index in range(units):
+        resource = Resource(name=f"Unit {index}", resource_type=rng.choice(RESOURCE_TYPES), location=rng.choice(names))
+        management.resources[resource.resource_id] = resource
+    management._rebuild_resource_indexes()
+    for _ in range(incidents):
+        management.add_incident(rng.choice(names), "medical", rng.choice(list(Priority)), [rng.choice(RESOURCE_TYPES)])
+    return management
+
+
+def total_distance(management: EmergencyManagement) -> float:
+    mapping = management.location_mapping
+    return sum(
+        calculate_distance(mapping[incident.location], mapping[management.resources[resource_id].location])
+        for incident_id in management.dispatch_queue
+        for incident in [management.incidents[incident_id]]
+        for resource_id in incident.assigned_resources
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--incidents", type=int, default=5_000)
+    parser.add_argument("--units", type=int, default=2_000)
+    parser.add_argument("--budget", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.incidents} incidents, {args.units} units")
+    print(f"{'zones':>6} {'greedy (s)':>11} {'greedy km':>10} {'min-cost (s)':>13} {'min-cost km':>12} {'fell back':>10}")
+    for zones in args.zones:
+        with tempfile.TemporaryDirectory() as data_dir:
+            management = build_system(data_dir, zones, args.incidents, args.units, random.Random(args.seed))
+            results = []
+            for engine in (GreedyAllocationEngine(), MinCostAllocationEngine(time_budget=args.budget)):
+                management.allocation_engine = engine
+                start = time.perf_counter()
+                with redirect_stdout(StringIO()):
+                    management.process_resource_allocation()
+                results.append((time.perf_counter() - start, total_distance(management)))
+            fell_back = management.allocation_engine.fell_back
+        (greedy_s, greedy_km), (min_cost_s, min_cost_km) = results
+        print(f"{zones:>6} {greedy_s:>11.3f} {greedy_km:>10.0f} {min_cost_s:>13.3f} {min_cost_km:>12.0f} {str(fell_back):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Nearest-unit lookup benchmark for proximity dispatch.
+
+Places units across many zones and compares SpatialIndex.nearest_available with
+a linear haversine scan over every available unit of the type.
+
+Run with:
+    python -m benchmarks.bench_proximity
+"""
+import argparse
+import random
+import time
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.utils.spatial_index import SpatialIndex
+from app.utils.utils import calculate_distance
+
+RESOURCE_TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, default=5_000)
+    parser.add_argument("--units", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    zones = {f"Zone {index}": (rng.uniform(49.9, 58.6), rng.uniform(-7.6, 1.7)) for index in range(args.zones)}
+    zone_names = list(zones)
+    resources = {}
+    for index in range(args.units):
+        resource = Resource(
+            name=f"Unit {index}",
+            resource_type=rng.choice(RESOURCE_TYPES),
+            location=rng.choice(zone_names),
+            status=ResourceStatus.AVAILABLE if rng.random() < 0.3 else ResourceStatus.ASSIGNED,
+        )
+        resources[resource.resource_id] = resource
+
+    start = time.perf_counter()
+    index = SpatialIndex(zones)
+    index.rebuild(resources)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    queries = [(rng.choice(RESOURCE_TYPES), rng.choice(zone_names)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for resource_type, location in queries:
+        index.nearest_available(resource_type, location)
+    indexed_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    available = [res for res in resources.values() if res.status == ResourceStatus.AVAILABLE]
+    scan_queries = queries[: max(1, len(queries) // 20)]
+    start = time.perf_counter()
+    for resource_type, location in scan_queries:
+        min(
+            (res for res in available if res.resource_type == resource_type),
+            key=lambda res: calculate_distance(zones[location], zones[res.location]),
+        )
+    scan_us = (time.perf_counter() - start) / len(scan_queries) * 1e6
+
+    print(f"zones={args.zones} units={args.units} available={len(available)}")
+    print(f"index build:          {build_ms:10.1f} ms")
+    print(f"k-d tree nearest:     {indexed_us:10.1f} us/query")
+    print(f"linear haversine scan:{scan_us:10.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: snapshot formats (JSON against the compact binary format).
+
+Builds a synthetic incident history with assigned units (see benchmarks.workload),
+then for every registered snapshot format saves and loads it several times and
+reports save and load throughput (records per second, median round) and the
+file size. Loading builds incidents through the trusted path (no per-field
+checks); the last line compares that with the validating from_dict on the same
+records.
+
+Run with:
+    python -m benchmarks.bench_serializers
+    python -m benchmarks.bench_serializers --incidents 500000 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from app.incidents.emerg_incident import Incident
+from app.utils.data_persistence import SERIALIZERS, serializer_for
+from benchmarks.workload import CityWorkload
+
+
+def _median_seconds(function, rounds: int) -> float:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incidents", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workload = CityWorkload(seed=args.seed)
+    fleet = {resource.resource_id: resource for resource in workload.fleet()}
+    unit_ids = list(fleet)
+    incidents = {}
+    for index, incident in enumerate(workload.incidents(args.incidents, resolved_share=0.9)):
+        incident.assigned_resources = [unit_ids[(index + offset) % len(unit_ids)]
+                                       for offset in range(len(incident.required_resources))]
+        incidents[incident.incident_id] = incident
+
+    print(f"{args.incidents} incidents, {len(fleet)} units, median of {args.rounds} rounds")
+    print(f"{'format':<8} {'save (rec/s)':>13} {'load (rec/s)':>13} {'size (MiB)':>11} {'bytes/rec':>10}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for extension in SERIALIZERS:
+            path = os.path.join(data_dir, f"incidents{extension}")
+            serializer = serializer_for(path)
+            save = _median_seconds(lambda: serializer.save_incidents(incidents, path), args.rounds)
+            load = _median_seconds(lambda: serializer.load_incidents(path), args.rounds)
+            size = os.path.getsize(path)
+            print(f"{extension:<8} {args.incidents / save:>13,.0f} {args.incidents / load:>13,.0f} "
+                  f"{size / 2 ** 20:>11.1f} {size / args.incidents:>10.0f}")
+
+    records = [incident.to_dict() for incident in incidents.values()]
+    strict = _median_seconds(lambda: [Incident.from_dict(data) for data in records], args.rounds)
+    trusted = _median_seconds(lambda: [Incident.from_trusted_dict(data) for data in records], args.rounds)
+    print(f"from_dict {args.incidents / strict:,.0f} rec/s, from_trusted_dict {args.incidents / trusted:,.0f} rec/s "
+          f"({strict / trusted:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: single-process allocation vs region sharding over worker processes.
+
+Builds a synthetic city (see benchmarks.workload), then for one process and for
+each number of regions ingests the same incident feed in batches and runs full
+allocation passes over the resulting backlog. Sharded throughput should grow
+with the number of regions up to the number of cores (printed first); on a
+single core it only shows the coordination overhead.
+
+Run with:
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --events 200000 --regions 1 2 4 8
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.sharding import ShardedEmergencyManagement
+from benchmarks.workload import CityWorkload
+
+
+def _add_fleet(system, workload: CityWorkload) -> None:
+    for resource in workload.fleet():
+        system.add_resource(resource.resource_id, resource)
+
+
+def run(system, workload: CityWorkload, events: list, batch_size: int, passes: int) -> tuple:
+    """Returns (events per second ingested, seconds per full allocation pass)."""
+    _add_fleet(system, workload)
+    start = time.perf_counter()
+    for offset in range(0, len(events), batch_size):
+        system.ingest_batch(events[offset:offset + batch_size])
+    ingest_rate = len(events) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(passes):
+        system.process_resource_allocation()
+    return ingest_rate, (time.perf_counter() - start) / passes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--regions", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    workload = CityWorkload(zones=args.zones)
+    events = workload.incident_events(args.events)
+    print(f"{os.cpu_count()} CPU core(s), {args.zones} zones, {args.events} events in batches of {args.batch_size}")
+    print(f"{'setup':<18} {'ingest (ev/s)':>14} {'full pass (s)':>14}")
+
+    data_dir = tempfile.mkdtemp(prefix="bench-sharding-")
+    try:
+        management = EmergencyManagement(data_dir=os.path.join(data_dir, "single"), proximity_dispatch=True,
+                                          default_resources=False)
+        for zone, coordinates in workload.zones.items():
+            management.add_zone(zone, coordinates)
+        rate, seconds = run(management, workload, events, args.batch_size, args.passes)
+        management.close()
+        print(f"{'single process':<18} {rate:>14,.0f} {seconds:>14.3f}")
+
+        for regions in args.regions:
+            sharded = ShardedEmergencyManagement(os.path.join(data_dir, f"sharded-{regions}"), regions=regions,
+                                                 location_mapping=workload.zones, proximity_dispatch=True)
+            try:
+                rate, seconds = run(sharded, workload, events, args.batch_size, args.passes)
+            finally:
+                sharded.close()
+            print(f"{f'{regions} region(s)':<18} {rate:>14,.0f} {seconds:>14.3f}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Startup benchmark for eager versus lazy loading, of JSON and binary snapshots.
+
+Writes a history of mostly resolved incidents (with a small active share) as
+incidents.json and incidents.bin and measures how long EmergencyManagement takes
+to start from each with and without lazy_load. Lazy startup should track the
+number of active incidents rather than the size of the history; from a mapped
+binary snapshot the history is not even scanned, so nearly all of the time goes
+to materializing the active incidents.
+
+Run with:
+    python -m benchmarks.bench_startup
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.data_persistence import save_incidents_to_file
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+
+MODES = [  # (label, snapshot_extension, lazy_load)
+    ("json eager", ".json", False),
+    ("json lazy", ".json", True),
+    ("bin eager", ".bin", False),
+    ("bin mapped", ".bin", True),
+]
+
+
+def write_history(data_dir: str, incidents: int, active_share: float, rng: random.Random) -> None:
+    """Saves incidents.json and incidents.bin with the given share of active incidents."""
+    history = {}
+    for index in range(incidents):
+        status = IncidentStatus.OPEN if rng.random() < active_share else IncidentStatus.CLOSED
+        incident = Incident(location=f"Zone {index % 10 + 1}", emergency_type="medical",
+                            priority=rng.choice(list(Priority)), required_resources=["Ambulance"], status=status)
+        history[incident.incident_id] = incident
+    with redirect_stdout(StringIO()):
+        for extension in (".json", ".bin"):
+            save_incidents_to_file(history, f"{data_dir}/incidents{extension}")
+
+
+def measure_startup(data_dir: str, snapshot_extension: str, lazy_load: bool) -> dict:
+    """Returns startup time in milliseconds and peak traced memory in MiB."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        management = EmergencyManagement(data_dir=data_dir, snapshot_extension=snapshot_extension,
+                                         lazy_load=lazy_load)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    management.close()
+    return {"ms": elapsed_ms, "peak_mib": peak}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--active-share", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'incidents':>10} " + " ".join(f"{label + ' (ms)':>16}" for label, _, _ in MODES)
+          + " " + " ".join(f"{label + ' (MiB)':>17}" for label, _, _ in MODES))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_history(data_dir, size, args.active_share, random.Random(args.seed))
+            results = [measure_startup(data_dir, extension, lazy_load) for _, extension, lazy_load in MODES]
+        print(f"{size:>10} " + " ".join(f"{result['ms']:>16.1f}" for result in results)
+              + " " + " ".join(f"{result['peak_mib']:>17.1f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test for the asyncio dispatch service.
+
+Starts a DispatchService in-process on an ephemeral port over a temporary data
+directory, then connects a number of dispatch consoles that each pipeline a mix
+of incident adds, updates and active-incident reads. Reports throughput and
+latency percentiles over all requests.
+
+Run with:
+    python -m benchmarks.load_service
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import List
+from app.service import DispatchClient, DispatchService
+from app.utils.emerg_management import EmergencyManagement
+
+RESOURCE_TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+PRIORITIES = ["HIGH", "MEDIUM", "LOW"]
+
+
+async def console(port: int, requests: int, in_flight: int, rng: random.Random, latencies: List[float]) -> None:
+    """One console: keeps up to in_flight requests outstanding until it has sent its share."""
+    client = await DispatchClient(port=port).connect()
+    incident_ids: List[str] = []
+    slots = asyncio.Semaphore(in_flight)
+
+    async def timed(op: str, **params) -> None:
+        async with slots:
+            start = time.perf_counter()
+            result = await client.request(op, **params)
+            latencies.append(time.perf_counter() - start)
+        if op == "add_incident":
+            incident_ids.append(result)
+
+    tasks = []
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.6 or not incident_ids:
+            task = timed("add_incident", location=f"Zone {rng.randint(1, 3)}", emergency_type="medical",
+                         priority=rng.choice(PRIORITIES), required_resources=[rng.choice(RESOURCE_TYPES)])
+        elif roll < 0.9:
+            task = timed("update_incident", incident_id=rng.choice(incident_ids), priority=rng.choice(PRIORITIES))
+        else:
+            task = timed("resources", resource_type=rng.choice(RESOURCE_TYPES))
+        tasks.append(asyncio.create_task(task))
+    await asyncio.gather(*tasks)
+    await client.close()
+
+
+async def run(consoles: int, requests: int, in_flight: int, journal: bool, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as data_dir:
+        with redirect_stdout(StringIO()):
+            management = EmergencyManagement(data_dir=data_dir, journal=journal)
+        service = DispatchService(management)
+        port = await service.start(port=0)
+        latencies: List[float] = []
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            console(port, requests, in_flight, random.Random(seed + index), latencies) for index in range(consoles)
+        ])
+        elapsed = time.perf_counter() - start
+        with redirect_stdout(StringIO()):
+            await service.stop(save=False)
+
+    latencies.sort()
+
+    def percentile(share: float) -> float:
+        return latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000
+
+    print(f"{consoles} consoles x {requests} requests, {in_flight} in flight each, journal={journal}")
+    print(f"{'requests':>9} {'seconds':>8} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    print(f"{len(latencies):>9} {elapsed:>8.2f} {len(latencies) / elapsed:>8.0f} "
+          f"{percentile(0.5):>9.2f} {percentile(0.99):>9.2f} {latencies[-1] * 1000:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--consoles", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per console")
+    parser.add_argument("--in-flight", type=int, default=8, help="Pipelined requests per console")
+    parser.add_argument("--journal", action="store_true", help="Journal every change, as `python -m app.service` does")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.consoles, args.requests, args.in_flight, args.journal, args.seed))
+
+
+if __name__ == "__main__":
+    main()
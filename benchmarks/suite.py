@@ -0,0 +1,290 @@
+"""
+Benchmark suite over a synthetic city (see benchmarks.workload), with regression thresholds.
+
+Each scenario times one EmergencyManagement workload for a few rounds, in the
+style of pytest-benchmark: a scenario receives a `benchmark` callable and calls
+it with the function to time, or uses benchmark.pedantic() to get untimed
+per-round setup. The median round is compared against benchmarks/thresholds.json,
+and the run fails if any scenario is slower than its threshold.
+
+Run with:
+    python -m benchmarks.suite                      # Check the small scale against thresholds
+    python -m benchmarks.suite --scale city         # A full city; slower
+    python -m benchmarks.suite --only allocation    # Scenarios whose name contains "allocation"
+    python -m benchmarks.suite --update-thresholds  # Record medians x --tolerance as the new thresholds
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+from app.utils.allocation_engine import MinCostAllocationEngine
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.utils import nearest_k
+from app.priorities.emerg_priority import Priority
+from benchmarks.workload import CityWorkload
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+SCALES = {
+    # zones, units per type, open incidents, closed history
+    "small": {"zones": 20, "units": 25, "open": 2_000, "history": 20_000},
+    "city": {"zones": 200, "units": 250, "open": 20_000, "history": 200_000},
+}
+
+
+class Benchmark:
+    """A minimal stand-in for pytest-benchmark's fixture."""
+
+    def __init__(self, rounds: int):
+        self.rounds = rounds
+        self.times: List[float] = []
+
+    def __call__(self, function: Callable, *args, **kwargs):
+        """Times function(*args, **kwargs) for every round and returns the last result."""
+        return self.pedantic(function, args=args, kwargs=kwargs)
+
+    def pedantic(self, target: Callable, args=(), kwargs=None, setup: Optional[Callable] = None):
+        """
+        Times target for every round; setup runs untimed before each round and may
+        return (args, kwargs) for that round.
+        """
+        result = None
+        for _ in range(self.rounds):
+            round_args, round_kwargs = args, kwargs or {}
+            if setup is not None:
+                prepared = setup()
+                if prepared is not None:
+                    round_args, round_kwargs = prepared
+            start = time.perf_counter()
+            result = target(*round_args, **round_kwargs)
+            self.times.append(time.perf_counter() - start)
+        return result
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(name: str) -> Callable:
+    """Registers a scenario function(benchmark, workload, scale, data_dir)."""
+    def register(function: Callable) -> Callable:
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+@scenario("allocation_full_pass")
+def allocation_full_pass(benchmark, workload, scale, data_dir):
+    management = workload.build_system(data_dir, open_incidents=scale["open"], proximity_dispatch=True)
+    benchmark(management.process_resource_allocation)
+
+
+@scenario("allocation_min_cost")
+def allocation_min_cost(benchmark, workload, scale, data_dir):
+    management = workload.build_system(data_dir, open_incidents=scale["open"], proximity_dispatch=True,
+                                       allocation_engine=MinCostAllocationEngine(time_budget=30.0))
+    benchmark(management.process_resource_allocation)
+
+
+@scenario("incident_stream_add")
+def incident_stream_add(benchmark, workload, scale, data_dir):
+    """Adds 1,000 arriving incidents one at a time on top of the open backlog."""
+    events = workload.incident_events(1_000)
+
+    def setup():
+        management = workload.build_system(data_dir, open_incidents=scale["open"], proximity_dispatch=True)
+        management.process_resource_allocation()
+        return (management,), {}
+
+    def add_all(management):
+        for event in events:
+            management.add_incident(event["location"], event["emergency_type"], Priority[event["priority"]],
+                                    event["required_resources"])
+
+    benchmark.pedantic(add_all, setup=setup)
+
+
+@scenario("ingest_batch")
+def ingest_batch(benchmark, workload, scale, data_dir):
+    """Ingests the open backlog's worth of arrivals as one batch."""
+    events = workload.incident_events(scale["open"])
+
+    def setup():
+        return (workload.build_system(data_dir),), {}
+
+    benchmark.pedantic(lambda management: management.ingest_batch(events), setup=setup)
+
+
+@scenario("persistence_roundtrip")
+def persistence_roundtrip(benchmark, workload, scale, data_dir):
+    """Saves the open backlog plus history, then starts a new system from it."""
+    management = workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"])
+
+    def roundtrip():
+        management.save_data()
+        EmergencyManagement(data_dir=data_dir).close()
+
+    benchmark(roundtrip)
+
+
+@scenario("persistence_binary")
+def persistence_binary(benchmark, workload, scale, data_dir):
+    """As persistence_roundtrip, with binary snapshot files."""
+    management = workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"],
+                                       snapshot_extension=".bin")
+
+    def roundtrip():
+        management.save_data()
+        EmergencyManagement(data_dir=data_dir, snapshot_extension=".bin").close()
+
+    benchmark(roundtrip)
+
+
+@scenario("startup_load")
+def startup_load(benchmark, workload, scale, data_dir):
+    workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"]).save_data()
+    benchmark(lambda: EmergencyManagement(data_dir=data_dir).close())
+
+
+@scenario("startup_load_lazy")
+def startup_load_lazy(benchmark, workload, scale, data_dir):
+    workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"]).save_data()
+    benchmark(lambda: EmergencyManagement(data_dir=data_dir, lazy_load=True).close())
+
+
+@scenario("startup_mapped")
+def startup_mapped(benchmark, workload, scale, data_dir):
+    """Lazy startup from a memory-mapped binary snapshot."""
+    workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"],
+                          snapshot_extension=".bin").save_data()
+    benchmark(lambda: EmergencyManagement(data_dir=data_dir, snapshot_extension=".bin", lazy_load=True).close())
+
+
+@scenario("time_range_queries")
+def time_range_queries(benchmark, workload, scale, data_dir):
+    """500 pairs of queries over the whole history: the 50 most recent incidents, and a one-hour window."""
+    management = workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"])
+    incidents = list(management.incidents.values())
+    windows = [incidents[index].created_at for index in range(0, len(incidents), max(len(incidents) // 500, 1))]
+    management.recent_incidents(1)  # Builds the creation index
+
+    def queries():
+        for since in windows[:500]:
+            management.recent_incidents(50)
+            management.incidents_created_between(since, since + timedelta(hours=1))
+
+    benchmark(queries)
+
+
+class _CountingSink:
+    """A text stream that only counts what is written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text)
+        return len(text)
+
+
+@scenario("report_generation")
+def report_generation(benchmark, workload, scale, data_dir):
+    """Streams the full incident report as text (as menu option 7 writes it) and formats the active list."""
+    management = workload.build_system(data_dir, open_incidents=scale["open"], history=scale["history"] // 4)
+    management.process_resource_allocation()
+
+    def report():
+        out = _CountingSink()
+        management.stream_incident_report().write(out)
+        active = "\n".join(str(incident) for incident in management.get_active_incidents())
+        return out.size + len(active)
+
+    benchmark(report)
+
+
+@scenario("distance_ranking")
+def distance_ranking(benchmark, workload, scale, data_dir):
+    """Ranks the five nearest units of every open incident by haversine distance."""
+    zones = workload.zones
+    origins = [zones[incident.location] for incident in workload.incidents(scale["open"])]
+    destinations = [zones[resource.location] for resource in workload.fleet()]
+    benchmark(nearest_k, origins, destinations, 5)
+
+
+def run(scale_name: str, rounds: int, only: Optional[str], seed: int) -> Dict[str, float]:
+    """Runs the selected scenarios and returns {scenario: median seconds}."""
+    scale = SCALES[scale_name]
+    workload = CityWorkload(seed=seed, zones=scale["zones"],
+                            units_per_type={name: scale["units"] for name in ("Ambulance", "Fire Truck",
+                                                                               "Police Car", "Rescue Team")})
+    medians = {}
+    for name, function in SCENARIOS.items():
+        if only and only not in name:
+            continue
+        data_dir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        try:
+            benchmark = Benchmark(rounds)
+            function(benchmark, workload, scale, data_dir)
+            medians[name] = benchmark.median
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return medians
+
+
+def load_thresholds(path: str = THRESHOLDS_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--only", help="Run only scenarios whose name contains this")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="Write the measured medians times --tolerance as the thresholds for this scale")
+    parser.add_argument("--tolerance", type=float, default=3.0)
+    args = parser.parse_args()
+
+    medians = run(args.scale, args.rounds, args.only, args.seed)
+    thresholds = load_thresholds(args.thresholds)
+    limits = thresholds.get(args.scale, {})
+
+    print(f"scale={args.scale}, {args.rounds} rounds, seed {args.seed}")
+    print(f"{'scenario':<24} {'median (s)':>11} {'threshold (s)':>14} {'status':>8}")
+    regressions = []
+    for name, median in medians.items():
+        limit = limits.get(name)
+        status = "-" if limit is None else ("ok" if median <= limit else "SLOWER")
+        if status == "SLOWER":
+            regressions.append(name)
+        limit_text = f"{limit:.4f}" if limit is not None else "-"
+        print(f"{name:<24} {median:>11.4f} {limit_text:>14} {status:>8}")
+
+    if args.update_thresholds:
+        limits.update({name: round(median * args.tolerance, 4) for name, median in medians.items()})
+        thresholds[args.scale] = dict(sorted(limits.items()))
+        with open(args.thresholds, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2)
+            f.write("\n")
+        print(f"Updated thresholds for scale {args.scale} in {args.thresholds}")
+    elif regressions:
+        print(f"Performance regression in: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Seeded synthetic city workload for the benchmarks.
+
+A city is a set of zones scattered around a centre, some of them busier than
+others, a fleet with a number of units per type based at those zones, and an
+incident arrival stream (Poisson arrivals, a priority mix and emergency types
+that determine the resources required). The same seed always produces the same
+city and the same stream.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+
+DEFAULT_UNITS_PER_TYPE = {"Ambulance": 120, "Fire Truck": 60, "Police Car": 150, "Rescue Team": 20}
+PRIORITY_MIX = {Priority.HIGH: 0.15, Priority.MEDIUM: 0.35, Priority.LOW: 0.50}
+# Emergency type -> (share of incidents, candidate requirement lists)
+EMERGENCY_TYPES = {
+    "medical": (0.45, [["Ambulance"], ["Ambulance", "Ambulance"]]),
+    "crime": (0.30, [["Police Car"], ["Police Car", "Police Car"], ["Police Car", "Ambulance"]]),
+    "fire": (0.15, [["Fire Truck"], ["Fire Truck", "Ambulance"], ["Fire Truck", "Fire Truck", "Ambulance"]]),
+    "flood": (0.10, [["Rescue Team"], ["Rescue Team", "Ambulance"]]),
+}
+
+
+class CityWorkload:
+    """Generates zones, a fleet and an incident stream from one seed."""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        zones: int = 50,
+        units_per_type: Optional[Dict[str, int]] = None,
+        arrivals_per_hour: float = 120.0,
+        center: Tuple[float, float] = (51.5, -0.12),
+        spread: Tuple[float, float] = (0.2, 0.3),
+    ):
+        """
+        Initializes the workload.
+
+        Args:
+            seed (int, optional): The random seed. Defaults to 42.
+            zones (int, optional): The number of zones. Defaults to 50.
+            units_per_type (Optional[Dict[str, int]], optional): Fleet size per
+                resource type. Defaults to DEFAULT_UNITS_PER_TYPE.
+            arrivals_per_hour (float, optional): The mean incident arrival rate.
+                Defaults to 120.
+            center (Tuple[float, float], optional): The city centre (lat, lon).
+            spread (Tuple[float, float], optional): The half-width of the city in
+                degrees of latitude and longitude.
+        """
+        self.seed = seed
+        self.units_per_type = dict(units_per_type or DEFAULT_UNITS_PER_TYPE)
+        self.arrivals_per_hour = arrivals_per_hour
+        rng = random.Random(seed)
+        self.zones: Dict[str, Tuple[float, float]] = {
+            f"Zone {index}": (center[0] + rng.uniform(-spread[0], spread[0]),
+                              center[1] + rng.uniform(-spread[1], spread[1]))
+            for index in range(1, zones + 1)
+        }
+        # Zipf-like activity: a few zones see most incidents
+        self.zone_weights: List[float] = [1.0 / rank for rank in range(1, zones + 1)]
+        rng.shuffle(self.zone_weights)
+
+    def fleet(self) -> List[Resource]:
+        """Returns the fleet, each unit based at a random zone."""
+        rng = random.Random(self.seed + 1)
+        names = list(self.zones)
+        return [
+            Resource(name=f"{resource_type} {index}", resource_type=resource_type, location=rng.choice(names))
+            for resource_type, count in self.units_per_type.items()
+            for index in range(count)
+        ]
+
+    def _arrivals(self, count: int, start: datetime, rng: random.Random) -> Iterator[Tuple[datetime, str, str, Priority, List[str]]]:
+        names = list(self.zones)
+        priorities, priority_weights = list(PRIORITY_MIX), list(PRIORITY_MIX.values())
+        types = list(EMERGENCY_TYPES)
+        type_weights = [EMERGENCY_TYPES[name][0] for name in types]
+        when = start
+        for _ in range(count):
+            when += timedelta(hours=rng.expovariate(self.arrivals_per_hour))
+            emergency_type = rng.choices(types, type_weights)[0]
+            yield (
+                when,
+                rng.choices(names, self.zone_weights)[0],
+                emergency_type,
+                rng.choices(priorities, priority_weights)[0],
+                list(rng.choice(EMERGENCY_TYPES[emergency_type][1])),
+            )
+
+    def incidents(self, count: int, resolved_share: float = 0.0, start: Optional[datetime] = None) -> List[Incident]:
+        """
+        Returns an arrival stream as Incident objects, oldest first.
+
+        Args:
+            count (int): The number of incidents.
+            resolved_share (float, optional): The share that is already closed
+                (history rather than open work). Defaults to 0.
+            start (Optional[datetime], optional): When the stream begins.
+                Defaults to a fixed date, so the stream is reproducible.
+        """
+        rng = random.Random(self.seed + 2)
+        start = start or datetime(2024, 1, 1)
+        incidents = []
+        for when, zone, emergency_type, priority, required in self._arrivals(count, start, rng):
+            status = IncidentStatus.CLOSED if rng.random() < resolved_share else IncidentStatus.OPEN
+            incidents.append(Incident(zone, emergency_type, priority, required, status=status,
+                                      created_at=when, updated_at=when))
+        return incidents
+
+    def incident_events(self, count: int) -> List[dict]:
+        """Returns an arrival stream as add_incident events for ingest_batch."""
+        rng = random.Random(self.seed + 3)
+        return [
+            {"op": "add_incident", "location": zone, "emergency_type": emergency_type,
+             "priority": priority.name, "required_resources": required}
+            for _, zone, emergency_type, priority, required in self._arrivals(count, datetime(2024, 1, 1), rng)
+        ]
+
+    def build_system(self, data_dir: str, open_incidents: int = 0, history: int = 0, **options) -> EmergencyManagement:
+        """
+        Creates a system for the city: its zones and fleet, then the given incidents,
+        without allocating them (call process_resource_allocation to do that).
+
+        Args:
+            data_dir (str): The data directory (normally a temporary one).
+            open_incidents (int, optional): Open incidents to add. Defaults to 0.
+            history (int, optional): Closed incidents to add as well. Defaults to 0.
+            **options: Passed to EmergencyManagement (e.g. proximity_dispatch=True).
+        """
+        management = EmergencyManagement(data_dir=data_dir, **options)
+        for zone, coordinates in self.zones.items():
+            management.location_mapping[zone] = coordinates
+        management.spatial_index.set_zones(management.location_mapping)
+        management.resources = {resource.resource_id: resource for resource in self.fleet()}
+        management.incidents = {}
+        total = open_incidents + history
+        share = history / total if total else 0.0
+        for incident in self.incidents(total, resolved_share=share):
+            management.incidents[incident.incident_id] = incident
+        management._rebuild_resource_indexes()
+        management.dispatch_queue.rebuild(management.incidents)
+        management.allocator.rebuild()
+        return management
@@ -94,6 +94,25 @@ class TestIncident(unittest.TestCase):
         self.assertEqual(incident.created_at, self.created_at)
         self.assertEqual(incident.updated_at, self.updated_at)
 
+    def test_from_trusted_dict(self):
+        """Test that the trusted path builds the same incident as from_dict, and still rejects bad enum names."""
+        data = self.incident.to_dict()
+        trusted = Incident.from_trusted_dict(data)
+        self.assertEqual(trusted.to_dict(), Incident.from_dict(data).to_dict())
+        self.assertIsNot(trusted.required_resources, data["required_resources"])
+        self.assertIs(trusted.location, self.incident.location)
+        with self.assertRaises(KeyError):
+            Incident.from_trusted_dict(dict(data, priority="URGENT"))
+        with self.assertRaises(ValueError):
+            Incident(self.location, self.emergency_type, "HIGH", self.required_resources)  # Strict path unchanged
+
+    def test_slotted_and_interned(self):
+        """Test that incidents carry no per-instance dict and share repeated strings."""
+        self.assertFalse(hasattr(self.incident, "__dict__"))
+        other = Incident.from_dict(self.incident.to_dict())
+        self.assertIs(other.location, self.incident.location)
+        self.assertIs(other.required_resources[0], self.incident.required_resources[0])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -53,5 +53,18 @@ class TestResource(unittest.TestCase):
         self.assertEqual(resource.status, ResourceStatus.AVAILABLE)
         self.assertIsNone(resource.assigned_incident_id)
 
+    def test_resource_from_trusted_dict(self):
+        """Test that the trusted path builds the same resource as from_dict."""
+        data = self.resource2.to_dict()
+        self.assertEqual(Resource.from_trusted_dict(data).to_dict(), Resource.from_dict(data).to_dict())
+        self.assertIs(Resource.from_trusted_dict(data).resource_type, self.resource2.resource_type)
+
+    def test_resource_is_slotted(self):
+        """Test that resources carry no per-instance dict and share type strings."""
+        self.assertFalse(hasattr(self.resource1, "__dict__"))
+        copy = Resource.from_dict(self.resource1.to_dict())
+        self.assertIs(copy.resource_type, self.resource1.resource_type)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.service import DispatchClient, DispatchService
+from app.utils.emerg_management import EmergencyManagement
+
+
+class TestDispatchService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a service on an ephemeral port over a temporary data directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True)
+        self.service = DispatchService(self.management)
+        self.port = await self.service.start(port=0)
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        with redirect_stdout(StringIO()):
+            await self.service.stop()
+        self.tmp_dir.cleanup()
+
+    async def _client(self):
+        client = await DispatchClient(port=self.port).connect()
+        self.clients.append(client)
+        return client
+
+    async def test_add_and_update_incident(self):
+        """Test the incident operations round-trip through the socket."""
+        client = await self._client()
+        incident_id = await client.request(
+            "add_incident", location="Zone 1", emergency_type="fire", priority="HIGH", required_resources=["Fire Truck"]
+        )
+        active = await client.request("active_incidents")
+        self.assertEqual([incident["incident_id"] for incident in active], [incident_id])
+        self.assertEqual(len(active[0]["assigned_resources"]), 1)
+
+        self.assertTrue(await client.request("update_incident", incident_id=incident_id, status="RESOLVED"))
+        self.assertEqual(await client.request("active_incidents"), [])
+        report = await client.request("report", start=0, count=10)
+        self.assertEqual(report[0]["status"], "RESOLVED")
+
+    async def test_errors_are_reported_per_request(self):
+        """Test that a bad request fails alone and the connection stays usable."""
+        client = await self._client()
+        with self.assertRaisesRegex(RuntimeError, "Unknown priority: URGENT"):
+            await client.request("add_incident", location="Zone 1", emergency_type="fire",
+                                 priority="URGENT", required_resources=[])
+        with self.assertRaisesRegex(RuntimeError, "Unknown operation"):
+            await client.request("drop_tables")
+        resources = await client.request("resources", resource_type="Ambulance")
+        self.assertEqual(len(resources), 1)
+
+    async def test_concurrent_consoles_share_state(self):
+        """Test that many consoles pipelining writes leave one consistent state."""
+        consoles = [await self._client() for _ in range(8)]
+
+        async def console(client, index):
+            return await asyncio.gather(*[
+                client.request("add_incident", location=f"Zone {1 + (index + n) % 3}", emergency_type="medical",
+                               priority=["HIGH", "MEDIUM", "LOW"][n % 3], required_resources=["Ambulance"])
+                for n in range(25)
+            ])
+
+        results = await asyncio.gather(*[console(client, index) for index, client in enumerate(consoles)])
+        incident_ids = {incident_id for ids in results for incident_id in ids}
+        self.assertEqual(len(incident_ids), 200)
+        self.assertEqual(len(self.management.incidents), 200)
+        # The single ambulance ended up with exactly one incident, and a HIGH one at that
+        holders = [incident for incident in self.management.incidents.values() if incident.assigned_resources]
+        self.assertEqual(len(holders), 1)
+        self.assertEqual(holders[0].priority.name, "HIGH")
+        self.assertTrue(self.management.resource_index.is_consistent(self.management.resources))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import random
+import tempfile
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestIncrementalAllocator(unittest.TestCase):
+    def setUp(self):
+        """Set up an empty system with a small fleet."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        self.management.resources = {}
+        self.management._rebuild_resource_indexes()
+        self.management.allocator.rebuild()
+        for index in range(2):
+            self._add_resource(f"Ambulance {index}", "Ambulance")
+        self._add_resource("Fire Truck 0", "Fire Truck")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _add_resource(self, name, resource_type):
+        resource = Resource(name=name, resource_type=resource_type, location="Zone 1")
+        self.management.add_resource(resource.resource_id, resource)
+        return resource.resource_id
+
+    def _assigned_types(self):
+        """Per-incident multiset of assigned resource types."""
+        resources = self.management.resources
+        return {
+            incident_id: Counter(resources[res_id].resource_type for res_id in incident.assigned_resources)
+            for incident_id, incident in self.management.incidents.items()
+        }
+
+    def _assert_matches_full_pass(self):
+        incremental = self._assigned_types()
+        with redirect_stdout(StringIO()):
+            self.management.process_resource_allocation()
+        self.assertEqual(incremental, self._assigned_types())
+
+    def test_allocates_available_resource(self):
+        """Test that a new incident gets an available resource of the required type."""
+        incident_id = self.management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"])
+        assigned = self.management.incidents[incident_id].assigned_resources
+        self.assertEqual(len(assigned), 1)
+        self.assertEqual(self.management.resources[assigned[0]].status, ResourceStatus.ASSIGNED)
+
+    def test_high_priority_preempts_low(self):
+        """Test that a HIGH incident takes a unit from the least urgent incident."""
+        low_1 = self.management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"])
+        low_2 = self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        held_by_first = list(self.management.incidents[low_1].assigned_resources)
+        high = self.management.add_incident("Zone 3", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(len(self.management.incidents[high].assigned_resources), 1)
+        self.assertEqual(self.management.incidents[low_2].assigned_resources, [])
+        # The earlier LOW incident keeps its crew on scene
+        self.assertEqual(self.management.incidents[low_1].assigned_resources, held_by_first)
+
+    def test_resolving_incident_frees_units_for_waiting(self):
+        """Test that resolving an incident hands its units to the next waiting incident."""
+        first = self.management.add_incident("Zone 1", "fire", Priority.MEDIUM, ["Fire Truck"])
+        second = self.management.add_incident("Zone 2", "fire", Priority.LOW, ["Fire Truck"])
+        self.assertEqual(self.management.incidents[second].assigned_resources, [])
+        self.management.update_incident(first, status=IncidentStatus.RESOLVED)
+        self.assertEqual(self.management.incidents[first].assigned_resources, [])
+        self.assertEqual(len(self.management.incidents[second].assigned_resources), 1)
+
+    def test_priority_drop_yields_to_waiting(self):
+        """Test that lowering an incident's priority lets a more urgent waiting incident take over."""
+        first = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        second = self.management.add_incident("Zone 2", "fire", Priority.MEDIUM, ["Fire Truck"])
+        self.management.update_incident(first, priority=Priority.LOW)
+        self.assertEqual(self.management.incidents[first].assigned_resources, [])
+        self.assertEqual(len(self.management.incidents[second].assigned_resources), 1)
+
+    def test_new_resource_goes_to_waiting_incident(self):
+        """Test that adding a resource serves the most urgent waiting incident."""
+        low = self.management.add_incident("Zone 1", "police", Priority.LOW, ["Police Car"])
+        high = self.management.add_incident("Zone 2", "police", Priority.HIGH, ["Police Car"])
+        self._add_resource("Police Car 0", "Police Car")
+        self.assertEqual(self.management.incidents[low].assigned_resources, [])
+        self.assertEqual(len(self.management.incidents[high].assigned_resources), 1)
+
+    def test_manual_reallocation_is_held(self):
+        """Test that a unit moved by hand stays where it was put, through later changes and full passes."""
+        self._add_resource("Police Car 0", "Police Car")
+        high = self.management.add_incident("Zone 1", "police", Priority.HIGH, ["Police Car"])
+        low = self.management.add_incident("Zone 2", "police", Priority.LOW, ["Police Car"])
+        unit = self.management.incidents[high].assigned_resources[0]
+        self.assertTrue(self.management.reallocate_resource(low, unit))
+        self.assertEqual(self.management.incidents[low].assigned_resources, [unit])
+        self.assertEqual(self.management.incidents[high].assigned_resources, [])
+        later = self.management.add_incident("Zone 3", "police", Priority.HIGH, ["Police Car"])
+        self.assertEqual(self.management.incidents[later].assigned_resources, [])  # No preempting a manual hold
+        second = self._add_resource("Police Car 1", "Police Car")
+        self.assertEqual(self.management.incidents[high].assigned_resources, [second])  # The waiting incident is served
+        self._assert_matches_full_pass()
+        self.assertEqual(self.management.incidents[low].assigned_resources, [unit])
+
+    def test_manual_allocation_is_held(self):
+        """Test that a unit allocated by hand counts towards the incident's demand and frees its automatic one."""
+        low = self.management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"])
+        automatic = self.management.incidents[low].assigned_resources[0]
+        spare = self._add_resource("Ambulance 2", "Ambulance")
+        self.assertTrue(self.management.allocate_resource(low, spare))
+        self.assertEqual(self.management.incidents[low].assigned_resources, [spare])
+        self.assertEqual(self.management.resources[automatic].status, ResourceStatus.AVAILABLE)
+        self._assert_matches_full_pass()
+
+    def test_release_reports_whether_the_unit_was_freed(self):
+        """Test that release_resource fails, changing nothing, when the incident still needs the unit."""
+        self._add_resource("Police Car 0", "Police Car")
+        high = self.management.add_incident("Zone 1", "police", Priority.HIGH, ["Police Car"])
+        unit = self.management.incidents[high].assigned_resources[0]
+        self.assertFalse(self.management.release_resource(unit))  # The allocator would send it straight back
+        self.assertEqual(self.management.incidents[high].assigned_resources, [unit])
+
+        other = self.management.add_incident("Zone 2", "fire", Priority.LOW, ["Fire Truck"])
+        truck = self.management.incidents[other].assigned_resources[0]
+        self.assertFalse(self.management.allocate_resource(high, truck))  # Not available
+        self.management.update_incident(other, required_resources=["Ambulance"])
+        self.assertTrue(self.management.allocate_resource(high, truck))  # A manual hold it does not require
+        self.assertTrue(self.management.release_resource(truck))
+        self.assertEqual(self.management.incidents[high].assigned_resources, [unit])
+        self._assert_matches_full_pass()
+
+    def test_manual_operations_match_full_pass(self):
+        """Test that a random mix of manual and incremental operations gives the result of a fresh full pass."""
+        rng = random.Random(11)
+        types = ["Ambulance", "Fire Truck", "Police Car"]
+        for index in range(4):
+            self._add_resource(f"Extra {index}", rng.choice(types))
+        for step in range(200):
+            resource_ids = list(self.management.resources)
+            action = rng.random()
+            if action < 0.4 or not self.management.incidents:
+                required = [rng.choice(types) for _ in range(rng.randint(1, 2))]
+                self.management.add_incident("Zone 1", "mixed", rng.choice(list(Priority)), required)
+            elif action < 0.6:
+                self.management.release_resource(rng.choice(resource_ids))
+            elif action < 0.8:
+                holders = [incident_id for incident_id, incident in self.management.incidents.items()
+                           if incident.status in (IncidentStatus.OPEN, IncidentStatus.IN_PROGRESS)]
+                if holders:  # Move a unit to an incident that requires its type
+                    incident_id = rng.choice(holders)
+                    wanted = set(self.management.incidents[incident_id].required_resources)
+                    candidates = [resource_id for resource_id in resource_ids
+                                  if self.management.resources[resource_id].resource_type in wanted]
+                    if candidates:
+                        self.management.reallocate_resource(incident_id, rng.choice(candidates))
+            else:
+                incident_id = rng.choice(list(self.management.incidents))
+                self.management.update_incident(incident_id, status=rng.choice(list(IncidentStatus)))
+            if step % 20 == 0:
+                self._assert_matches_full_pass()
+        self._assert_matches_full_pass()
+
+    def test_random_workload_matches_full_pass(self):
+        """Test that incremental allocation gives the same result as a full pass."""
+        rng = random.Random(7)
+        types = ["Ambulance", "Fire Truck", "Police Car"]
+        for index in range(6):
+            self._add_resource(f"Extra {index}", rng.choice(types))
+        for step in range(300):
+            if self.management.incidents and rng.random() < 0.5:
+                incident_id = rng.choice(list(self.management.incidents))
+                change = rng.choice(["priority", "status", "required"])
+                if change == "priority":
+                    self.management.update_incident(incident_id, priority=rng.choice(list(Priority)))
+                elif change == "status":
+                    self.management.update_incident(incident_id, status=rng.choice(list(IncidentStatus)))
+                else:
+                    required = [rng.choice(types) for _ in range(rng.randint(1, 3))]
+                    self.management.update_incident(incident_id, required_resources=required)
+            else:
+                required = [rng.choice(types) for _ in range(rng.randint(1, 3))]
+                self.management.add_incident("Zone 1", "mixed", rng.choice(list(Priority)), required)
+            self.assertTrue(self.management.resource_index.is_consistent(self.management.resources))
+            if step % 25 == 0:
+                self._assert_matches_full_pass()
+        self._assert_matches_full_pass()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import math
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils import allocation_engine
+from app.utils.allocation_engine import MinCostAllocationEngine, min_cost_transport
+from app.utils.emerg_management import EmergencyManagement
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+from app.utils.utils import calculate_distance
+
+
+class TestMinCostTransport(unittest.TestCase):
+    def _solve_both(self, *args):
+        """Solves with the NumPy path (when installed) and the pure-Python path."""
+        numpy_module, allocation_engine.np = allocation_engine.np, None
+        try:
+            python_flows = min_cost_transport(*args)
+        finally:
+            allocation_engine.np = numpy_module
+        return min_cost_transport(*args), python_flows
+
+    def test_minimizes_total_cost(self):
+        """Test that a unit goes where it saves the most overall, not to the first taker."""
+        # Demand 0 is cheap from both sources; demand 1 only from source 0
+        for flows in self._solve_both([1, 1], [1, 1], [[1.0, 2.0], [1.0, 50.0]], [1, 1]):
+            self.assertEqual(flows, {(0, 1): 1, (1, 0): 1})
+
+    def test_urgent_tier_is_served_first(self):
+        """Test that a more urgent demand wins however far away it is."""
+        for flows in self._solve_both([1, 1], [1], [[0.0], [500.0]], [2, 0]):
+            self.assertEqual(flows, {(1, 0): 1})
+
+    def test_urgency_within_a_tier(self):
+        """Test that within a tier the more urgent demand wins a farther unit, but a better tier still comes first."""
+        for flows in self._solve_both([1, 1], [1], [[40.0], [0.0]], [0, 0], math.inf, [0.0, 5.0]):
+            self.assertEqual(flows, {(0, 0): 1})
+        for flows in self._solve_both([1, 1], [1], [[0.0], [40.0]], [1, 0], math.inf, [0.0, 5.0]):
+            self.assertEqual(flows, {(1, 0): 1})
+
+    def test_capacities(self):
+        """Test that no node sends or receives more than its capacity."""
+        demand, supply = [3, 2, 4], [2, 5]
+        costs = [[1.0, 4.0], [2.0, 2.0], [5.0, 1.0]]
+        for flows in self._solve_both(demand, supply, costs, [0, 1, 1]):
+            self.assertEqual(sum(flows.values()), 7)
+            for i, wanted in enumerate(demand):
+                self.assertLessEqual(sum(a for (x, _), a in flows.items() if x == i), wanted)
+            for j, available in enumerate(supply):
+                self.assertEqual(sum(a for (_, y), a in flows.items() if y == j), available)
+            self.assertEqual(sum(a for (x, _), a in flows.items() if x == 0), 3)  # Most urgent fully served
+
+
+class TestMinCostAllocationEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up a system with no resources."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, proximity_dispatch=True)
+        self.management.resources = {}
+        self.management._rebuild_resource_indexes()
+        self.management.allocator.rebuild()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _add_resource(self, location):
+        resource = Resource(name=f"Ambulance in {location}", resource_type="Ambulance", location=location)
+        self.management.add_resource(resource.resource_id, resource)
+        return resource.resource_id
+
+    def _total_distance(self):
+        mapping = self.management.location_mapping
+        return sum(
+            calculate_distance(mapping[incident.location], mapping[self.management.resources[resource_id].location])
+            for incident in self.management.incidents.values()
+            for resource_id in incident.assigned_resources
+        )
+
+    def _process(self):
+        with redirect_stdout(StringIO()):
+            self.management.process_resource_allocation()
+
+    def test_beats_nearest_first(self):
+        """Test that the earlier incident does not take the unit the later one is standing next to."""
+        self._add_resource("Zone 2")
+        zone_1_unit = self._add_resource("Zone 1")
+        earlier = self.management.add_incident("Zone 3", "medical", Priority.MEDIUM, ["Ambulance"])
+        later = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        self._process()
+        greedy_distance = self._total_distance()
+
+        self.management.allocation_engine = MinCostAllocationEngine()
+        self._process()
+        self.assertFalse(self.management.allocation_engine.fell_back)
+        self.assertEqual(self.management.incidents[earlier].assigned_resources, [zone_1_unit])
+        self.assertEqual(len(self.management.incidents[later].assigned_resources), 1)
+        self.assertLess(self._total_distance(), greedy_distance)
+
+    def test_priority_outweighs_distance(self):
+        """Test that a HIGH incident far away still gets the only unit over a LOW one next to it."""
+        unit = self._add_resource("Zone 2")
+        low = self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        high = self.management.add_incident("Zone 1", "medical", Priority.HIGH, ["Ambulance"])
+        self.management.allocation_engine = MinCostAllocationEngine()
+        self._process()
+        self.assertEqual(self.management.incidents[high].assigned_resources, [unit])
+        self.assertEqual(self.management.incidents[low].assigned_resources, [])
+
+    def test_falls_back_to_greedy_when_out_of_time(self):
+        """Test that an exhausted budget still produces a complete allocation."""
+        for zone in ("Zone 1", "Zone 2"):
+            self._add_resource(zone)
+        for zone in ("Zone 3", "Zone 2"):
+            self.management.add_incident(zone, "medical", Priority.MEDIUM, ["Ambulance"])
+        self.management.allocation_engine = MinCostAllocationEngine(time_budget=-1.0)
+        self._process()
+        self.assertTrue(self.management.allocation_engine.fell_back)
+        for incident in self.management.incidents.values():
+            self.assertEqual(len(incident.assigned_resources), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import uuid
+from datetime import datetime
+from benchmarks.columnar import IncidentColumns
+from app.utils.storage import LazyIncidents
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestIncidentColumns(unittest.TestCase):
+    def setUp(self):
+        """Set up a store with a mix of ULID, UUID and custom incident IDs."""
+        self.incidents = [
+            Incident(location="Zone 1", emergency_type="fire", priority=Priority.HIGH,
+                     required_resources=["Fire Truck", "Ambulance"], status=IncidentStatus.CLOSED,
+                     assigned_resources=["r-1"], created_at=datetime(2024, 3, 31, 2, 30, 0, 123456)),
+            Incident(location="Zone 2", emergency_type="medical", priority=Priority.LOW,
+                     required_resources=[], status=IncidentStatus.RESOLVED, incident_id="legacy-7"),
+            Incident(location="Zone 1", emergency_type="fire", priority=Priority.MEDIUM,
+                     required_resources=["Ambulance"], status=IncidentStatus.OPEN),
+            Incident(location="Zone 3", emergency_type="flood", priority=Priority.LOW,
+                     required_resources=[], status=IncidentStatus.OPEN, incident_id=str(uuid.uuid4())),
+        ]
+        self.columns = IncidentColumns(self.incidents)
+
+    def test_records_round_trip(self):
+        """Test that every record comes back exactly as to_dict produced it."""
+        self.assertEqual(len(self.columns), 4)
+        for incident in self.incidents:
+            self.assertEqual(self.columns.get(incident.incident_id), incident.to_dict())
+        self.assertEqual(list(self.columns.ids()), [incident.incident_id for incident in self.incidents])
+        self.assertEqual(dict(self.columns.records()),
+                         {incident.incident_id: incident.to_dict() for incident in self.incidents})
+        self.assertIsNone(self.columns.get("missing"))
+
+    def test_append_record_and_duplicates(self):
+        """Test appending in the to_dict format and rejecting a stored ID."""
+        record = self.incidents[0].to_dict()
+        with self.assertRaises(ValueError):
+            self.columns.append_record(record)
+        record["incident_id"] = "new"
+        self.columns.append_record(record)
+        self.assertEqual(self.columns.incident("new").assigned_resources, ["r-1"])
+
+    def test_set_status(self):
+        """Test changing a status in place and counting by status."""
+        incident_id = self.incidents[2].incident_id
+        self.columns.set_status(incident_id, IncidentStatus.CLOSED)
+        self.assertEqual(self.columns.incident(incident_id).status, IncidentStatus.CLOSED)
+        self.assertEqual(self.columns.count_by_status(),
+                         {IncidentStatus.CLOSED: 2, IncidentStatus.RESOLVED: 1, IncidentStatus.OPEN: 1})
+        with self.assertRaises(KeyError):
+            self.columns.set_status("missing", IncidentStatus.CLOSED)
+
+    def test_backs_lazy_incidents(self):
+        """Test that the store can serve as the history behind a LazyIncidents mapping."""
+        incidents = LazyIncidents(self.columns)
+        self.assertIn("legacy-7", incidents)
+        self.assertEqual(len(incidents), 4)
+        self.assertEqual(incidents["legacy-7"].status, IncidentStatus.RESOLVED)
+        self.assertEqual(list(incidents.resident), ["legacy-7"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from app.utils.creation_index import CreationIndex
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+START = datetime(2024, 5, 1, 8, 0)
+
+
+def _incident(incident_id, minutes):
+    return Incident("Zone 1", "fire", Priority.LOW, [], incident_id=incident_id,
+                    created_at=START + timedelta(minutes=minutes))
+
+
+class TestCreationIndex(unittest.TestCase):
+    def test_ranges_match_a_sort(self):
+        """Test that range scans and latest() match filtering a sorted list, with out-of-order arrivals."""
+        rng = random.Random(5)
+        minutes = [index + rng.choice([0, 0, 0, -30, 0.5]) for index in range(300)]
+        incidents = [(f"i{index}", _incident(f"i{index}", minute)) for index, minute in enumerate(minutes)]
+        index = CreationIndex()
+        index.rebuild(incidents[:100])
+        for incident_id, incident in incidents[100:]:
+            index.add(incident_id, incident.created_at)
+        expected = [incident_id for incident_id, incident in sorted(incidents, key=lambda item: item[1].created_at)]
+        self.assertEqual(index.between(), expected)
+        self.assertEqual(index.latest(5), expected[::-1][:5])
+        self.assertEqual(index.latest(1_000), expected[::-1])
+        self.assertEqual(index.latest(0), [])
+        since, until = START + timedelta(minutes=40), START + timedelta(minutes=120)
+        self.assertEqual(index.between(since, until),
+                         [incident_id for incident_id in expected
+                          if since <= dict(incidents)[incident_id].created_at < until])
+        self.assertEqual(len(index), 300)
+
+    def test_ties_keep_arrival_order(self):
+        index = CreationIndex()
+        index.rebuild([("b", _incident("b", 1)), ("a", _incident("a", 1))])
+        index.add("c", START + timedelta(minutes=1))
+        index.add("z", START)
+        self.assertEqual(index.between(), ["z", "b", "a", "c"])
+        self.assertEqual(index.between(after=(START + timedelta(minutes=1), "b")), ["a", "c"])
+        self.assertEqual(index.between(until=START + timedelta(minutes=1), after=(START, "z")), [])
+        self.assertEqual(index.between(after=(START + timedelta(minutes=1), "missing")), [])
+
+
+class TestRangeQueries(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _fill(self, management):
+        ids = [management.add_incident("Zone 1", "medical", Priority.MEDIUM, ["Ambulance"]) for _ in range(12)]
+        for incident_id in ids[:8]:
+            management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+        return ids
+
+    def test_range_scans_in_memory_and_from_mapped_history(self):
+        """Test range scans before and after a restart into lazily mapped storage, and that new incidents join."""
+        management = EmergencyManagement(data_dir=self.tmp_dir.name, snapshot_extension=".bin")
+        ids = self._fill(management)
+        self.assertEqual(ids, sorted(ids))  # Time-ordered IDs
+        created = {incident_id: management.incidents[incident_id].created_at for incident_id in ids}
+        self.assertEqual([incident.incident_id for incident in management.recent_incidents(3)], ids[:-4:-1])
+        latest = management.add_incident("Zone 2", "fire", Priority.HIGH, ["Fire Truck"])
+        self.assertEqual(management.recent_incidents(1)[0].incident_id, latest)
+        management.save_data()
+        management.close()
+
+        lazy = EmergencyManagement(data_dir=self.tmp_dir.name, snapshot_extension=".bin", lazy_load=True)
+        try:
+            between = lazy.incidents_created_between(created[ids[2]], created[ids[6]])
+            self.assertEqual([incident.incident_id for incident in between], ids[2:6])
+            self.assertEqual(between[0].status, IncidentStatus.RESOLVED)
+            self.assertNotIn(ids[2], lazy.incidents.resident)  # History is read, not made resident
+            recent = lazy.incidents_created_between(since=created[ids[10]])
+            self.assertEqual([incident.incident_id for incident in recent], ids[10:] + [latest])
+            newer = lazy.add_incident("Zone 3", "fire", Priority.LOW, ["Police Car"])
+            self.assertEqual([incident.incident_id for incident in lazy.recent_incidents(2)], [newer, latest])
+        finally:
+            lazy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,31 @@
 import unittest
 import os
+import json
+import tempfile
+from datetime import datetime
 from app.utils.data_persistence import (
     save_incidents_to_file,
     load_incidents_from_file,
     save_resources_to_file,
     load_resources_from_file,
+    save_data_to_file,
+    save_records_to_file,
+    load_data_from_file,
+    previous_generation_path,
+    SnapshotCorruptError,
+    SnapshotIndex,
+    LegacySnapshotError,
+    index_snapshot_file,
+    map_snapshot_file,
+    register_serializer,
+    serializer_for,
+    BinarySnapshotSerializer,
+    JsonSnapshotSerializer,
+    SnapshotSerializer,
+    SERIALIZERS,
 )
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.ids import new_id
 from app.incidents.emerg_incident import Incident, IncidentStatus
 from app.resources.emerg_resource import Resource, ResourceStatus
 from app.priorities.emerg_priority import Priority
@@ -77,6 +97,27 @@ class TestDataPersistence(unittest.TestCase):
         self.assertEqual(loaded_resources["Resource1"].status, self.resources["Resource1"].status)
         self.assertEqual(loaded_resources["Resource2"].location, self.resources["Resource2"].location)
 
+    def test_load_records_with_missing_fields(self):
+        """Test that records with missing fields load with from_dict's defaults, not an empty state."""
+        now = datetime.now().isoformat()
+        resource = {"resource_id": "unit-1", "name": "Old Unit", "resource_type": "Ambulance",
+                    "location": "Zone 1", "created_at": now, "updated_at": now}  # Written before status existed
+        incident = {"incident_id": "inc-1", "location": "Zone 1", "emerg_type": "fire", "priority": "HIGH",
+                    "required_resources": ["Fire Truck"], "assigned_resources": None,
+                    "created_at": now, "updated_at": now}
+        with tempfile.TemporaryDirectory() as data_dir:
+            with open(os.path.join(data_dir, "resources.json"), "w") as f:
+                json.dump({"unit-1": resource, "unit-2": dict(resource, resource_id="unit-2", status="RETIRED")}, f)
+            with open(os.path.join(data_dir, "incidents.json"), "w") as f:
+                json.dump({"inc-1": incident}, f)
+            management = EmergencyManagement(data_dir=data_dir)
+            self.assertEqual(set(management.resources), {"unit-1", "unit-2"})  # No default units added
+            self.assertEqual(management.resources["unit-1"].status, ResourceStatus.AVAILABLE)
+            self.assertEqual(management.resources["unit-2"].status, ResourceStatus.AVAILABLE)
+            self.assertEqual(management.incidents["inc-1"].assigned_resources, [])
+            self.assertEqual(management.incidents["inc-1"].status, IncidentStatus.OPEN)
+            management.close()
+
     def tearDown(self):
         """Clean up test files."""
         if os.path.exists(self.incidents_file):
@@ -87,5 +128,293 @@ class TestDataPersistence(unittest.TestCase):
             os.rmdir(self.test_dir)
 
 
+class TestSnapshotSafety(unittest.TestCase):
+    def setUp(self):
+        """Set up a temporary snapshot path."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "incidents.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshot_is_valid_json_after_header(self):
+        """Test that the body after the checksum header is plain JSON."""
+        save_data_to_file({"a": {"x": 1}, "b": {"x": 2}}, self.file_path)
+        with open(self.file_path) as f:
+            header = json.loads(f.readline())
+            body = json.loads(f.read())
+        self.assertEqual(header["records"], 2)
+        self.assertEqual(len(header["sha256"]), 64)
+        self.assertEqual(body, {"a": {"x": 1}, "b": {"x": 2}})
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["incidents.json"])  # No temp file left behind
+
+    def test_previous_generation_is_kept(self):
+        """Test that saving keeps the file it replaces."""
+        save_data_to_file({"a": 1}, self.file_path)
+        save_data_to_file({"b": 2}, self.file_path)
+        self.assertEqual(load_data_from_file(self.file_path), {"b": 2})
+        self.assertEqual(load_data_from_file(previous_generation_path(self.file_path)), {"a": 1})
+
+    def test_corrupt_snapshot_falls_back_to_previous(self):
+        """Test that a torn snapshot is detected by checksum and the previous one is used."""
+        save_data_to_file({"a": 1}, self.file_path)
+        save_data_to_file({"a": 1, "b": 2}, self.file_path)
+        with open(self.file_path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.truncate(f.tell() - 5)  # Simulate a write cut short
+        self.assertEqual(load_data_from_file(self.file_path), {"a": 1})
+
+    def test_missing_snapshot_falls_back_to_previous(self):
+        """Test that a crash between the two renames still loads the previous generation."""
+        save_data_to_file({"a": 1}, self.file_path)
+        os.replace(self.file_path, previous_generation_path(self.file_path))
+        self.assertEqual(load_data_from_file(self.file_path), {"a": 1})
+
+    def test_corruption_without_fallback_raises(self):
+        """Test that a bad checksum with no previous generation is reported."""
+        save_data_to_file({"a": 1}, self.file_path)
+        with open(self.file_path, "r+b") as f:
+            content = f.read()
+            f.seek(0)
+            f.write(content.replace(b'"a": 1', b'"a": 7'))
+        with self.assertRaises(SnapshotCorruptError):
+            load_data_from_file(self.file_path)
+
+    def test_legacy_plain_json(self):
+        """Test that indent=4 files written before snapshot headers still load."""
+        with open(self.file_path, "w") as f:
+            json.dump({"a": {"x": 1}}, f, indent=4)
+        self.assertEqual(load_data_from_file(self.file_path), {"a": {"x": 1}})
+
+    def test_streams_records(self):
+        """Test that records can be written straight from a generator."""
+        save_records_to_file(((str(index), {"n": index}) for index in range(1000)), self.file_path)
+        data = load_data_from_file(self.file_path)
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(data["999"], {"n": 999})
+
+    def test_empty_snapshot(self):
+        """Test that an empty mapping round-trips."""
+        save_data_to_file({}, self.file_path)
+        self.assertEqual(load_data_from_file(self.file_path), {})
+
+
+class TestSnapshotIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a snapshot of incidents with mixed statuses."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "incidents.json")
+        statuses = [IncidentStatus.OPEN, IncidentStatus.RESOLVED, IncidentStatus.CLOSED, IncidentStatus.IN_PROGRESS]
+        self.incidents = {}
+        for index, status in enumerate(statuses):
+            incident = Incident(location=f"Zone {index}", emergency_type='Fire "status": "OPEN"',
+                                priority=Priority.HIGH, required_resources=["Fire Truck"], status=status)
+            self.incidents[incident.incident_id] = incident
+        save_incidents_to_file(self.incidents, self.file_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_offsets_and_resident_ids(self):
+        """Test that records are found by offset and active ones are picked out by status."""
+        index = SnapshotIndex(self.file_path, resident_statuses=("OPEN", "IN_PROGRESS"))
+        ids = list(self.incidents)
+        self.assertEqual(list(index.ids()), ids)
+        self.assertEqual(index.resident_ids, [ids[0], ids[3]])
+        self.assertEqual(index.get(ids[2]), self.incidents[ids[2]].to_dict())
+        self.assertIsNone(index.get("missing"))
+        self.assertTrue(index.contains(ids[1]))
+        self.assertEqual(dict(index.records()), {key: value.to_dict() for key, value in self.incidents.items()})
+        index.close()
+
+    def test_index_survives_later_save(self):
+        """Test that an open index keeps reading the file it was built from."""
+        index = SnapshotIndex(self.file_path)
+        first_id = next(iter(self.incidents))
+        save_data_to_file({}, self.file_path)
+        save_data_to_file({}, self.file_path)  # The indexed file is now unlinked
+        self.assertEqual(index.get(first_id)["incident_id"], first_id)
+        index.close()
+
+    def test_corrupt_snapshot_falls_back_to_previous(self):
+        """Test that indexing verifies the checksum and uses the previous generation."""
+        save_incidents_to_file(self.incidents, self.file_path)
+        with open(self.file_path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.truncate(f.tell() - 5)
+        index = index_snapshot_file(self.file_path)
+        self.assertEqual(index.file_path, previous_generation_path(self.file_path))
+        self.assertEqual(len(index), 4)
+        index.close()
+
+    def test_missing_and_legacy_files(self):
+        """Test that a missing file gives no index and a headerless file is reported."""
+        self.assertIsNone(index_snapshot_file(os.path.join(self.tmp_dir.name, "missing.json")))
+        with open(self.file_path, "w") as f:
+            json.dump({"a": {"x": 1}}, f, indent=4)
+        with self.assertRaises(LegacySnapshotError):
+            SnapshotIndex(self.file_path)
+
+
+class TestBinarySnapshots(unittest.TestCase):
+    def setUp(self):
+        """Set up incidents and resources covering every enum member and unusual IDs and keys."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.incidents = {}
+        for index, status in enumerate(IncidentStatus):
+            incident = Incident(location=f"Zone {index % 2}", emergency_type="Fire", priority=list(Priority)[index % 3],
+                                required_resources=["Fire Truck", "Ambulance"] * index, status=status,
+                                assigned_resources=["unit-é", "00000000-0000-0000-0000-00000000000A", new_id()][:index],
+                                created_at=datetime(1969, 7, 20, 20, 17, 40, 123456))
+            self.incidents[incident.incident_id] = incident
+        custom = Incident(location="Zone 1", emergency_type="Flood", priority=Priority.LOW, required_resources=[],
+                          incident_id="feed-1")
+        self.incidents["feed-1"] = custom
+        self.incidents["other key"] = Incident(location="Zone 1", emergency_type="Flood", priority=Priority.LOW,
+                                               required_resources=["Rescue Team"])
+        self.resources = {}
+        for index, status in enumerate(ResourceStatus):
+            resource = Resource(name=f"Unit {index}", resource_type="Ambulance", location="Zone 1", status=status,
+                                assigned_incident_id="feed-1" if status == ResourceStatus.ASSIGNED else None)
+            self.resources[resource.resource_id] = resource
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_round_trip_matches_json(self):
+        """Test that the binary format loads exactly what the JSON format does, keys and order included."""
+        for name, records, save, load in (
+            ("incidents", self.incidents, save_incidents_to_file, load_incidents_from_file),
+            ("resources", self.resources, save_resources_to_file, load_resources_from_file),
+        ):
+            save(records, self._path(f"{name}.json"))
+            save(records, self._path(f"{name}.bin"))
+            from_json, from_binary = load(self._path(f"{name}.json")), load(self._path(f"{name}.bin"))
+            self.assertEqual(list(from_binary), list(records))
+            self.assertEqual({key: value.to_dict() for key, value in from_binary.items()},
+                             {key: value.to_dict() for key, value in from_json.items()})
+        self.assertLess(os.path.getsize(self._path("incidents.bin")), os.path.getsize(self._path("incidents.json")) / 3)
+
+    def test_format_is_picked_by_extension(self):
+        self.assertIsInstance(serializer_for("data/incidents.bin"), BinarySnapshotSerializer)
+        self.assertIsInstance(serializer_for("data/incidents.JSON"), JsonSnapshotSerializer)
+        self.assertIsInstance(serializer_for("data/incidents"), JsonSnapshotSerializer)  # The original format
+        register_serializer(".snap", BinarySnapshotSerializer())
+        try:
+            save_incidents_to_file(self.incidents, self._path("incidents.snap"))
+            with open(self._path("incidents.snap"), "rb") as f:
+                self.assertEqual(f.read(4), b"EMSB")
+        finally:
+            del SERIALIZERS[".snap"]
+
+    def test_serializers_must_implement_the_format(self):
+        """Test that a format missing a save or load method cannot be created, and that lazy loading is optional."""
+        class WriteOnly(SnapshotSerializer):
+            def save_incidents(self, incidents, file_path):
+                pass
+
+        with self.assertRaises(TypeError):
+            WriteOnly()
+
+        class Eager(WriteOnly):
+            load_incidents = save_resources = load_resources = WriteOnly.save_incidents
+
+        with self.assertRaises(LegacySnapshotError):
+            Eager().index_incidents(self._path("incidents.eager"))
+        with self.assertRaises(LegacySnapshotError):
+            Eager().incident_from_record({})
+
+    def test_corruption_falls_back_to_previous(self):
+        """Test that a torn or mismatched binary snapshot is detected and the previous generation used."""
+        path = self._path("incidents.bin")
+        first = dict(list(self.incidents.items())[:2])
+        save_incidents_to_file(first, path)
+        save_incidents_to_file(self.incidents, path)
+        with open(path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.truncate(f.tell() - 3)
+        self.assertEqual(list(load_incidents_from_file(path)), list(first))
+        os.remove(previous_generation_path(path))
+        with self.assertRaises(SnapshotCorruptError):
+            load_incidents_from_file(path)
+        save_resources_to_file(self.resources, path)  # A resources file where incidents are expected
+        os.remove(previous_generation_path(path))
+        with self.assertRaises(SnapshotCorruptError):
+            load_incidents_from_file(path)
+
+    def test_storage_with_binary_snapshots(self):
+        """Test that a system saves binary snapshots and replays its journal on top of them."""
+        management = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, snapshot_extension=".bin")
+        first = management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        management.save_data()
+        second = management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        management.update_incident(first, status=IncidentStatus.RESOLVED)
+        expected = {incident_id: incident.to_dict() for incident_id, incident in management.incidents.items()}
+        management.close()
+        self.assertTrue(os.path.exists(self._path("incidents.bin")))
+        self.assertFalse(os.path.exists(self._path("incidents.json")))
+
+        reopened = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, snapshot_extension=".bin")
+        self.assertEqual({incident_id: incident.to_dict() for incident_id, incident in reopened.incidents.items()},
+                         expected)
+        self.assertEqual(list(reopened.incidents), [first, second])
+        reopened.close()
+        with self.assertRaises(ValueError):
+            EmergencyManagement(data_dir=self.tmp_dir.name, snapshot_extension=".xml")
+
+    def test_mapped_snapshot(self):
+        """Test that a mapped snapshot finds every record by key and lists the resident statuses."""
+        path = self._path("incidents.bin")
+        save_incidents_to_file(self.incidents, path)
+        mapped = map_snapshot_file(path, "incidents", ["OPEN", "IN_PROGRESS"])
+        try:
+            self.assertEqual(len(mapped), len(self.incidents))
+            self.assertEqual(list(mapped.ids()), list(self.incidents))
+            for key, incident in self.incidents.items():
+                self.assertTrue(mapped.contains(key))
+                self.assertEqual(mapped.get(key).to_dict(), incident.to_dict())
+            self.assertEqual([key for key, incident in mapped.records()], list(self.incidents))
+            self.assertIsNone(mapped.get("missing"))
+            self.assertEqual(sorted(mapped.resident_ids),
+                             sorted(key for key, incident in self.incidents.items()
+                                    if incident.status in (IncidentStatus.OPEN, IncidentStatus.IN_PROGRESS)))
+        finally:
+            mapped.close()
+        self.assertIsNone(map_snapshot_file(self._path("missing.bin")))
+        save_incidents_to_file({}, path)
+        empty = map_snapshot_file(path)
+        self.assertEqual((len(empty), empty.get("feed-1")), (0, None))
+        empty.close()
+
+    def test_lazy_storage_maps_binary_snapshot(self):
+        """Test that lazy loading of a binary snapshot matches an eager load, journal included."""
+        management = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, snapshot_extension=".bin")
+        ids = [management.add_incident(f"Zone {index % 3 + 1}", "fire", Priority.HIGH, ["Fire Truck"])
+               for index in range(6)]
+        for incident_id in ids[:4]:
+            management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+        management.save_data()
+        management.update_incident(ids[4], status=IncidentStatus.RESOLVED)  # Journaled only
+        expected = {incident_id: incident.to_dict() for incident_id, incident in management.incidents.items()}
+        management.close()
+
+        lazy = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, snapshot_extension=".bin",
+                                   lazy_load=True)
+        try:
+            self.assertEqual(set(lazy.incidents.resident), {ids[4], ids[5]})
+            self.assertEqual({incident_id: incident.to_dict() for incident_id, incident in lazy.incidents.items()},
+                             expected)
+            self.assertEqual(lazy.incidents[ids[0]].status, IncidentStatus.RESOLVED)
+            lazy.save_data()
+        finally:
+            lazy.close()
+        self.assertEqual({incident_id: incident.to_dict()
+                          for incident_id, incident in load_incidents_from_file(self._path("incidents.bin")).items()},
+                         expected)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime, timedelta
+from app.utils.dispatch_queue import DispatchQueue
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestDispatchQueue(unittest.TestCase):
+    def setUp(self):
+        """Set up incidents created one minute apart."""
+        start = datetime(2025, 1, 1, 12, 0)
+        self.incidents = {
+            "low": Incident("Zone 1", "medical", Priority.LOW, ["Ambulance"], created_at=start),
+            "high": Incident("Zone 2", "fire", Priority.HIGH, ["Fire Truck"],
+                             created_at=start + timedelta(minutes=1)),
+            "medium": Incident("Zone 3", "police", Priority.MEDIUM, ["Police Car"],
+                               created_at=start + timedelta(minutes=2)),
+            "high_later": Incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"],
+                                   created_at=start + timedelta(minutes=3)),
+        }
+        self.queue = DispatchQueue()
+        for incident_id, incident in self.incidents.items():
+            self.queue.push(incident_id, incident)
+
+    def test_orders_by_priority_then_created_at(self):
+        """Test that incidents come out most urgent first, oldest first within a priority."""
+        self.assertEqual(list(self.queue.in_order()), ["high", "high_later", "medium", "low"])
+        self.assertEqual(len(self.queue), 4)  # in_order does not consume the queue
+
+    def test_pop(self):
+        """Test that pop removes the most urgent incident."""
+        self.assertEqual(self.queue.peek(), "high")
+        self.assertEqual(self.queue.pop(), "high")
+        self.assertEqual(self.queue.pop(), "high_later")
+        self.assertNotIn("high", self.queue)
+        self.assertEqual(len(self.queue), 2)
+
+    def test_decrease_key(self):
+        """Test that raising an incident's priority moves it up the queue."""
+        self.incidents["low"].priority = Priority.HIGH
+        self.queue.push("low", self.incidents["low"])
+        self.assertEqual(list(self.queue.in_order()), ["low", "high", "high_later", "medium"])
+        self.assertEqual(len(self.queue), 4)
+
+    def test_resolved_incident_is_dropped(self):
+        """Test that resolving an incident lazily removes it from the queue."""
+        self.incidents["high"].update_status(IncidentStatus.RESOLVED)
+        self.queue.sync("high", self.incidents["high"])
+        self.assertNotIn("high", self.queue)
+        self.assertEqual(self.queue.pop(), "high_later")
+
+    def test_repeated_rekeying_is_compacted(self):
+        """Test that stale entries do not accumulate without bound."""
+        incident = self.incidents["medium"]
+        for index in range(500):
+            incident.priority = Priority.HIGH if index % 2 else Priority.LOW
+            self.queue.push("medium", incident)
+        self.assertEqual(len(self.queue), 4)
+        self.assertLess(len(self.queue._heap), 2 * len(self.queue) + 65)
+
+    def test_rebuild_skips_inactive(self):
+        """Test that rebuilding only queues open and in-progress incidents."""
+        self.incidents["medium"].status = IncidentStatus.CLOSED
+        self.queue.rebuild(self.incidents)
+        self.assertEqual(set(self.queue), {"low", "high", "high_later"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from app.utils.dispatch_queue import DispatchQueue
+from app.utils.dispatch_score import AgingPolicy, StrictPriority
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.allocation_engine import MinCostAllocationEngine
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestAgingPolicy(unittest.TestCase):
+    def setUp(self):
+        """Set up a policy where HIGH has a 30 minute head start over LOW and 20 over MEDIUM."""
+        self.policy = AgingPolicy({Priority.HIGH: 3600, Priority.MEDIUM: 1200, Priority.LOW: 0}, aging_rate=2.0)
+        self.start = datetime(2025, 1, 1, 12, 0)
+
+    def test_key_order_matches_score_order_at_any_time(self):
+        """Test that sorting by the time-free key equals sorting by the score at any later moment."""
+        rng = random.Random(5)
+        incidents = [(rng.choice(list(Priority)), self.start + timedelta(seconds=rng.randrange(7200)))
+                     for _ in range(300)]
+        by_key = sorted(range(len(incidents)), key=lambda index: self.policy.key(*incidents[index]))
+        for later in (7200, 10_000, 86_400):
+            now = self.start.timestamp() + later
+            scores = [self.policy.score(priority, created_at, now) for priority, created_at in incidents]
+            self.assertEqual([round(scores[index], 6) for index in by_key],
+                             sorted((round(score, 6) for score in scores), reverse=True))
+
+    def test_waiting_incident_overtakes_newer_higher_priority(self):
+        """Test that a LOW incident outranks a HIGH one created more than the head start later."""
+        queue = DispatchQueue(self.policy)
+        queue.push("low", Incident("Zone 1", "medical", Priority.LOW, [], created_at=self.start))
+        queue.push("high_soon", Incident("Zone 1", "fire", Priority.HIGH, [],
+                                         created_at=self.start + timedelta(minutes=29)))
+        queue.push("high_late", Incident("Zone 1", "fire", Priority.HIGH, [],
+                                         created_at=self.start + timedelta(minutes=31)))
+        queue.push("medium", Incident("Zone 1", "police", Priority.MEDIUM, [],
+                                      created_at=self.start + timedelta(minutes=5)))
+        self.assertEqual(list(queue.in_order()), ["medium", "high_soon", "low", "high_late"])
+        self.assertEqual({rank[0] for _, rank in queue.ranked()}, {0})
+
+    def test_default_is_strict_priority(self):
+        self.assertIsInstance(DispatchQueue().policy, StrictPriority)
+        self.assertEqual(StrictPriority().key(Priority.LOW, self.start), (2, self.start.timestamp()))
+        self.assertEqual(AgingPolicy().score(Priority.HIGH, self.start, self.start.timestamp() + 60), 1860.0)
+
+    def test_invalid_policies(self):
+        with self.assertRaises(ValueError):
+            AgingPolicy({Priority.HIGH: 10, Priority.LOW: 0})
+        with self.assertRaises(ValueError):
+            AgingPolicy({Priority.HIGH: float("inf"), Priority.MEDIUM: 1, Priority.LOW: 0})
+        for rate in (0, -1, float("nan")):
+            with self.assertRaises(ValueError):
+                AgingPolicy(aging_rate=rate)
+
+
+class TestAgingDispatch(unittest.TestCase):
+    def setUp(self):
+        """Set up a saved history with one ambulance, a LOW incident an hour old and a new HIGH one."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        self.low = management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        self.high = management.add_incident("Zone 2", "medical", Priority.HIGH, ["Ambulance"])
+        management.incidents[self.low].created_at -= timedelta(hours=1)
+        management.save_data()
+        management.close()
+        self.management = None
+
+    def tearDown(self):
+        if self.management is not None:
+            self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _holder(self):
+        return [incident_id for incident_id in (self.low, self.high)
+                if self.management.incidents[incident_id].assigned_resources]
+
+    def test_strict_priority_serves_high(self):
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        self.management.process_resource_allocation()
+        self.assertEqual(self._holder(), [self.high])
+
+    def test_aging_serves_the_long_waiting_incident(self):
+        """Test that full and incremental allocation both follow the aged order."""
+        for engine in (None, MinCostAllocationEngine()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, dispatch_policy=AgingPolicy(),
+                                                  allocation_engine=engine)
+            self.management.process_resource_allocation()
+            self.assertEqual(self._holder(), [self.low])
+
+            newer = self.management.add_incident("Zone 2", "medical", Priority.HIGH, ["Ambulance"])
+            self.assertEqual(self._holder(), [self.low])  # No preemption: the LOW incident has waited longer
+            self.management.update_incident(self.low, status=IncidentStatus.RESOLVED)
+            self.assertEqual(self._holder(), [self.high])
+            self.assertEqual(self.management.incidents[newer].assigned_resources, [])
+            self.management.close()
+            self.management = None
+
+    def test_min_cost_ages_across_zones(self):
+        """Test that under aging the min-cost engine sends the unit to the long-waiting incident in another zone."""
+        management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        management.update_incident(self.low, status=IncidentStatus.RESOLVED)
+        far = management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"])
+        management.incidents[far].created_at -= timedelta(hours=2)
+        management.save_data()
+        management.close()
+        for policy, expected in ((StrictPriority(), self.high), (AgingPolicy(), far)):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, dispatch_policy=policy,
+                                                  allocation_engine=MinCostAllocationEngine())
+            self.management.process_resource_allocation()
+            self.assertEqual([incident_id for incident_id in (far, self.high)
+                              if self.management.incidents[incident_id].assigned_resources], [expected])
+            self.management.close()
+            self.management = None
+
+
+if __name__ == "__main__":
+    unittest.main()
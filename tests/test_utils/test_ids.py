@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime, timedelta
+from app.utils.ids import ULID_LENGTH, id_time, is_ulid, new_id, ulid_from_bytes, ulid_to_bytes
+from app.incidents.emerg_incident import Incident
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+
+
+class TestIds(unittest.TestCase):
+    def test_ids_increase_and_carry_their_time(self):
+        """Test that IDs issued in a burst are unique and sort in issue order, and decode to their time."""
+        before = datetime.now() - timedelta(milliseconds=1)
+        ids = [new_id() for _ in range(10_000)]
+        after = datetime.now()
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(len(identifier) == ULID_LENGTH and is_ulid(identifier) for identifier in ids))
+        self.assertTrue(before <= id_time(ids[0]) <= id_time(ids[-1]) <= after)
+
+    def test_bytes_round_trip(self):
+        for identifier in (new_id(), "0" * 26, "7" + "Z" * 25):
+            self.assertEqual(len(ulid_to_bytes(identifier)), 16)
+            self.assertEqual(ulid_from_bytes(ulid_to_bytes(identifier)), identifier)
+
+    def test_other_ids_are_not_ulids(self):
+        for identifier in ("12345", "0" * 25, "8" + "0" * 25, new_id().lower(), "0" * 25 + "U",
+                           "0b8a3e56-8c2f-4bd3-9d0a-0e6d4c3c1f7e"):
+            self.assertFalse(is_ulid(identifier))
+            self.assertIsNone(id_time(identifier))
+
+    def test_new_records_get_ulids_and_keep_given_ids(self):
+        incident = Incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        later = Incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.assertTrue(is_ulid(incident.incident_id))
+        self.assertLess(incident.incident_id, later.incident_id)
+        self.assertTrue(is_ulid(Resource("Unit", "Ambulance", "Zone 1").resource_id))
+        self.assertEqual(Incident("Zone 1", "fire", Priority.HIGH, [], incident_id="feed-7").incident_id, "feed-7")
+
+
+if __name__ == "__main__":
+    unittest.main()
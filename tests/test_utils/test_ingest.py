@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from io import StringIO
+from app.ingest import ingest_file
+from app.utils.emerg_management import EmergencyManagement, InvalidEventsError
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.resources.emerg_resource import Resource
+from app.priorities.emerg_priority import Priority
+
+TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+
+
+class TestIngestBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up a journaled system with the default fleet."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True)
+
+    def tearDown(self):
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _assigned_types(self):
+        resources = self.management.resources
+        return {
+            incident_id: Counter(resources[res_id].resource_type for res_id in incident.assigned_resources)
+            for incident_id, incident in self.management.incidents.items()
+        }
+
+    def _assert_matches_full_pass(self):
+        before = self._assigned_types()
+        with redirect_stdout(StringIO()):
+            self.management.process_resource_allocation()
+        self.assertEqual(before, self._assigned_types())
+
+    def test_adds_updates_and_allocates_once(self):
+        """Test a batch of adds and updates, including an update to an incident added in the same batch."""
+        added = self.management.ingest_batch([
+            {"op": "add_incident", "incident_id": "fire-1", "location": "Zone 1", "emergency_type": "fire",
+             "priority": "LOW", "required_resources": ["Fire Truck"]},
+            {"op": "add_incident", "location": "Zone 2", "emergency_type": "fire",
+             "priority": Priority.MEDIUM, "required_resources": ["Fire Truck"]},
+            {"op": "update_incident", "incident_id": "fire-1", "priority": "HIGH"},
+        ])
+        self.assertEqual(len(added), 2)
+        self.assertEqual(added[0], "fire-1")
+        # Only one fire truck: the batch's final state decides who gets it
+        self.assertEqual(len(self.management.incidents["fire-1"].assigned_resources), 1)
+        self.assertEqual(self.management.incidents[added[1]].assigned_resources, [])
+        with open(os.path.join(self.tmp_dir.name, "journal.jsonl")) as journal:
+            self.assertEqual([json.loads(line)["op"] for line in journal][-1:], ["ingest_batch"])
+
+    def test_invalid_batch_changes_nothing(self):
+        """Test that one bad event rejects the whole batch, with every error reported."""
+        events = [
+            {"op": "add_incident", "location": "Zone 1", "emergency_type": "fire",
+             "priority": "HIGH", "required_resources": ["Fire Truck"]},
+            {"op": "add_incident", "location": "Zone 1", "emergency_type": "fire",
+             "priority": "URGENT", "required_resources": ["Fire Truck"]},
+            {"op": "update_incident", "incident_id": "missing", "status": "RESOLVED"},
+            {"op": "delete_incident"},
+        ]
+        with self.assertRaises(InvalidEventsError) as raised:
+            self.management.ingest_batch(events)
+        self.assertEqual([index for index, _ in raised.exception.errors], [1, 2, 3])
+        self.assertIn("Unknown priority: URGENT", str(raised.exception))
+        self.assertEqual(len(self.management.incidents), 0)
+
+    def test_add_fields_are_checked_before_trusted_construction(self):
+        """Test that add events are type-checked in the parse pass, since their incidents skip the constructor's checks."""
+        base = {"op": "add_incident", "location": "Zone 1", "emergency_type": "fire",
+                "priority": "HIGH", "required_resources": ["Fire Truck"]}
+        events = [dict(base, location=7), dict(base, emergency_type=None), dict(base, required_resources="Fire Truck"),
+                  dict(base, required_resources=["Fire Truck", 3]), dict(base, priority=None),
+                  dict(base, required_resources=("Ambulance",))]
+        with self.assertRaises(InvalidEventsError) as raised:
+            self.management.ingest_batch(events)
+        self.assertEqual([index for index, _ in raised.exception.errors], [0, 1, 2, 3, 4])
+        added = self.management.ingest_batch(events[5:])
+        incident = self.management.incidents[added[0]]
+        self.assertEqual(incident.required_resources, ["Ambulance"])
+        self.assertEqual(incident.to_dict(), Incident.from_dict(incident.to_dict()).to_dict())
+
+    def test_mixed_batches_and_single_updates_match_full_pass(self):
+        """Test that allocation stays equal to a full pass across batches and the operations between them."""
+        rng = random.Random(11)
+        for index in range(5):
+            resource = Resource(name=f"Extra {index}", resource_type=rng.choice(TYPES), location="Zone 1")
+            self.management.add_resource(resource.resource_id, resource)
+        for _ in range(20):
+            events = []
+            for _ in range(rng.randint(1, 30)):
+                known = list(self.management.incidents)
+                if known and rng.random() < 0.4:
+                    events.append({"op": "update_incident", "incident_id": rng.choice(known),
+                                   "priority": rng.choice(["HIGH", "MEDIUM", "LOW"]),
+                                   "status": rng.choice(["OPEN", "IN_PROGRESS", "RESOLVED", None])})
+                else:
+                    events.append({"op": "add_incident", "location": "Zone 1", "emergency_type": "mixed",
+                                   "priority": rng.choice(["HIGH", "MEDIUM", "LOW"]),
+                                   "required_resources": [rng.choice(TYPES) for _ in range(rng.randint(1, 2))]})
+            self.management.ingest_batch(events)
+            incident_id = rng.choice(list(self.management.incidents))
+            self.management.update_incident(incident_id, priority=rng.choice(list(Priority)))
+            self.assertTrue(self.management.resource_index.is_consistent(self.management.resources))
+        self._assert_matches_full_pass()
+
+    def test_ingest_file_reports_line_numbers(self):
+        """Test that the file ingester applies valid batches and names the line of a bad event."""
+        path = os.path.join(self.tmp_dir.name, "events.jsonl")
+        with open(path, "w") as file:
+            file.write(json.dumps({"op": "add_incident", "location": "Zone 3", "emergency_type": "crime",
+                                   "priority": "LOW", "required_resources": ["Police Car"]}) + "\n\n")
+            file.write(json.dumps({"op": "update_incident", "incident_id": "missing", "status": "CLOSED"}) + "\n")
+        with self.assertRaisesRegex(ValueError, "line 3: Incident missing not found"):
+            ingest_file(self.management, path, batch_size=1)
+        self.assertEqual(len(self.management.incidents), 1)
+        incident = next(iter(self.management.incidents.values()))
+        self.assertEqual(incident.status, IncidentStatus.OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
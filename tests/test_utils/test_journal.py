@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.journal import Journal, replay_journal
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        """Set up a journal-mode system in a temporary data directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.management = self._open()
+
+    def tearDown(self):
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, **kwargs)
+
+    def _journal_path(self):
+        return os.path.join(self.tmp_dir.name, "journal.jsonl")
+
+    def _records(self):
+        return list(replay_journal(self._journal_path()))
+
+    def test_one_record_per_mutation(self):
+        """Test that an add_incident and the allocation it triggers form a single record."""
+        records_before = len(self._records())
+        incident_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        records = self._records()
+        self.assertEqual(len(records), records_before + 1)
+        record = records[-1]
+        self.assertEqual(record["op"], "add_incident")
+        self.assertEqual(list(record["incidents"]), [incident_id])
+        self.assertEqual(len(record["resources"]), 1)  # The fire truck that was dispatched
+
+    def test_state_survives_crash(self):
+        """Test that a restart without save_data replays the journal."""
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        self.management.update_incident(incident_id, priority=Priority.HIGH)
+        resource_id = self.management.incidents[incident_id].assigned_resources[0]
+        self.management.update_resource_status(resource_id, ResourceStatus.UNAVAILABLE)
+        self.management.close()  # No save_data: simulates losing the process
+
+        restarted = self._open()
+        self.assertEqual(set(restarted.resources), set(self.management.resources))
+        self.assertEqual(restarted.incidents[incident_id].priority, Priority.HIGH)
+        self.assertEqual(restarted.resources[resource_id].status, ResourceStatus.UNAVAILABLE)
+        self.assertEqual(restarted.incidents[incident_id].assigned_resources, [])
+        restarted.close()
+
+    def test_manual_allocation_is_journaled(self):
+        """Test that allocate_resource and reallocate_resource are journaled."""
+        first = self.management.add_incident("Zone 1", "police", Priority.LOW, ["Helicopter"])
+        second = self.management.add_incident("Zone 2", "police", Priority.LOW, ["Helicopter"])
+        resource = Resource(name="Spare", resource_type="Spare", location="Zone 3")
+        self.management.add_resource(resource.resource_id, resource)
+        self.management.allocate_resource(first, resource.resource_id)
+        self.management.reallocate_resource(second, resource.resource_id)
+        self.assertEqual([record["op"] for record in self._records()[-2:]],
+                         ["allocate_resource", "reallocate_resource"])
+        self.management.close()
+
+        restarted = self._open()
+        self.assertEqual(restarted.incidents[first].assigned_resources, [])
+        self.assertEqual(restarted.incidents[second].assigned_resources, [resource.resource_id])
+        self.assertEqual(restarted.resources[resource.resource_id].assigned_incident_id, second)
+        restarted.close()
+
+    def test_compaction(self):
+        """Test that the journal is folded into a snapshot every compact_every records."""
+        self.management.close()
+        self.management = self._open(compact_every=5)
+        for _ in range(12):
+            self.management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "incidents.json")))
+        self.assertLess(len(self._records()), 5)
+        incident_ids = set(self.management.incidents)
+        self.management.close()
+
+        restarted = self._open()
+        self.assertEqual(set(restarted.incidents), incident_ids)
+        restarted.close()
+
+    def test_save_data_truncates_journal(self):
+        """Test that an explicit save empties the journal."""
+        self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        with redirect_stdout(StringIO()):
+            self.management.save_data()
+        self.assertEqual(self._records(), [])
+
+    def test_torn_final_record_is_ignored(self):
+        """Test that a half-written last line from a crash is skipped on replay."""
+        incident_id = self.management.add_incident("Zone 3", "fire", Priority.HIGH, ["Fire Truck"])
+        self.management.close()
+        with open(self._journal_path(), "a") as f:
+            f.write('{"op": "add_incident", "incidents": {"x"')
+        with redirect_stdout(StringIO()):
+            restarted = self._open()
+        self.assertIn(incident_id, restarted.incidents)
+        self.assertNotIn("x", restarted.incidents)
+        restarted.close()
+
+    def test_torn_record_survives_two_restarts(self):
+        """Test that records appended after a crash are not glued onto its torn line and lost at the next restart."""
+        first = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        second = self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        self.management.close()
+        with open(self._journal_path(), "rb+") as f:  # Crash mid-append: the last record loses its tail
+            f.truncate(os.path.getsize(self._journal_path()) - 20)
+
+        restarted = self._open()
+        self.assertEqual(set(restarted.incidents), {first})
+        third = restarted.add_incident("Zone 3", "police", Priority.MEDIUM, ["Police Car"])
+        restarted.storage.journal.sync()
+        restarted.close()
+
+        self.management = self._open()
+        self.assertEqual(set(self.management.incidents), {first, third})
+
+    def test_fsync_batching(self):
+        """Test that fsync runs once per batch rather than once per record."""
+        journal = Journal(os.path.join(self.tmp_dir.name, "batch.jsonl"), fsync_every=4, fsync_interval=3600)
+        for index in range(3):
+            journal.append("op", {str(index): {}}, {})
+        self.assertEqual(journal._pending, 3)
+        journal.append("op", {}, {})
+        self.assertEqual(journal._pending, 0)
+        journal.close()
+        with open(journal.file_path) as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
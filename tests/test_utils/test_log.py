@@ -0,0 +1,63 @@
+import json
+import logging
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.log import LOGGER_NAME, configure_logging
+from app.priorities.emerg_priority import Priority
+
+
+class TestLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.saved = (list(self.logger.handlers), self.logger.level)
+
+    def tearDown(self):
+        self.logger.handlers[:], self.logger.level = self.saved[0], self.saved[1]
+        self.tmp_dir.cleanup()
+
+    def test_quiet_by_default(self):
+        """Test that library use writes nothing to stdout, even for a full allocation pass."""
+        output = StringIO()
+        with redirect_stdout(output):
+            management = EmergencyManagement(data_dir=self.tmp_dir.name)
+            management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+            management.process_resource_allocation()
+            management.save_data()
+        self.assertEqual(output.getvalue(), "")
+
+    def test_allocation_summary_event_in_json(self):
+        """Test that an allocation pass logs one summary event with its counts, and no dump at INFO."""
+        stream = StringIO()
+        configure_logging("INFO", json_format=True, stream=stream)
+        management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        management.process_resource_allocation()
+
+        entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+        summaries = [entry for entry in entries if entry.get("event") == "allocation_processed"]
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0]["level"], "INFO")
+        self.assertEqual(summaries[0]["logger"], "app.utils.emerg_management")
+        self.assertEqual((summaries[0]["active_incidents"], summaries[0]["assigned_units"]), (1, 1))
+        self.assertFalse(any("--- Resource Allocation Processed ---" in entry["message"] for entry in entries))
+
+    def test_debug_keeps_the_full_dump(self):
+        """Test that DEBUG (the interactive menu's level) still shows every incident and resource."""
+        stream = StringIO()
+        configure_logging("DEBUG", stream=stream)
+        configure_logging("DEBUG", stream=stream)  # Reconfiguring replaces the handler
+        management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        incident_id = management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        management.process_resource_allocation()
+        output = stream.getvalue()
+        self.assertEqual(output.count("--- Resource Allocation Processed ---"), 1)
+        self.assertIn(f"Incident {incident_id}: Assigned Resources:", output)
+        self.assertIn("Successfully loaded incidents and resources.", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
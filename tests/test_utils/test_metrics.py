@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.request
+from app.utils import metrics
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import Incident, IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+ORIGINAL_TO_DICT = Incident.to_dict
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Set up a system with metrics enabled and nothing recorded."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        metrics.REGISTRY.reset()
+        metrics.enable()
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.management.close()
+        metrics.disable()
+        metrics.REGISTRY.reset()
+        self.tmp_dir.cleanup()
+
+    def _samples(self, registry=metrics.REGISTRY):
+        """Parses the rendered metrics into {sample name with labels: value}."""
+        return {
+            line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in registry.render().splitlines() if not line.startswith("#")
+        }
+
+    def test_operation_histograms(self):
+        """Test that instrumented operations are counted into cumulative buckets."""
+        incident_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Ambulance"])
+        self.management.update_incident(incident_id, priority=Priority.MEDIUM)
+        self.management.process_resource_allocation()
+        self.management.save_data()
+
+        samples = self._samples()
+        name = "emergency_operation_duration_seconds"
+        self.assertEqual(samples[f'{name}_count{{operation="add_incident"}}'], 2)
+        self.assertEqual(samples[f'{name}_bucket{{operation="add_incident",le="+Inf"}}'], 2)
+        self.assertEqual(samples[f'{name}_count{{operation="update_incident"}}'], 1)
+        self.assertEqual(samples[f'{name}_count{{operation="process_resource_allocation"}}'], 1)
+        self.assertEqual(samples[f'{name}_count{{operation="save_data"}}'], 1)
+        self.assertGreaterEqual(samples[f'{name}_count{{operation="incident_to_dict"}}'], 2)
+        self.assertGreater(samples[f'{name}_sum{{operation="save_data"}}'], 0)
+
+    def test_state_gauges(self):
+        """Test the open-incident and available-resource gauges."""
+        self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        registry = metrics.MetricsRegistry()  # Only this system's gauges (the global registry sums all of them)
+        registry.add_collector(self.management._metric_gauges)
+        samples = self._samples(registry)
+        self.assertEqual(samples['emergency_open_incidents{priority="HIGH"}'], 2)
+        self.assertEqual(samples['emergency_open_incidents{priority="LOW"}'], 0)
+        self.assertEqual(samples['emergency_available_resources{resource_type="Fire Truck"}'], 0)
+        self.assertEqual(samples['emergency_available_resources{resource_type="Ambulance"}'], 1)
+
+    def test_disable_restores_original_methods(self):
+        """Test that disabled metrics leave no wrapper on the hot path."""
+        self.assertIsNot(Incident.to_dict, ORIGINAL_TO_DICT)
+        metrics.disable()
+        self.assertIs(Incident.to_dict, ORIGINAL_TO_DICT)
+        self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.assertNotIn("add_incident", metrics.render())
+
+    def test_exports(self):
+        """Test the dump file and the HTTP endpoint."""
+        self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        path = os.path.join(self.tmp_dir.name, "metrics.prom")
+        metrics.write_metrics(path)
+        with open(path) as f:
+            self.assertIn('operation="add_incident"', f.read())
+
+        server = metrics.start_metrics_server(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                self.assertIn("text/plain", response.headers["Content-Type"])
+                self.assertIn("emergency_open_incidents", response.read().decode("utf-8"))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_scrapes_during_writes(self):
+        """Test that a thread-safe system can be scraped, as by the metrics server, while another thread writes."""
+        self.management.close()
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, thread_safe=True)
+        registry = metrics.MetricsRegistry()
+        registry.add_collector(self.management._metric_gauges)
+        done = threading.Event()
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible, so races actually interleave
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        def writer():
+            try:
+                for _ in range(300):
+                    incident_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+                    self.management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+            finally:
+                done.set()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        scrapes = 0
+        while not done.is_set() or scrapes == 0:
+            samples = self._samples(registry)
+            self.assertIn(samples['emergency_open_incidents{priority="HIGH"}'], (0, 1))
+            self.assertEqual(samples['emergency_available_resources{resource_type="Fire Truck"}'],
+                             1 - samples['emergency_open_incidents{priority="HIGH"}'])
+            scrapes += 1
+        thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.reports import CSV_COLUMNS, IncidentReport
+from app.incidents.emerg_incident import IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+ZONES = ["Zone 1", "Zone 2", "Zone 3"]
+PRIORITIES = [Priority.LOW, Priority.HIGH, Priority.MEDIUM]
+
+
+class _NoScan(dict):
+    """A source that fails if the report reads every incident."""
+
+    def items(self):
+        raise AssertionError("The report scanned every incident")
+
+
+class TestIncidentReport(unittest.TestCase):
+    def setUp(self):
+        """Set up a system with 30 incidents over three zones and priorities, a third of them resolved."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        self.ids = []
+        for index in range(30):
+            incident_id = self.management.add_incident(ZONES[index % 3], "medical", PRIORITIES[index % 3], ["Ambulance"])
+            self.ids.append(incident_id)
+            if index % 3 == 0:
+                self.management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+
+    def tearDown(self):
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _ids(self, report):
+        return [incident.incident_id for incident in report]
+
+    def _all_pages(self, limit, **filters):
+        ids, cursor = [], None
+        while True:
+            page = self.management.stream_incident_report(**filters, cursor=cursor, limit=limit)
+            ids.extend(self._ids(page))
+            cursor = page.next_cursor
+            if cursor is None:
+                return ids
+
+    def test_filters(self):
+        report = self.management.stream_incident_report(status=IncidentStatus.RESOLVED)
+        self.assertEqual(self._ids(report), self.ids[0::3])
+        report = self.management.stream_incident_report(priority=Priority.HIGH, location="Zone 2")
+        self.assertEqual(self._ids(report), self.ids[1::3])
+        self.assertEqual(self._ids(self.management.stream_incident_report(location="Zone 9")), [])
+
+        created = {incident_id: self.management.incidents[incident_id].created_at for incident_id in self.ids}
+        since, until = created[self.ids[10]], created[self.ids[20]]
+        report = self.management.stream_incident_report(since=since, until=until)
+        self.assertEqual(self._ids(report), [incident_id for incident_id in self.ids if since <= created[incident_id] < until])
+        self.assertEqual(self._ids(self.management.stream_incident_report(since=datetime.now() + timedelta(days=1))), [])
+
+    def test_pages_join_up_to_the_full_report(self):
+        """Test that paging with cursors yields exactly the full report, in both sort orders."""
+        by_priority = self._ids(self.management.stream_incident_report(sort="priority"))
+        expected = [incident_id for priority in (Priority.HIGH, Priority.MEDIUM, Priority.LOW)
+                    for incident_id in self.ids if self.management.incidents[incident_id].priority == priority]
+        self.assertEqual(by_priority, expected)
+        for limit in (1, 7, 10, 30, 31):
+            self.assertEqual(self._all_pages(limit), self.ids)
+            self.assertEqual(self._all_pages(limit, sort="priority"), expected)
+            self.assertEqual(self._all_pages(limit, sort="priority", status=IncidentStatus.OPEN),
+                             [incident_id for incident_id in expected if incident_id not in self.ids[0::3]])
+
+    def test_cursor_survives_new_incidents(self):
+        """Test that a cursor taken before more incidents arrive still resumes where it left off."""
+        page = self.management.stream_incident_report(limit=10)
+        self.assertEqual(self._ids(page), self.ids[:10])
+        later = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        rest = self.management.stream_incident_report(cursor=page.next_cursor)
+        self.assertEqual(self._ids(rest), self.ids[10:] + [later])
+        self.assertIsNone(rest.next_cursor)
+
+    def test_time_range_reads_only_the_range(self):
+        """Test that a time-range report, paged in both sort orders, is read from the creation-time index."""
+        created = {incident_id: self.management.incidents[incident_id].created_at for incident_id in self.ids}
+        since, until = created[self.ids[10]], created[self.ids[20]]
+        in_range = [incident_id for incident_id in self.ids if since <= created[incident_id] < until]
+        by_priority = [incident_id for priority in (Priority.HIGH, Priority.MEDIUM, Priority.LOW)
+                       for incident_id in in_range if self.management.incidents[incident_id].priority == priority]
+        for limit in (1, 4, 30):
+            self.assertEqual(self._all_pages(limit, since=since, until=until), in_range)
+            self.assertEqual(self._all_pages(limit, since=since, until=until, sort="priority"), by_priority)
+
+        source = _NoScan(self.management.snapshot().incidents.items())
+        page = IncidentReport(source, since=since, limit=3, time_index=self.management._created_between)
+        self.assertEqual(self._ids(page), self.ids[10:13])
+        rest = IncidentReport(source, since=since, until=until, cursor=page.next_cursor,
+                              time_index=self.management._created_between)
+        self.assertEqual(self._ids(rest), in_range[3:])
+        later = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])  # Not in source
+        self.assertNotIn(later, self._ids(IncidentReport(source, since=since, time_index=self.management._created_between)))
+
+    def test_invalid_arguments(self):
+        page = self.management.stream_incident_report(limit=5)
+        list(page)
+        with self.assertRaises(ValueError):
+            self.management.stream_incident_report(sort="priority", cursor=page.next_cursor)  # Other sort order
+        for cursor in ("arrival::missing", "garbage", "priority:URGENT:" + self.ids[0]):
+            with self.assertRaises(ValueError):
+                self.management.stream_incident_report(sort="priority" if "priority" in cursor else "arrival",
+                                                       cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.management.stream_incident_report(sort="location")
+        with self.assertRaises(ValueError):
+            self.management.stream_incident_report(limit=0)
+        with self.assertRaises(ValueError):
+            self.management.stream_incident_report().write(io.StringIO(), "xml")
+
+    def test_output_formats(self):
+        report = lambda: self.management.stream_incident_report(location="Zone 3")  # noqa: E731
+        out = io.StringIO()
+        self.assertEqual(report().write(out, "csv"), 10)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(tuple(rows[0]), CSV_COLUMNS)
+        self.assertEqual([row["incident_id"] for row in rows], self.ids[2::3])
+        self.assertEqual(rows[0]["priority"], "MEDIUM")
+
+        out = io.StringIO()
+        report().write(out, "jsonl")
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[0], self.management.incidents[self.ids[2]].to_dict())
+
+        out = io.StringIO()
+        report().write(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 11)  # Header and one line per incident
+        self.assertTrue(lines[1].startswith(self.ids[2]))
+
+    def test_lazy_storage_streams_from_disk(self):
+        """Test that a lazily loaded history gives the same report, seeking by skipping."""
+        self.management.save_data()
+        self.management.close()
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name, lazy_load=True)
+        self.assertEqual(self._all_pages(4), self.ids)
+        since = self.management.incidents[self.ids[25]].created_at
+        self.assertEqual(self._all_pages(2, since=since), self.ids[25:])
+        self.assertNotIn(self.ids[27], self.management.incidents.resident)  # Resolved history stays on disk
+        report = IncidentReport(self.management.incidents, status=IncidentStatus.RESOLVED, sort="priority")
+        self.assertEqual(len(self._ids(report)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.resource_index import ResourceIndex
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestResourceIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a system with two ambulances and one fire truck."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name)
+        self.management.resources = {}
+        self.management._rebuild_resource_indexes()
+        self.management.allocator.rebuild()
+        self.ambulance_1 = self._add_resource("Ambulance 1", "Ambulance")
+        self.ambulance_2 = self._add_resource("Ambulance 2", "Ambulance")
+        self.fire_truck = self._add_resource("Fire Truck 1", "Fire Truck")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _add_resource(self, name, resource_type):
+        resource = Resource(name=name, resource_type=resource_type, location="Zone 1")
+        self.management.add_resource(resource.resource_id, resource)
+        return resource.resource_id
+
+    def _assert_consistent(self):
+        self.assertTrue(self.management.resource_index.is_consistent(self.management.resources))
+
+    def test_available_by_type(self):
+        """Test that available resources are filed under their type."""
+        index = self.management.resource_index
+        self.assertCountEqual(index.available("Ambulance"), [self.ambulance_1, self.ambulance_2])
+        self.assertEqual(index.available("Fire Truck"), [self.fire_truck])
+        self.assertIsNone(index.first_available("Police Car"))
+        self._assert_consistent()
+
+    def test_allocate_and_reallocate_keep_index_in_sync(self):
+        """Test that allocation, reallocation and release update the index."""
+        incident_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.assertEqual(self.management.resource_index.available_count("Fire Truck"), 0)
+        self._assert_consistent()
+
+        self.management.update_incident(incident_id, required_resources=["Ambulance"])
+        self.assertEqual(self.management.resource_index.available("Fire Truck"), [self.fire_truck])
+        self.assertEqual(self.management.resource_index.available_count("Ambulance"), 1)
+        self._assert_consistent()
+
+        other_id = self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Police Car"])
+        self.management.reallocate_resource(other_id, self.ambulance_2)
+        self.assertEqual(self.management.resources[self.ambulance_2].assigned_incident_id, other_id)
+        self._assert_consistent()
+
+    def test_status_change_keeps_index_in_sync(self):
+        """Test that taking a unit out of service removes it from the available view."""
+        self.management.update_resource_status(self.ambulance_1, ResourceStatus.UNAVAILABLE)
+        self.assertEqual(self.management.resource_index.available("Ambulance"), [self.ambulance_2])
+        self._assert_consistent()
+        self.management.update_resource_status(self.ambulance_1, ResourceStatus.AVAILABLE)
+        self.assertEqual(self.management.resource_index.available_count("Ambulance"), 2)
+        self._assert_consistent()
+
+    def test_unavailable_unit_is_replaced(self):
+        """Test that an incident losing a unit to maintenance is re-served from the fleet."""
+        incident_id = self.management.add_incident("Zone 1", "medical", Priority.HIGH, ["Ambulance"])
+        assigned = self.management.incidents[incident_id].assigned_resources[0]
+        self.management.update_resource_status(assigned, ResourceStatus.UNAVAILABLE)
+        replacement = self.management.incidents[incident_id].assigned_resources
+        self.assertEqual(len(replacement), 1)
+        self.assertNotEqual(replacement[0], assigned)
+        self._assert_consistent()
+
+    def test_view_resources_filters_by_type(self):
+        """Test that the resources view can be filtered by type through the index."""
+        ambulances = self.management.view_resources("Ambulance")
+        self.assertEqual({res.name for res in ambulances}, {"Ambulance 1", "Ambulance 2"})
+        self.assertEqual(len(self.management.view_resources()), 3)
+        self.assertEqual(set(self.management.get_available_resources("Fire Truck")), {self.fire_truck})
+
+    def test_type_change_moves_resource(self):
+        """Test that re-indexing a resource whose type changed files it under the new type."""
+        index = ResourceIndex()
+        resource = Resource(name="Unit", resource_type="Ambulance", location="Zone 1")
+        index.update("unit", resource)
+        resource.resource_type = "Fire Truck"
+        index.update("unit", resource)
+        self.assertEqual(index.available("Ambulance"), [])
+        self.assertEqual(index.available("Fire Truck"), ["unit"])
+        self.assertTrue(index.is_consistent({"unit": resource}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import unittest
+from app.utils.emerg_management import EmergencyManagement, InvalidEventsError
+from app.utils.sharding import ShardedEmergencyManagement, partition_zones
+from app.utils.sqlite_storage import SQLiteStorage
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+ZONES = {
+    "West A": (51.50, -0.50),
+    "West B": (51.52, -0.45),
+    "East A": (51.50, 0.30),
+    "East B": (51.48, 0.35),
+}
+
+
+def _unit(resource_type, location):
+    resource = Resource(name=f"{resource_type} in {location}", resource_type=resource_type, location=location)
+    return resource.resource_id, resource
+
+
+class TestPartitionZones(unittest.TestCase):
+    def test_neighbouring_zones_share_a_region(self):
+        """Test that zones are split across their wider extent, west from east."""
+        regions = partition_zones(ZONES, 2)
+        self.assertEqual(regions["West A"], regions["West B"])
+        self.assertEqual(regions["East A"], regions["East B"])
+        self.assertNotEqual(regions["West A"], regions["East A"])
+
+    def test_every_region_is_used(self):
+        zones = {f"Zone {i}": (51.0 + (i % 7) * 0.05, -0.5 + i * 0.01) for i in range(50)}
+        regions = partition_zones(zones, 4)
+        self.assertEqual(set(regions.values()), {0, 1, 2, 3})
+        self.assertEqual(regions, partition_zones(dict(reversed(list(zones.items()))), 4))  # Order independent
+
+
+class TestRemoveResource(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _check_removal_persists(self, open_system):
+        management = open_system()
+        incident_id = management.add_incident("Zone 2", "medical", Priority.HIGH, ["Ambulance"])
+        unit_id = management.incidents[incident_id].assigned_resources[0]
+        removed = management.remove_resource(unit_id)
+        self.assertEqual(removed.resource_id, unit_id)
+        self.assertEqual(removed.status, ResourceStatus.AVAILABLE)
+        self.assertEqual(management.incidents[incident_id].assigned_resources, [])
+        self.assertIsNone(management.remove_resource(unit_id))
+        management.close()
+
+        reopened = open_system()  # Without a save: the removal comes back from the journal / database
+        self.assertNotIn(unit_id, reopened.resources)
+        self.assertEqual(len(reopened.resources), 2)
+        reopened.close()
+
+    def test_removal_survives_journal_replay(self):
+        self._check_removal_persists(lambda: EmergencyManagement(data_dir=self.tmp_dir.name, journal=True))
+
+    def test_removal_is_deleted_from_sqlite(self):
+        db_path = os.path.join(self.tmp_dir.name, "emergency.db")
+        self._check_removal_persists(
+            lambda: EmergencyManagement(data_dir=self.tmp_dir.name, storage=SQLiteStorage(db_path))
+        )
+
+
+class TestShardedEmergencyManagement(unittest.TestCase):
+    def setUp(self):
+        """Set up two journaled regions, west and east, with no units."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sharded = self._open(regions=2)
+        self.west, self.east = self.sharded.region_of("West A"), self.sharded.region_of("East A")
+
+    def tearDown(self):
+        self.sharded.close()
+        self.tmp_dir.cleanup()
+
+    def _open(self, regions=None):
+        return ShardedEmergencyManagement(self.tmp_dir.name, regions=regions, location_mapping=ZONES,
+                                          journal=True, proximity_dispatch=True)
+
+    def test_routing_and_restart(self):
+        """Test that incidents and units live in the region of their zone, also after a restart."""
+        unit_id, unit = _unit("Ambulance", "West B")
+        self.sharded.add_resource(unit_id, unit)
+        incident_id = self.sharded.add_incident("West A", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(self.sharded.incident_owner[incident_id], self.west)
+        self.assertEqual(self.sharded.resource_owner[unit_id], self.west)
+        self.assertTrue(self.sharded.update_incident(incident_id, status=IncidentStatus.RESOLVED))
+        self.assertFalse(self.sharded.update_incident("missing", status=IncidentStatus.RESOLVED))
+        self.sharded.close()
+
+        self.sharded = self._open()
+        self.assertEqual(self.sharded.regions, 2)
+        self.assertEqual(self.sharded.incident_owner, {incident_id: self.west})
+        [incident] = self.sharded.get_incident_report()
+        self.assertEqual(incident.status, IncidentStatus.RESOLVED)
+        with self.assertRaises(ValueError):
+            self._open(regions=3)
+
+    def test_borrows_from_nearest_region(self):
+        """Test that a region with no unit of a type borrows an idle one from another region."""
+        unit_id, unit = _unit("Ambulance", "West A")
+        self.sharded.add_resource(unit_id, unit)
+        incident_id = self.sharded.add_incident("East A", "medical", Priority.HIGH, ["Ambulance"])
+        [incident] = self.sharded.get_active_incidents()
+        self.assertEqual(incident.assigned_resources, [unit_id])
+        self.assertEqual(self.sharded.resource_owner[unit_id], self.east)
+        self.assertEqual(self.sharded.units_borrowed, 1)
+
+        # Nothing left to lend: the next incident waits
+        waiting = self.sharded.add_incident("West B", "medical", Priority.LOW, ["Ambulance"])
+        self.sharded.process_resource_allocation()
+        assigned = {incident.incident_id: incident.assigned_resources for incident in self.sharded.get_active_incidents()}
+        self.assertEqual(assigned, {incident_id: [unit_id], waiting: []})
+        self.sharded.close()
+
+        self.sharded = self._open()  # The unit was moved, not copied
+        self.assertEqual([resource.resource_id for resource in self.sharded.view_resources()], [unit_id])
+        self.assertEqual(self.sharded.resource_owner[unit_id], self.east)
+
+    def test_ingest_batch_across_regions(self):
+        """Test that a batch is split by region, applied in parallel and returns IDs in event order."""
+        for location in ("West A", "East B"):
+            self.sharded.add_resource(*_unit("Fire Truck", location))
+        events = [
+            {"op": "add_incident", "location": location, "emergency_type": "fire", "priority": "MEDIUM",
+             "required_resources": ["Fire Truck"]}
+            for location in ("East A", "West B", "East B")
+        ]
+        events.append({"op": "add_incident", "incident_id": "feed-1", "location": "West A",
+                       "emergency_type": "fire", "priority": "HIGH", "required_resources": ["Fire Truck"]})
+        events.append({"op": "update_incident", "incident_id": "feed-1", "status": "RESOLVED"})
+        added = self.sharded.ingest_batch(events)
+        self.assertEqual(len(added), 4)
+        self.assertEqual(added[3], "feed-1")
+        self.assertEqual([self.sharded.incident_owner[incident_id] for incident_id in added],
+                         [self.east, self.west, self.east, self.west])
+        served = [incident for incident in self.sharded.get_active_incidents() if incident.assigned_resources]
+        self.assertEqual(len(served), 2)  # One truck per region
+
+    def test_invalid_batch_changes_no_region(self):
+        """Test that an error in one region's share stops every region's share."""
+        events = [
+            {"op": "add_incident", "location": "West A", "emergency_type": "fire", "priority": "HIGH",
+             "required_resources": ["Fire Truck"]},
+            {"op": "add_incident", "location": "East A", "emergency_type": "fire", "priority": "URGENT",
+             "required_resources": ["Fire Truck"]},
+            {"op": "update_incident", "incident_id": "missing", "status": "RESOLVED"},
+        ]
+        with self.assertRaises(InvalidEventsError) as raised:
+            self.sharded.ingest_batch(events)
+        self.assertEqual([index for index, _ in raised.exception.errors], [1, 2])
+        self.assertEqual(self.sharded.get_incident_report(), [])
+        self.assertEqual(self.sharded.incident_owner, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import random
+import tempfile
+import threading
+import unittest
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.snapshot import SnapshotTable
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestSnapshotTable(unittest.TestCase):
+    def _assert_same(self, table, expected):
+        self.assertEqual(list(table.items()), list(expected.items()))  # Same order as a dict
+        self.assertEqual(len(table), len(expected))
+        for key, value in expected.items():
+            self.assertIn(key, table)
+            self.assertEqual(table[key], value)
+
+    def test_versions_behave_like_dict_copies(self):
+        """Test that every version keeps matching the dict it was made from while later ones change."""
+        rng = random.Random(7)
+        table = SnapshotTable.build((f"k{i}", i) for i in range(500))
+        model = {f"k{i}": i for i in range(500)}
+        versions = [(table, dict(model))]
+        for step in range(300):
+            changes = {}
+            for _ in range(rng.randint(1, 20)):
+                key = f"k{rng.randrange(1_500)}"  # Updates, removals, new keys and re-added keys
+                changes[key] = None if rng.random() < 0.3 else step
+            table = table.updated(changes)
+            for key, value in changes.items():
+                if value is None:
+                    model.pop(key, None)
+                else:
+                    model[key] = value
+            versions.append((table, dict(model)))
+        for version, expected in versions:
+            self._assert_same(version, expected)
+        keys = list(model)
+        for index in (0, 1, 31, 32, len(keys) - 1):
+            self.assertEqual(list(table.items_after(keys[index])), list(model.items())[index + 1:])
+        with self.assertRaises(KeyError):
+            table.items_after("missing")
+        self.assertNotIn("missing", table)
+        self.assertIsNone(table.get("missing"))
+
+    def test_empty_table(self):
+        table = SnapshotTable.build([])
+        self.assertEqual(list(table), [])
+        grown = table.updated({"a": 1})
+        self.assertEqual(list(grown.items()), [("a", 1)])
+        self.assertEqual(len(table), 0)
+
+
+class TestStateSnapshot(unittest.TestCase):
+    def setUp(self):
+        """Set up a system with the default fleet."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.management = EmergencyManagement(data_dir=self.tmp_dir.name, thread_safe=True)
+
+    def tearDown(self):
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def test_snapshot_is_frozen_at_its_generation(self):
+        """Test that a snapshot keeps its state while the system moves on, and is not the live state."""
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        before = self.management.snapshot()
+        unit_id = before.incidents[incident_id].assigned_resources[0]
+        self.assertIsNot(before.incidents[incident_id], self.management.incidents[incident_id])
+
+        self.management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+        later_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        after = self.management.snapshot()
+
+        self.assertEqual(after.generation, before.generation + 2)
+        self.assertEqual(before.incidents[incident_id].status, IncidentStatus.OPEN)
+        self.assertEqual(before.resources[unit_id].status, ResourceStatus.ASSIGNED)
+        self.assertNotIn(later_id, before.incidents)
+        self.assertEqual(after.incidents[incident_id].status, IncidentStatus.RESOLVED)
+        self.assertEqual(after.resources[unit_id].status, ResourceStatus.AVAILABLE)
+        self.assertIs(self.management.snapshot(), after)  # Nothing changed since: the same version
+
+        removed = next(iter(self.management.resources))
+        self.management.remove_resource(removed)
+        self.assertIn(removed, after.resources)
+        self.assertNotIn(removed, self.management.snapshot().resources)
+        self.assertEqual([incident.incident_id for incident in self.management.get_incident_report()],
+                         [incident_id, later_id])
+
+    def test_reader_cannot_change_shared_records(self):
+        """Test that a reader's attempt to change a report record leaks neither into the snapshot nor the live state."""
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        [record] = self.management.get_incident_report()
+        unit_id = record.assigned_resources[0]
+        with self.assertRaises(AttributeError):
+            record.status = IncidentStatus.CLOSED
+        with self.assertRaises(AttributeError):
+            record.assigned_resources.clear()  # A tuple
+        with self.assertRaises(AttributeError):
+            self.management.snapshot().resources[unit_id].status = ResourceStatus.AVAILABLE
+
+        mine = record.copy()  # A private, mutable copy
+        mine.status = IncidentStatus.CLOSED
+        mine.assigned_resources.clear()
+        for incident in (self.management.snapshot().incidents[incident_id], self.management.incidents[incident_id]):
+            self.assertEqual(incident.status, IncidentStatus.OPEN)
+            self.assertEqual(list(incident.assigned_resources), [unit_id])
+        self.assertEqual(record.to_dict(), self.management.incidents[incident_id].to_dict())
+
+    def test_listed_incidents_do_not_change_after_later_writes(self):
+        """Test that a list already returned by view_incidents keeps its state, with eager and lazy storage."""
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        self.management.save_data()
+        lazy = EmergencyManagement(data_dir=self.tmp_dir.name, lazy_load=True)
+        try:
+            for management in (self.management, lazy):
+                [record] = management.view_incidents()
+                unit_id = record.assigned_resources[0]
+                with self.assertRaises(AttributeError):
+                    record.status = IncidentStatus.CLOSED
+                management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+                self.assertEqual(record.status, IncidentStatus.OPEN)
+                self.assertEqual(list(record.assigned_resources), [unit_id])
+                self.assertEqual(management.view_incidents()[0].status, IncidentStatus.RESOLVED)
+        finally:
+            lazy.close()
+
+    def test_readers_see_consistent_state_during_writes(self):
+        """Test that every snapshot read while a writer runs has matching incident and unit assignments."""
+        self.management.snapshot()
+        done = threading.Event()
+        problems = []
+
+        def writer():
+            rng = random.Random(3)
+            own = []
+            for _ in range(400):
+                if rng.random() < 0.6 or not own:
+                    own.append(self.management.add_incident(
+                        rng.choice(["Zone 1", "Zone 2", "Zone 3"]), "medical", rng.choice(list(Priority)),
+                        [rng.choice(["Ambulance", "Fire Truck", "Police Car"])]))
+                else:
+                    self.management.update_incident(rng.choice(own), status=IncidentStatus.RESOLVED)
+            done.set()
+
+        def reader():
+            while not done.is_set():
+                snapshot = self.management.snapshot()
+                for resource_id, resource in snapshot.resources.items():
+                    if resource.status == ResourceStatus.ASSIGNED:
+                        holder = snapshot.incidents.get(resource.assigned_incident_id)
+                        if holder is None or resource_id not in holder.assigned_resources:
+                            problems.append((snapshot.generation, resource_id))
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(problems, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.spatial_index import SpatialIndex
+from app.utils.utils import calculate_distance
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a random set of zones and units."""
+        self.rng = random.Random(3)
+        self.zones = {
+            f"Zone {index}": (self.rng.uniform(49.0, 56.0), self.rng.uniform(-6.0, 2.0)) for index in range(300)
+        }
+        self.resources = {}
+        for index in range(600):
+            resource = Resource(
+                name=f"Unit {index}",
+                resource_type=self.rng.choice(["Ambulance", "Fire Truck"]),
+                location=self.rng.choice(list(self.zones)),
+                status=self.rng.choice([ResourceStatus.AVAILABLE, ResourceStatus.ASSIGNED]),
+            )
+            self.resources[resource.resource_id] = resource
+        self.index = SpatialIndex(self.zones)
+        self.index.rebuild(self.resources)
+
+    def _brute_force_distance(self, resource_type, location):
+        """Reference: distance to the nearest available unit using calculate_distance."""
+        distances = [
+            calculate_distance(self.zones[location], self.zones[res.location])
+            for res in self.resources.values()
+            if res.resource_type == resource_type and res.status == ResourceStatus.AVAILABLE
+        ]
+        return min(distances) if distances else None
+
+    def _assert_nearest(self, resource_type, location):
+        resource_id = self.index.nearest_available(resource_type, location)
+        expected = self._brute_force_distance(resource_type, location)
+        if expected is None:
+            self.assertIsNone(resource_id)
+            return
+        found = self.resources[resource_id]
+        self.assertEqual(found.resource_type, resource_type)
+        self.assertEqual(found.status, ResourceStatus.AVAILABLE)
+        self.assertAlmostEqual(calculate_distance(self.zones[location], self.zones[found.location]), expected)
+
+    def test_matches_brute_force(self):
+        """Test that nearest lookups agree with a haversine scan."""
+        for location in list(self.zones)[:100]:
+            for resource_type in ("Ambulance", "Fire Truck", "Police Car"):
+                self._assert_nearest(resource_type, location)
+
+    def test_tracks_status_changes(self):
+        """Test that units becoming busy or free are reflected in lookups."""
+        for _ in range(300):
+            resource_id = self.rng.choice(list(self.resources))
+            resource = self.resources[resource_id]
+            resource.status = self.rng.choice(list(ResourceStatus))
+            self.index.update(resource_id, resource)
+            self._assert_nearest(resource.resource_type, self.rng.choice(list(self.zones)))
+
+    def test_unmapped_zone(self):
+        """Test that unmapped incident zones return no match."""
+        self.assertIsNone(self.index.nearest_available("Ambulance", "Nowhere"))
+
+
+class TestProximityDispatch(unittest.TestCase):
+    def setUp(self):
+        """Set up a proximity-mode system with ambulances in Zones 1 and 3 (plus the default one in Zone 2)."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with redirect_stdout(StringIO()):
+            self.management = EmergencyManagement(data_dir=self.tmp_dir.name, proximity_dispatch=True)
+        for zone in ("Zone 1", "Zone 3"):
+            resource = Resource(name=f"Ambulance {zone}", resource_type="Ambulance", location=zone)
+            self.management.add_resource(resource.resource_id, resource)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _assigned_zone(self, incident_id):
+        resource_id = self.management.incidents[incident_id].assigned_resources[0]
+        return self.management.resources[resource_id].location
+
+    def test_assigns_nearest_unit(self):
+        """Test that the unit closest to the incident's zone is dispatched."""
+        incident_id = self.management.add_incident("Zone 3", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(self._assigned_zone(incident_id), "Zone 3")
+        incident_id = self.management.add_incident("Zone 1", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(self._assigned_zone(incident_id), "Zone 1")
+        incident_id = self.management.add_incident("Zone 3", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(self._assigned_zone(incident_id), "Zone 2")
+
+    def test_new_zone(self):
+        """Test that zones added at runtime take part in proximity dispatch."""
+        self.management.add_zone("Zone 4", (51.5007, -0.1246))
+        resource = Resource(name="Ambulance Zone 4", resource_type="Ambulance", location="Zone 4")
+        self.management.add_resource(resource.resource_id, resource)
+        incident_id = self.management.add_incident("Zone 4", "medical", Priority.HIGH, ["Ambulance"])
+        self.assertEqual(self._assigned_zone(incident_id), "Zone 4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.sqlite_storage import SQLiteStorage
+from app.utils.storage import LazyIncidents
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        """Set up a system backed by a SQLite database in a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "emergency.db")
+        self.management = self._open()
+
+    def tearDown(self):
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _open(self):
+        with redirect_stdout(StringIO()):
+            return EmergencyManagement(data_dir=self.tmp_dir.name, storage=SQLiteStorage(self.db_path))
+
+    def _restart(self):
+        self.management.close()
+        self.management = self._open()
+        return self.management
+
+    def test_creation_range_queries(self):
+        """Test that time-range and most-recent queries run against the database, history included."""
+        management = self.management
+        ids = [management.add_incident("Zone 1", "medical", Priority.LOW, ["Ambulance"]) for _ in range(6)]
+        for incident_id in ids[:4]:
+            management.update_incident(incident_id, status=IncidentStatus.CLOSED)
+        created = {incident_id: management.incidents[incident_id].created_at for incident_id in ids}
+        management = self._restart()
+        between = management.incidents_created_between(created[ids[1]], created[ids[4]])
+        self.assertEqual([incident.incident_id for incident in between], ids[1:4])
+        self.assertEqual([incident.incident_id for incident in management.recent_incidents(4)], ids[:1:-1])
+        plan = management.storage.explain("SELECT incident_id FROM incidents WHERE created_at >= ? ORDER BY created_at",
+                                          ("2024",))
+        self.assertIn("idx_incidents_created_at", plan)
+
+    def test_wal_mode(self):
+        """Test that the database runs in write-ahead-log mode."""
+        mode = self.management.storage._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_state_survives_restart_without_save(self):
+        """Test that every mutation is committed as it happens."""
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.MEDIUM, ["Ambulance"])
+        self.management.update_incident(incident_id, priority=Priority.HIGH)
+        resource_id = self.management.incidents[incident_id].assigned_resources[0]
+        resources = set(self.management.resources)
+
+        restarted = self._restart()
+        self.assertEqual(set(restarted.resources), resources)
+        self.assertEqual(restarted.incidents[incident_id].priority, Priority.HIGH)
+        self.assertEqual(restarted.incidents[incident_id].assigned_resources, [resource_id])
+        self.assertEqual(restarted.resources[resource_id].status, ResourceStatus.ASSIGNED)
+        self.assertNotIn("incidents.json", os.listdir(self.tmp_dir.name))
+
+    def test_only_active_incidents_are_resident(self):
+        """Test that resolved history stays on disk until it is looked up."""
+        open_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        resolved_id = self.management.add_incident("Zone 3", "flood", Priority.LOW, ["Rescue Team"])
+        self.management.update_incident(resolved_id, status=IncidentStatus.RESOLVED)
+
+        restarted = self._restart()
+        self.assertIsInstance(restarted.incidents, LazyIncidents)
+        self.assertEqual(set(restarted.incidents.resident), {open_id})
+        self.assertIn(resolved_id, restarted.incidents)
+        self.assertEqual(len(restarted.incidents), 2)
+        self.assertEqual({incident.incident_id for incident in restarted.view_incidents()}, {open_id, resolved_id})
+        self.assertNotIn(resolved_id, restarted.incidents.resident)  # Iterating does not cache history
+
+        self.assertEqual(restarted.incidents[resolved_id].status, IncidentStatus.RESOLVED)
+        self.assertIn(resolved_id, restarted.incidents.resident)
+        self.assertEqual([incident.incident_id for incident in restarted.get_active_incidents()], [open_id])
+
+    def test_find_incidents_and_resources(self):
+        """Test the filtered lookups against the stored records."""
+        fire_id = self.management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        flood_id = self.management.add_incident("Zone 3", "flood", Priority.LOW, ["Rescue Team"])
+        self.management.update_incident(flood_id, status=IncidentStatus.RESOLVED)
+        restarted = self._restart()
+
+        self.assertEqual([i.incident_id for i in restarted.find_incidents(status=IncidentStatus.RESOLVED)], [flood_id])
+        self.assertEqual([i.incident_id for i in restarted.find_incidents(priority=Priority.HIGH)], [fire_id])
+        self.assertEqual([i.incident_id for i in restarted.find_incidents(location="Zone 3")], [flood_id])
+        found = restarted.find_incidents(status=IncidentStatus.OPEN)
+        self.assertIs(found[0], restarted.incidents[fire_id])  # Resident objects are returned as-is
+
+        assigned = restarted.find_resources(assigned_incident_id=fire_id)
+        self.assertEqual([resource.resource_type for resource in assigned], ["Fire Truck"])
+        ambulances = restarted.find_resources(resource_type="Ambulance", status=ResourceStatus.AVAILABLE)
+        self.assertEqual([resource.name for resource in ambulances], ["Ambulance 1"])
+
+    def test_queries_use_indexes(self):
+        """Test that status, location and type lookups are index searches rather than table scans."""
+        storage = self.management.storage
+        plans = [
+            storage.explain("SELECT incident_id FROM incidents WHERE status = ?", ("OPEN",)),
+            storage.explain("SELECT incident_id FROM incidents WHERE location = ?", ("Zone 1",)),
+            storage.explain("SELECT resource_id FROM resources WHERE resource_type = ?", ("Ambulance",)),
+        ]
+        for plan in plans:
+            self.assertIn("USING INDEX", plan)
+
+    def test_find_without_query_support_scans_memory(self):
+        """Test that the JSON-file backend answers the same lookups from memory."""
+        with redirect_stdout(StringIO()):
+            management = EmergencyManagement(data_dir=os.path.join(self.tmp_dir.name, "json"))
+        incident_id = management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.assertEqual([i.incident_id for i in management.find_incidents(location="Zone 1")], [incident_id])
+        self.assertEqual(len(management.find_resources(assigned_incident_id=incident_id)), 1)
+        management.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
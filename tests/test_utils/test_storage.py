@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from app.utils.emerg_management import EmergencyManagement
+from app.utils.storage import LazyIncidents, StorageBackend
+from app.incidents.emerg_incident import IncidentStatus
+from app.priorities.emerg_priority import Priority
+
+
+class TestLazyLoad(unittest.TestCase):
+    def setUp(self):
+        """Set up a saved history with one open and two resolved incidents."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        management = self._open(lazy_load=False)
+        self.open_id = management.add_incident("Zone 1", "fire", Priority.HIGH, ["Fire Truck"])
+        self.resolved_ids = []
+        for location in ("Zone 2", "Zone 3"):
+            incident_id = management.add_incident(location, "flood", Priority.LOW, ["Rescue Team"])
+            management.update_incident(incident_id, status=IncidentStatus.RESOLVED)
+            self.resolved_ids.append(incident_id)
+        with redirect_stdout(StringIO()):
+            management.save_data()
+        management.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return EmergencyManagement(data_dir=self.tmp_dir.name, **kwargs)
+
+    def test_only_active_incidents_are_materialized(self):
+        """Test that closed history is indexed but not resident."""
+        management = self._open(lazy_load=True)
+        self.assertIsInstance(management.incidents, LazyIncidents)
+        self.assertEqual(set(management.incidents.resident), {self.open_id})
+        self.assertEqual(len(management.incidents), 3)
+        self.assertIn(self.resolved_ids[0], management.incidents)
+        self.assertEqual([incident.incident_id for incident in management.get_active_incidents()], [self.open_id])
+        management.close()
+
+    def test_history_is_read_on_access(self):
+        """Test that a closed incident is parsed from disk on lookup and can be updated."""
+        management = self._open(lazy_load=True)
+        incident_id = self.resolved_ids[1]
+        self.assertEqual(management.incidents[incident_id].location, "Zone 3")
+        management.update_incident(incident_id, status=IncidentStatus.CLOSED)
+        with redirect_stdout(StringIO()):
+            management.save_data()
+        management.close()
+
+        reopened = self._open(lazy_load=False)
+        self.assertEqual(reopened.incidents[incident_id].status, IncidentStatus.CLOSED)
+        self.assertEqual(len(reopened.incidents), 3)
+        reopened.close()
+
+    def test_paging_does_not_make_history_resident(self):
+        """Test that pages of history are returned without being cached."""
+        management = self._open(lazy_load=True)
+        page = management.page_incidents(start=1, count=2)
+        self.assertEqual([incident.incident_id for incident in page], self.resolved_ids)
+        self.assertEqual(set(management.incidents.resident), {self.open_id})
+        self.assertEqual(len(management.page_incidents(start=3)), 0)
+        management.close()
+
+    def test_journal_is_replayed_over_the_index(self):
+        """Test that journaled changes to history win over the indexed snapshot."""
+        management = self._open(lazy_load=True, journal=True)
+        incident_id = self.resolved_ids[0]
+        management.update_incident(incident_id, status=IncidentStatus.OPEN)
+        management.close()  # No save_data
+
+        restarted = self._open(lazy_load=True, journal=True)
+        self.assertEqual(restarted.incidents.resident[incident_id].status, IncidentStatus.OPEN)
+        active = {incident.incident_id for incident in restarted.get_active_incidents()}
+        self.assertEqual(active, {self.open_id, incident_id})
+        restarted.close()
+
+    def test_legacy_snapshot_loads_eagerly(self):
+        """Test that a headerless incidents.json still loads in lazy mode."""
+        management = self._open()
+        records = {key: incident.to_dict() for key, incident in management.incidents.items()}
+        management.close()
+        with open(os.path.join(self.tmp_dir.name, "incidents.json"), "w") as f:
+            json.dump(records, f, indent=4)
+        legacy = self._open(lazy_load=True)
+        self.assertEqual(set(legacy.incidents), set(records))
+        legacy.close()
+
+
+class TestStorageBackend(unittest.TestCase):
+    def test_backends_must_load_and_save(self):
+        """Test that a backend without save() cannot be created, and that queries are optional."""
+        class LoadOnly(StorageBackend):
+            def load(self):
+                return {}, {}
+
+        with self.assertRaises(TypeError):
+            LoadOnly()
+
+        class InMemory(LoadOnly):
+            def save(self, incidents, resources):
+                pass
+
+        backend = InMemory()
+        self.assertFalse(backend.supports_queries)
+        with self.assertRaises(NotImplementedError):
+            backend.query_incidents()
+
+
+if __name__ == "__main__":
+    unittest.main()
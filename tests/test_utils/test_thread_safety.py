@@ -0,0 +1,177 @@
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from app.utils.emerg_management import EmergencyManagement
+from app.incidents.emerg_incident import IncidentStatus
+from app.resources.emerg_resource import Resource, ResourceStatus
+from app.priorities.emerg_priority import Priority
+
+TYPES = ["Ambulance", "Fire Truck", "Police Car"]
+ZONES = ["Zone 1", "Zone 2", "Zone 3"]
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self):
+        """Set up a thread-safe, journaled system with 30 units and no incidents."""
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible, so races actually interleave
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.management = self._open()
+        self.management.resources = {}
+        self.management._rebuild_resource_indexes()
+        self.management.allocator.rebuild()
+        for index in range(30):
+            resource = Resource(name=f"Unit {index}", resource_type=TYPES[index % 3], location=ZONES[index % 3])
+            self.management.add_resource(resource.resource_id, resource)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+        self.management.close()
+        self.tmp_dir.cleanup()
+
+    def _open(self):
+        return EmergencyManagement(data_dir=self.tmp_dir.name, journal=True, proximity_dispatch=True,
+                                   thread_safe=True)
+
+    def _assert_consistent(self, management):
+        holders = {}
+        for incident_id, incident in management.incidents.items():
+            for resource_id in incident.assigned_resources:
+                self.assertNotIn(resource_id, holders, "unit assigned to two incidents")
+                holders[resource_id] = incident_id
+        for resource_id, resource in management.resources.items():
+            if resource.status == ResourceStatus.ASSIGNED:
+                self.assertEqual(holders.get(resource_id), resource.assigned_incident_id)
+            else:
+                self.assertNotIn(resource_id, holders)
+                self.assertIsNone(resource.assigned_incident_id)
+        self.assertTrue(management.resource_index.is_consistent(management.resources))
+
+    def test_racing_dispatchers_never_share_a_unit(self):
+        """Test that of many threads grabbing the same unit at once, exactly one succeeds."""
+        resource_id = next(iter(self.management.resources))
+        threads = 8
+        for _ in range(50):
+            self.management.release_resource(resource_id)
+            incidents = [self.management.add_incident("Zone 1", "medical", Priority.LOW, ["Rescue Team"])
+                         for _ in range(threads)]
+            barrier = threading.Barrier(threads)
+            wins = []
+
+            def grab(incident_id):
+                barrier.wait()
+                if self.management.allocate_resource(incident_id, resource_id):
+                    wins.append(incident_id)
+
+            workers = [threading.Thread(target=grab, args=(incident_id,)) for incident_id in incidents]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.assertEqual(len(wins), 1)
+            holders = [incident_id for incident_id in incidents
+                       if resource_id in self.management.incidents[incident_id].assigned_resources]
+            self.assertEqual(holders, wins)
+        self._assert_consistent(self.management)
+
+    def test_view_incidents_is_consistent_during_writes(self):
+        """Test that a unit moved back and forth between two incidents is always seen at exactly one of them."""
+        first = self.management.add_incident("Zone 1", "police", Priority.LOW, ["Rescue Team"])
+        second = self.management.add_incident("Zone 2", "police", Priority.LOW, ["Rescue Team"])
+        resource_id = next(iter(self.management.resources))
+        self.assertTrue(self.management.allocate_resource(first, resource_id))
+        done = threading.Event()
+        seen = []
+
+        def mover():
+            for index in range(2000):
+                self.management.reallocate_resource(second if index % 2 == 0 else first, resource_id)
+            done.set()
+
+        def reader():
+            while not done.is_set():
+                holders = [incident.incident_id for incident in self.management.view_incidents()
+                           if resource_id in incident.assigned_resources]
+                seen.append(holders)
+
+        threads = [threading.Thread(target=mover)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(seen)
+        self.assertEqual([holders for holders in seen if len(holders) != 1], [])
+
+    def test_compare_and_set(self):
+        """Test that an operation with a stale version fails and one with the current version succeeds."""
+        resource_id = next(iter(self.management.resources))
+        incident_id = self.management.add_incident("Zone 2", "medical", Priority.LOW, ["Rescue Team"])
+        seen = self.management.resources[resource_id].updated_at
+        self.management.update_resource_status(resource_id, ResourceStatus.AVAILABLE)  # Someone else touched it
+        self.assertFalse(self.management.allocate_resource(incident_id, resource_id, expected_updated_at=seen))
+        current = self.management.resources[resource_id].updated_at
+        self.assertGreater(current, seen)
+        self.assertTrue(self.management.allocate_resource(incident_id, resource_id, expected_updated_at=current))
+        self.assertFalse(self.management.release_resource(resource_id, expected_updated_at=current))
+        latest = self.management.resources[resource_id].updated_at
+        self.assertTrue(self.management.release_resource(resource_id, expected_updated_at=latest))
+
+    def test_stress(self):
+        """Test that many threads mixing every operation leave consistent state, also after a journal replay."""
+        errors = []
+
+        def dispatcher(seed):
+            rng = random.Random(seed)
+            own = []
+            try:
+                for _ in range(300):
+                    action = rng.random()
+                    resource_ids = list(self.management.resources)
+                    if action < 0.25 or not own:
+                        own.append(self.management.add_incident(
+                            rng.choice(ZONES), "medical", rng.choice(list(Priority)),
+                            rng.sample(TYPES, rng.randint(1, 2))))
+                    elif action < 0.45:
+                        self.management.allocate_resource(rng.choice(own), rng.choice(resource_ids))
+                    elif action < 0.55:
+                        self.management.reallocate_resource(rng.choice(own), rng.choice(resource_ids))
+                    elif action < 0.65:
+                        self.management.release_resource(rng.choice(resource_ids))
+                    elif action < 0.75:
+                        self.management.update_incident(rng.choice(own), status=IncidentStatus.RESOLVED)
+                    elif action < 0.82:
+                        self.management.update_resource_status(
+                            rng.choice(resource_ids), rng.choice([ResourceStatus.AVAILABLE, ResourceStatus.UNAVAILABLE]))
+                    elif action < 0.85:
+                        self.management.process_resource_allocation()
+                    else:  # Readers run alongside the writers
+                        self.management.get_active_incidents()
+                        self.management.get_incident_report()
+                        self.management.get_available_resources(rng.choice(TYPES))
+            except Exception as e:  # Surfaced in the main thread
+                errors.append(e)
+
+        workers = [threading.Thread(target=dispatcher, args=(seed,)) for seed in range(16)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+        self._assert_consistent(self.management)
+
+        self.management.close()
+        replayed = self._open()  # The journal records were written under the same lock
+        try:
+            self._assert_consistent(replayed)
+            self.assertEqual(
+                {incident_id: incident.assigned_resources for incident_id, incident in replayed.incidents.items()},
+                {incident_id: incident.assigned_resources for incident_id, incident in self.management.incidents.items()},
+            )
+        finally:
+            replayed.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+from app.utils import utils
+from app.utils.utils import calculate_distance, distance_matrix, nearest_k
+
+
+class TestDistanceHelpers(unittest.TestCase):
+    def setUp(self):
+        """Set up random incident and resource coordinates."""
+        rng = random.Random(11)
+        self.incidents = [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(20)]
+        self.resources = [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(35)]
+
+    def test_calculate_distance(self):
+        """Test the scalar haversine reference against a known distance."""
+        london, paris = (51.5074, -0.1278), (48.8566, 2.3522)
+        self.assertAlmostEqual(calculate_distance(london, paris), 343.5, delta=1.0)
+        self.assertEqual(calculate_distance(london, london), 0.0)
+
+    def test_distance_matrix_matches_scalar(self):
+        """Test that every batch distance matches calculate_distance."""
+        matrix = distance_matrix(self.incidents, self.resources)
+        for row, incident in enumerate(self.incidents):
+            for column, resource in enumerate(self.resources):
+                self.assertAlmostEqual(matrix[row][column], calculate_distance(incident, resource), places=6)
+
+    def test_distance_matrix_short_range(self):
+        """Test that metre-scale distances keep their precision."""
+        origin = (51.4592, -0.2567)
+        nearby = [(51.4592 + 0.0001 * step, -0.2567 + 0.0001 * step) for step in range(1, 4)]
+        matrix = distance_matrix([origin], nearby)
+        for column, point in enumerate(nearby):
+            self.assertAlmostEqual(matrix[0][column] / calculate_distance(origin, point), 1.0, places=9)
+
+    def test_nearest_k_matches_scalar(self):
+        """Test that top-k neighbours agree with sorting scalar distances."""
+        indices, distances = nearest_k(self.incidents, self.resources, 5)
+        for row, incident in enumerate(self.incidents):
+            expected = sorted(calculate_distance(incident, resource) for resource in self.resources)[:5]
+            for got, want in zip(distances[row], expected):
+                self.assertAlmostEqual(got, want, places=6)
+            for column, index in enumerate(indices[row]):
+                self.assertAlmostEqual(calculate_distance(incident, self.resources[index]), distances[row][column], places=6)
+
+    def test_nearest_k_caps_at_destinations(self):
+        """Test that k larger than the number of destinations returns all of them."""
+        indices, _ = nearest_k(self.incidents[:2], self.resources[:3], 10)
+        self.assertEqual(len(indices[0]), 3)
+
+    def test_pure_python_fallback(self):
+        """Test that the helpers work without NumPy."""
+        numpy_module, utils.np = utils.np, None
+        try:
+            matrix = distance_matrix(self.incidents[:3], self.resources[:4])
+            indices, distances = nearest_k(self.incidents[:3], self.resources[:4], 2)
+        finally:
+            utils.np = numpy_module
+        self.assertAlmostEqual(matrix[1][2], calculate_distance(self.incidents[1], self.resources[2]))
+        self.assertEqual(len(indices[0]), 2)
+        self.assertLessEqual(distances[0][0], distances[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()